@@ -1,5 +1,9 @@
-import os
 from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
 
 import geopandas
 import numpy as np
@@ -9,55 +13,90 @@ from model_definition import define_telecommuting_variable
 
 from simba.mobi.choice.models.homeoffice.constants import hh_columns
 from simba.mobi.choice.models.homeoffice.constants import zp_columns
+from simba.mobi.choice.utils.coordinates import get_crow_fly_distances
+from simba.mobi.choice.utils.prefetch import Prefetcher
+from simba.mobi.choice.utils.year_store import read_years
+from simba.mobi.choice.utils.zone_layers import read_zone_layer
+from simba.mobi.choice.utils.zone_service import ZoneService
+from simba.mobi.choice.utils.zone_service import get_zone_service
 from simba.mobi.mzmv.config import path_to_mtmc_data
 from simba.mobi.mzmv.utils_mtmc.add_urban_typology import add_urban_typology
-from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hh
-from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hhp
-from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_zp
+from simba.mobi.mzmv.utils_mtmc.add_urban_typology import read_urban_typology
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import load_many
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import segment_reduce
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
 
-
-def get_data(input_directory: Path) -> pd.DataFrame:
-    path_to_data_folder_for_all_years = input_directory / "2015_2020_2021"
-    if os.path.isfile(path_to_data_folder_for_all_years / "persons.csv"):
-        df_zp_2015_2020_2021 = pd.read_csv(
-            path_to_data_folder_for_all_years / "persons.csv", sep=";"
-        )
-    else:
-        df_zp_2015 = get_data_per_year(2015)
-        df_zp_2020 = get_data_per_year(2020)
-        df_zp_2021 = get_data_per_year(2021)
-        df_zp_2015_2020 = merge_data_files(df_zp_2015, df_zp_2020)
-        df_zp_2015_2020_2021 = merge_data_files(df_zp_2015_2020, df_zp_2021)
-        path_to_data_folder_for_all_years.mkdir(parents=True, exist_ok=True)
-        df_zp_2015_2020_2021.to_csv(
-            path_to_data_folder_for_all_years / "persons.csv", sep=";", index=False
-        )
-    return df_zp_2015_2020_2021
+# Input daten
+path_to_mobi_zones = Path(r"path_to_mobi_zones")
+path_to_npvm_zones = Path(r"path_to_npvm_zones")
+path_to_skim_file = Path(r"path_to_skim_file")
 
 
-def merge_data_files(df_zp1: pd.DataFrame, df_zp2: pd.DataFrame) -> pd.DataFrame:
-    # Merge year1 and year2
-    df_merged = pd.concat([df_zp1, df_zp2], ignore_index=True)
-
+def get_data(
+    input_directory: Path, years: Sequence[int] = (2015, 2020, 2021)
+) -> pd.DataFrame:
+    """Persons of the years, stored with one file per year in input_directory/persons (see year_store.py).
+    Only the years not stored yet are generated from the raw data of the MTMC."""
+    df_zp = read_years(
+        input_directory / "persons",
+        years,
+        generate_years,
+        sep=";",
+        # File of all years of the previous versions
+        path_to_combined_file=input_directory / "2015_2020_2021" / "persons.csv",
+    )
     """ Test that no column contains NA values """
-    for column in df_merged.columns:
-        if df_merged[column].isna().any():
+    for column in df_zp.columns:
+        if df_zp[column].isna().any():
             print("There are NA values in column", column)
-    return df_merged
+    return df_zp
+
+
+def generate_years(years: List[int]) -> Dict[int, pd.DataFrame]:
+    # The raw tables of the MTMC of all years are read concurrently
+    mtmc_tables = load_many(
+        [request for year in years for request in get_mtmc_requests(year)],
+        path_to_mtmc_data,
+    )
+    with Prefetcher() as prefetcher:
+        # The zones, skims and typologies of all years load while the first year is computed
+        for year in years:
+            prefetch_inputs(
+                prefetcher,
+                year,
+                path_to_mobi_zones,
+                path_to_npvm_zones,
+                path_to_skim_file,
+                mtmc_tables,
+            )
+        return {
+            year: get_data_per_year(year, mtmc_tables, prefetcher) for year in years
+        }
+
 
+def get_mtmc_requests(year: int) -> List[Tuple[int, str, List[str]]]:
+    """Tables and columns of the Mobility and Transport Microcensus (MTMC) needed for one year."""
+    return [
+        (year, "zp", zp_columns[year]),
+        (year, "hh", hh_columns[year]),
+        (year, "hhp", ["HHNR", "alter"]),
+    ]
 
-def get_data_per_year(year: int) -> pd.DataFrame:
-    # Input daten
-    path_to_mobi_zones = (r"path_to_mobi_zones")
-    path_to_npvm_zones = (r"path_to_npvm_zones")
-    path_to_skim_file = (r"path_to_skim_file")
 
+def get_data_per_year(
+    year: int,
+    mtmc_tables: Optional[Dict[Tuple[int, str], pd.DataFrame]] = None,
+    prefetcher: Optional[Prefetcher] = None,
+) -> pd.DataFrame:
     # Generate the data
     df_zp = generate_data_file(
         year,
         path_to_mobi_zones,
         path_to_npvm_zones,
         path_to_skim_file,
+        mtmc_tables,
+        prefetcher,
     )
     df_zp["year"] = year
     """ Test that no column contains NA values """
@@ -67,27 +106,85 @@ def get_data_per_year(year: int) -> pd.DataFrame:
     return df_zp
 
 
+def prefetch_inputs(
+    prefetcher: Prefetcher,
+    year: int,
+    path_to_mobi_zones: Path,
+    path_to_npvm_zones: Path,
+    path_to_skim_file: Path,
+    mtmc_tables: Optional[Dict[Tuple[int, str], pd.DataFrame]] = None,
+) -> None:
+    """Declares the inputs of generate_data_file, in the order in which they are used, so that they load in the
+    background. The zones and the skims are the same for all years and are loaded once."""
+    if mtmc_tables is None:
+        prefetcher.prefetch(
+            ("mtmc_tables", year), load_many, get_mtmc_requests(year), path_to_mtmc_data
+        )
+    prefetcher.prefetch(
+        "npvm_zone_service", get_zone_service, path_to_npvm_zones, ["zone_id"]
+    )
+    prefetcher.prefetch("accessibility", read_accessibility, path_to_mobi_zones)
+    prefetcher.prefetch(("urban_typology", year), read_urban_typology, year)
+    prefetcher.prefetch(
+        "car_network_distances", read_car_network_distances, path_to_skim_file
+    )
+    prefetcher.prefetch("mobi_zones", read_mobi_zones, path_to_mobi_zones)
+
+
 def generate_data_file(
     year: int,
     path_to_mobi_zones: Path,
     path_to_npvm_zones: Path,
     path_to_skim_file: Path,
+    mtmc_tables: Optional[Dict[Tuple[int, str], pd.DataFrame]] = None,
+    prefetcher: Optional[Prefetcher] = None,
 ) -> pd.DataFrame:
     """This function reads the  data about the person.
     It then joins them with the data about the household and the spatial typology.
     It returns nothing, but saves the output as a data file for Biogeme.
         :param: Year of the Mobility and Transport Microcensus. Possible values: 2015 or 2020.
+        :param: Tables of the MTMC already loaded with load_many (optional).
+        :param: Prefetcher of the inputs (optional), shared e.g. between the years. The inputs (tables of the MTMC,
+        zones, skims, typology) are loaded in background threads while the variables are computed.
         :return: The dataframe.
         It can save the dataframe as a CSV file (separator: tab) without NA values, in Biogeme format.
     """
+    if prefetcher is None:
+        with Prefetcher() as prefetcher:
+            return generate_data_file(
+                year,
+                path_to_mobi_zones,
+                path_to_npvm_zones,
+                path_to_skim_file,
+                mtmc_tables,
+                prefetcher,
+            )
+    prefetch_inputs(
+        prefetcher,
+        year,
+        path_to_mobi_zones,
+        path_to_npvm_zones,
+        path_to_skim_file,
+        mtmc_tables,
+    )
     """ Select the variables about the person from the tables of the MTMC """
-    selected_columns_zp = zp_columns[year]
-    df_zp = get_zp(year, path_to_mtmc_data, selected_columns_zp)
-    selected_columns_hh = hh_columns[year]
-    df_hh = get_hh(year, path_to_mtmc_data, selected_columns_hh)
-    df_zp = pd.merge(df_zp, df_hh, on="HHNR", how="left")
-
-    df_zp = add_accessibility(df_zp, path_to_mobi_zones, path_to_npvm_zones)
+    if mtmc_tables is None:
+        mtmc_tables = prefetcher.get(("mtmc_tables", year))
+    df_zp = mtmc_tables[(year, "zp")]
+    df_hh = mtmc_tables[(year, "hh")]
+    # The home zone is located once per household, before joining the households to the persons
+    df_hh = add_home_zone(
+        df_hh, path_to_npvm_zones, prefetcher.get("npvm_zone_service")
+    )
+    df_zp = take_join(df_zp, index_table(df_hh))
+
+    df_zp = add_accessibility(
+        df_zp,
+        path_to_mobi_zones,
+        path_to_npvm_zones,
+        prefetcher.get("npvm_zone_service"),
+        prefetcher.get("accessibility"),
+    )
 
     """Public transport connection quality was tested, was however not significant.
     The variable is not added in the dataset anymore."""
@@ -95,10 +192,10 @@ def generate_data_file(
 
     df_zp = add_home_work_crow_fly_distance(df_zp)
 
-    df_zp = add_spatial_typology(df_zp, year)
+    df_zp = add_spatial_typology(df_zp, year, prefetcher.get(("urban_typology", year)))
 
     """ Get information about the members of the household """
-    df_hhp = get_hhp(year, path_to_mtmc_data, selected_columns=["HHNR", "alter"])
+    df_hhp = mtmc_tables[(year, "hhp")]
 
     df_zp = add_number_of_children(df_zp, df_hhp, age_limit=21)
     del df_zp["hhgr"]
@@ -314,7 +411,13 @@ def generate_data_file(
     df_zp = add_is_studying(df_zp)
 
     """ Add home-work distance from SIMBA MOBi """
-    df_zp = add_home_work_distance(df_zp, path_to_mobi_zones, path_to_skim_file)
+    df_zp = add_home_work_distance(
+        df_zp,
+        path_to_mobi_zones,
+        path_to_skim_file,
+        prefetcher.get("car_network_distances"),
+        prefetcher.get("mobi_zones"),
+    )
 
     """ Test that no column contains NA values """
     for column in df_zp.columns:
@@ -395,13 +498,13 @@ def add_number_of_children(
 ) -> pd.DataFrame:
     name_of_new_variable = "number_of_children_less_than_" + str(age_limit)
     """ Let first count the number of members of the household younger than [age_limit] """
-    df_hhp["less_than_x"] = df_hhp.apply(
-        lambda x: 1 if x["alter"] <= age_limit else 0, axis=1
+    df_hhp = df_hhp[["HHNR"]].assign(
+        less_than_x=(df_hhp["alter"] <= age_limit).astype(int)
     )
-    df_hhp_less_than_x_per_hh = df_hhp[["HHNR", "less_than_x"]].groupby(["HHNR"]).sum()
-    df_zp = pd.merge(
-        df_zp, df_hhp_less_than_x_per_hh, left_on="HHNR", right_on="HHNR", how="left"
+    df_hhp_less_than_x_per_hh = segment_reduce(
+        index_table(df_hhp), ["less_than_x"], "sum"
     )
+    df_zp = take_join(df_zp, df_hhp_less_than_x_per_hh)
     """ Two cases of household structure: couples with children or single parent with children at home """
     df_zp[name_of_new_variable] = 0
     # Case "couples with children"
@@ -420,31 +523,54 @@ def add_number_of_children(
     return df_zp
 
 
-def add_accessibility(
-    df_zp: pd.DataFrame, path_to_mobi_zones: Path, path_to_npvm_zones: Path
-) -> pd.DataFrame:
-    """Add traffic zones IDs for home location"""
-    df_zp = geopandas.GeoDataFrame(
-        df_zp, geometry=geopandas.points_from_xy(df_zp.W_X, df_zp.W_Y), crs="epsg:4326"
-    )
-    df_zp.to_crs(epsg=2056, inplace=True)
-    # Read the Geopackage file containing the zones. Proj: 2056, CH1903+
-    df_zones = geopandas.read_file(path_to_npvm_zones)
-    df_zp = geopandas.sjoin(
-        df_zp, df_zones[["zone_id", "geometry"]], how="left", predicate="intersects"
-    )
-    df_zp.fillna({"zone_id": -999}, inplace=True)
-    # Rename the column with the zone ID
-    df_zp.rename(columns={"zone_id": "zone_id_home"}, inplace=True)
-
-    """ Add accessibility for home location """
+def read_accessibility(path_to_mobi_zones: Path) -> pd.DataFrame:
+    """Accessibility by car, public transport and multimodal of the MOBi zones"""
     path_to_mobi_zones_csv = path_to_mobi_zones / "mobi-zones.csv"
     with open(path_to_mobi_zones_csv, "r", encoding="latin1") as accessibility_file:
-        df_accessibility = pd.read_csv(
+        return pd.read_csv(
             accessibility_file,
             sep=";",
             usecols=["zone_id", "accsib_car", "accsib_mul", "accsib_pt"],
         )
+
+
+def add_home_zone(
+    df: pd.DataFrame,
+    path_to_npvm_zones: Path,
+    npvm_zone_service: Optional[ZoneService] = None,
+) -> pd.DataFrame:
+    """Add the traffic zone ID of the home location (-999 outside of the zones), e.g. to the households.
+    The coordinates W_X and W_Y are kept (used for the crow-fly distance)."""
+    # Zones of the Geopackage file. Proj: 2056, CH1903+
+    if npvm_zone_service is None:
+        npvm_zone_service = get_zone_service(path_to_npvm_zones, ["zone_id"])
+    df = df.copy()
+    df["zone_id_home"] = (
+        npvm_zone_service.get_attributes(df.W_X, df.W_Y, ["zone_id"])["zone_id"]
+        .fillna(-999)
+        .to_numpy()
+    )
+    return df
+
+
+def add_accessibility(
+    df_zp: pd.DataFrame,
+    path_to_mobi_zones: Path,
+    path_to_npvm_zones: Path,
+    npvm_zone_service: Optional[ZoneService] = None,
+    df_accessibility: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Add traffic zones IDs for home location, unless already added to the households (see add_home_zone).
+    The zones (with their spatial index, see zone_service.py) and the accessibility are read from the files,
+    unless already given (e.g. prefetched)."""
+    if npvm_zone_service is None:
+        npvm_zone_service = get_zone_service(path_to_npvm_zones, ["zone_id"])
+    if "zone_id_home" not in df_zp.columns:
+        df_zp = add_home_zone(df_zp, path_to_npvm_zones, npvm_zone_service)
+
+    """ Add accessibility for home location """
+    if df_accessibility is None:
+        df_accessibility = read_accessibility(path_to_mobi_zones)
     df_zp = pd.merge(
         df_zp, df_accessibility, left_on="zone_id_home", right_on="zone_id", how="left"
     )
@@ -457,29 +583,19 @@ def add_accessibility(
         inplace=True,
     )
     del df_zp["zone_id"]
-    del df_zp["index_right"]
 
     """ Add traffic zones IDs for work location """
-    df_zp_with_work_coord = df_zp[(df_zp.A_X != -999) & (df_zp.A_X != -997)]
-    df_zp_with_work_coord = geopandas.GeoDataFrame(
-        df_zp_with_work_coord,
-        geometry=geopandas.points_from_xy(
-            df_zp_with_work_coord.A_X, df_zp_with_work_coord.A_Y
-        ),
-        crs="epsg:4326",
+    has_work_coordinates = (df_zp.A_X != -999) & (df_zp.A_X != -997)
+    df_zp["zone_id_work"] = -999.0
+    df_zp.loc[has_work_coordinates, "zone_id_work"] = (
+        npvm_zone_service.get_attributes(
+            df_zp.A_X[has_work_coordinates],
+            df_zp.A_Y[has_work_coordinates],
+            ["zone_id"],
+        )["zone_id"]
+        .fillna(-999)
+        .to_numpy()
     )
-    df_zp_with_work_coord.to_crs(epsg=2056, inplace=True)
-    df_zp_with_work_coord = geopandas.sjoin(
-        df_zp_with_work_coord,
-        df_zones[["zone_id", "geometry"]],
-        how="left",
-        predicate="intersects",
-    )
-    # Rename the column with the zone ID
-    df_zp_with_work_coord.rename(columns={"zone_id": "zone_id_work"}, inplace=True)
-    df_zp_with_work_coord.fillna({"zone_id_work": -999}, inplace=True)
-    df_zp.loc[df_zp.A_X != -999, "zone_id_work"] = df_zp_with_work_coord["zone_id_work"]
-    df_zp.fillna({"zone_id_work": -999}, inplace=True)
 
     df_zp = pd.merge(
         df_zp, df_accessibility, left_on="zone_id_work", right_on="zone_id", how="left"
@@ -496,7 +612,6 @@ def add_accessibility(
         {"accsib_car_work": -999, "accsib_mul_work": -999, "accsib_pt_work": -999},
         inplace=True,
     )
-    del df_zp["geometry"]
     del df_zp["zone_id"]
     return df_zp
 
@@ -529,8 +644,10 @@ def add_public_transport_connection_quality(
         )
     else:
         raise ValueError("Year not well defined!")
-    df_connection_quality = geopandas.read_file(
-        connection_quality_folder_path / "OeV_Gueteklassen_ARE.gpkg"
+    df_connection_quality = read_zone_layer(
+        connection_quality_folder_path / "OeV_Gueteklassen_ARE.gpkg",
+        "EPSG:2056",
+        ["Klasse"],
     )
     df_zp_with_work_coord = geopandas.sjoin(
         df_zp_with_work_coord,
@@ -551,24 +668,44 @@ def add_public_transport_connection_quality(
     return df_zp
 
 
+def read_car_network_distances(path_to_skim_file: Path) -> np.ndarray:
+    # Open skim file
+    skims = omx.open_file(path_to_skim_file / "skims.omx", "r")
+    # Load car network distance matrix as numpy array
+    car_network_distance_matrix = np.array(skims["12"])
+    skims.close()
+    return car_network_distance_matrix
+
+
+def read_mobi_zones(path_to_mobi_zones: Path) -> geopandas.GeoDataFrame:
+    """Get MOBi traffic zones"""
+    path_to_mobi_zones_shp = path_to_mobi_zones / "mobi-zones.shp"
+    # Important: zone_ids must be in ascending order
+    # Only the zone_ids are used: the geometries are read from the cache (see zone_layers.py)
+    return read_zone_layer(
+        path_to_mobi_zones_shp, "EPSG:2056", ["zone_id"], source_crs="EPSG:2056"
+    ).sort_values("zone_id")
+
+
 def add_home_work_distance(
-    df_zp: pd.DataFrame, path_to_mobi_zones: Path, path_to_skim_file: Path
+    df_zp: pd.DataFrame,
+    path_to_mobi_zones: Path,
+    path_to_skim_file: Path,
+    car_network_distance_matrix: Optional[np.ndarray] = None,
+    mobi_zones: Optional[geopandas.GeoDataFrame] = None,
 ) -> pd.DataFrame:
+    """The skims and the zones are read from the files, unless already given (e.g. prefetched)."""
     df_zp_with_work_coord = df_zp[["HHNR", "zone_id_home", "zone_id_work"]]
     df_zp_with_work_coord = df_zp_with_work_coord[
         df_zp_with_work_coord.zone_id_work != -999
     ]
 
-    # Open skim file
-    skims = omx.open_file(path_to_skim_file / "skims.omx", "r")
-    # Load car network distance matrix as numpy array
-    car_network_distance_matrix = np.array(skims["12"])
+    if car_network_distance_matrix is None:
+        car_network_distance_matrix = read_car_network_distances(path_to_skim_file)
 
     """ Get MOBi traffic zones """
-    path_to_mobi_zones_shp = path_to_mobi_zones / "mobi-zones.shp"
-    # Important: zone_ids must be in ascending order
-    mobi_zones = geopandas.read_file(path_to_mobi_zones_shp).sort_values("zone_id")
-    mobi_zones.crs = "EPSG:2056"
+    if mobi_zones is None:
+        mobi_zones = read_mobi_zones(path_to_mobi_zones)
 
     """ Get matrix value for origin-destination pairs """
     # We need a mapping "zone ID" to "position of the zone" to read the matrix value
@@ -588,7 +725,6 @@ def add_home_work_distance(
     # work_car_distances = df_zp_with_work_coord[
     #     [c for c in df_zp_with_work_coord.columns if c not in ['o_ind_temp', 'd_ind_temp']]]
 
-    skims.close()
     df_zp_with_work_coord.drop(
         ["zone_id_home", "zone_id_work", "o_ind_temp", "d_ind_temp"],
         axis=1,
@@ -606,30 +742,17 @@ def add_home_work_distance(
 
 
 def add_home_work_crow_fly_distance(df_zp: pd.DataFrame) -> pd.DataFrame:
-    """Add the distance between home and work places"""
+    """Add the distance between home and work places (in LV95, in metres, see coordinates.py)"""
     coding_with_coordinates = (df_zp.A_X != -999) & (df_zp.A_X != -997)
     job_in_switzerland = (df_zp.A_BFS != -99) & (df_zp.A_BFS != -97)
-    df_zp_with_work_coordinates = df_zp[coding_with_coordinates & job_in_switzerland]
-    geodf_home = geopandas.GeoDataFrame(
-        df_zp_with_work_coordinates,
-        geometry=geopandas.points_from_xy(
-            df_zp_with_work_coordinates.W_X, df_zp_with_work_coordinates.W_Y
-        ),
-        crs="epsg:4326",
+    has_work_place = coding_with_coordinates & job_in_switzerland
+    df_zp["home_work_crow_fly_distance"] = -999.0
+    df_zp.loc[has_work_place, "home_work_crow_fly_distance"] = get_crow_fly_distances(
+        df_zp.W_X[has_work_place],
+        df_zp.W_Y[has_work_place],
+        df_zp.A_X[has_work_place],
+        df_zp.A_Y[has_work_place],
     )
-    geodf_home.to_crs(epsg=2056, inplace=True)
-    geodf_home = geodf_home.copy()
-    geodf_work = geopandas.GeoDataFrame(
-        df_zp_with_work_coordinates,
-        geometry=geopandas.points_from_xy(
-            df_zp_with_work_coordinates.A_X, df_zp_with_work_coordinates.A_Y
-        ),
-        crs="epsg:4326",
-    )
-    geodf_work.to_crs(epsg=2056, inplace=True)
-    df_zp.loc[
-        coding_with_coordinates & job_in_switzerland, "home_work_crow_fly_distance"
-    ] = geodf_home.distance(geodf_work)
     df_zp.fillna({"home_work_crow_fly_distance": -999}, inplace=True)
     df_zp.drop(["W_Y", "W_X"], axis=1, inplace=True)
     return df_zp
@@ -638,13 +761,21 @@ def add_home_work_crow_fly_distance(df_zp: pd.DataFrame) -> pd.DataFrame:
 def add_spatial_typology(
     df_zp: pd.DataFrame,
     year: int,
+    urban_rural_typology: Optional[pd.DataFrame] = None,
 ) -> pd.DataFrame:
     """Add the data about the spatial typology of the home address (in particular the home commune)"""
-    df_zp = add_urban_typology(df_zp, year, field_bfs="W_BFS")
+    # The typology is read once for the home and the work addresses
+    if urban_rural_typology is None:
+        urban_rural_typology = read_urban_typology(year)
+    df_zp = add_urban_typology(
+        df_zp, year, field_bfs="W_BFS", urban_rural_typology=urban_rural_typology
+    )
     df_zp = df_zp.rename(columns={"urban_typology": "urban_typology_home"})
 
     """ Add the data about the spatial typology of the work address (in particular the work commune) """
-    df_zp = add_urban_typology(df_zp, year, field_bfs="A_BFS")
+    df_zp = add_urban_typology(
+        df_zp, year, field_bfs="A_BFS", urban_rural_typology=urban_rural_typology
+    )
     df_zp = df_zp.rename(columns={"urban_typology": "urban_typology_work"})
     df_zp.fillna({"urban_typology_work": -99}, inplace=True)
     return df_zp
@@ -1,29 +1,71 @@
 from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
 
 import pandas as pd
 
+from simba.mobi.choice.utils.column_projection import get_projected_requests
 from simba.mobi.choice.utils.mobi import add_mobi_variables
-from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hh
-from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_zp
+from simba.mobi.choice.utils.year_store import read_years
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import load_many
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
+
+MOBI_VARIABLES = ["accsib_mul", "accsib_pt", "pc_car"]
 
 
 def get_data(
-    input_directoy: Path, path_to_mtmc_data: Path, path_to_mobi_zones: Path
+    input_directoy: Path,
+    path_to_mtmc_data: Path,
+    path_to_mobi_zones: Path,
+    years: Sequence[int] = (2015, 2020, 2021),
 ) -> pd.DataFrame:
-    path_to_input = input_directoy / "input15_20_21.csv"
-    """Loads the pre-generated datafile (to save time) or generates it directly from the raw MTMV data."""
-    if path_to_input.exists() and path_to_input.is_file():
-        df_zp = pd.read_csv(path_to_input)
-    else:
-        df_zp_2015 = get_data_per_year(2015, path_to_mtmc_data=path_to_mtmc_data)
-        df_zp_2020 = get_data_per_year(2020, path_to_mtmc_data=path_to_mtmc_data)
-        df_zp_2021 = get_data_per_year(2021, path_to_mtmc_data=path_to_mtmc_data)
-        df_zp = pd.concat([df_zp_2015, df_zp_2020, df_zp_2021])
+    """Loads the pre-generated data of the years (to save time), stored with one file per year in
+    input_directoy/persons (see year_store.py). Only the years not stored yet are generated from the raw MTMC data.
+    """
+    df_zp = read_years(
+        input_directoy / "persons",
+        years,
+        lambda missing_years: generate_years(
+            missing_years, path_to_mtmc_data, path_to_mobi_zones
+        ),
+        # File of all years of the previous versions
+        path_to_combined_file=input_directoy / "input15_20_21.csv",
+    )
+    # Variables missing in some years
+    df_zp.fillna(0, inplace=True)
+    return df_zp
+
+
+def generate_years(
+    years: List[int], path_to_mtmc_data: Path, path_to_mobi_zones: Path
+) -> Dict[int, pd.DataFrame]:
+    # The raw tables of all years are read concurrently
+    mtmc_tables = load_many(
+        [
+            request
+            for year in years
+            for request in get_mtmc_requests(year, path_to_mtmc_data)
+        ],
+        path_to_mtmc_data,
+    )
+    data_of_years = {}
+    for year in years:
+        df_zp = get_data_per_year(
+            year,
+            path_to_mtmc_data=path_to_mtmc_data,
+            mtmc_tables=mtmc_tables,
+            path_to_mobi_zones=path_to_mobi_zones,
+        )
         # Rename variables
         df_zp = df_zp.rename(
             columns={
                 "alter": "age",
-                "f20400a": "driving_licence",
+                # f20400a is returned by get_zp under its generic name (see mtmc_codes.py)
+                "has_driving_licence": "driving_licence",
                 "sprache": "language",
             }
         )
@@ -34,35 +76,55 @@ def get_data(
         df_zp["is_swiss"] = (df_zp.nation == 8100).astype(int)
         df_zp = df_zp.drop(columns=["ERWERB", "nation"])
 
-        df_zp = add_mobi_variables(
-            df_zp,
-            path_to_mobi_zones=path_to_mobi_zones,
-            mobi_variables=["accsib_mul", "accsib_pt", "pc_car"],
-        )
-
         # Remove children
         df_zp = df_zp[df_zp.age > 17]
 
-        df_zp.driving_licence.replace({2: 0}, inplace=True)  # 0: no, 1: yes
+        # 0: no, 1: yes
+        df_zp["driving_licence"] = df_zp["driving_licence"].replace({2: 0})
         df_zp = df_zp[df_zp.driving_licence >= 0]  # Removes 'no answer' / 'don't know
 
         df_zp.fillna(0, inplace=True)
-        df_zp.to_csv(path_to_input, index=False)
-    return df_zp
+        data_of_years[year] = df_zp
+    return data_of_years
 
 
-def get_data_per_year(year: int, path_to_mtmc_data: Path) -> pd.DataFrame:
-    # Load row data of the Mobility and Transpot Microcensus (MTMC)
-    df_zp = get_zp(
-        year=year,
-        path_to_mtmc_data=path_to_mtmc_data,
-        selected_columns=["HHNR", "alter", "sprache", "ERWERB", "nation", "f20400a"],
+def get_mtmc_requests(
+    year: int, path_to_mtmc_data: Path
+) -> List[Tuple[int, str, List[str]]]:
+    """Tables and columns of the Mobility and Transport Microcensus (MTMC) needed for one year.
+    The columns are derived from the specification of the model (see column_projection.py), currently:
+    zp: HHNR, alter, sprache, ERWERB, nation, has_driving_licence (f20400a) and hh: HHNR, hhtyp, W_X, W_Y."""
+    return get_projected_requests(
+        Path(__file__).parent, year, ["zp", "hh"], path_to_mtmc_data
     )
-    df_hh = get_hh(
-        year=year,
-        path_to_mtmc_data=path_to_mtmc_data,
-        selected_columns=["HHNR", "hhtyp", "W_X", "W_Y"],
-    )
-    df_zp = pd.merge(df_zp, df_hh, on="HHNR", how="left")
+
+
+def get_data_per_year(
+    year: int,
+    path_to_mtmc_data: Path,
+    mtmc_tables: Optional[Dict[Tuple[int, str], pd.DataFrame]] = None,
+    path_to_mobi_zones: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Persons of the year with the variables of their household.
+    If path_to_mobi_zones is given, the MOBi variables of the home zone are added to the households, before they
+    are joined to the persons."""
+    # Load row data of the Mobility and Transpot Microcensus (MTMC), if not already loaded
+    if mtmc_tables is None:
+        mtmc_tables = load_many(
+            get_mtmc_requests(year, path_to_mtmc_data), path_to_mtmc_data
+        )
+    df_zp = mtmc_tables[(year, "zp")]
+    df_hh = mtmc_tables[(year, "hh")]
+    if path_to_mobi_zones is not None:
+        df_hh = add_mobi_variables(
+            df_hh,
+            path_to_mobi_zones,
+            mobi_variables=MOBI_VARIABLES,
+        )
+        household_columns = ["hhtyp"] + MOBI_VARIABLES
+    else:
+        household_columns = ["hhtyp", "W_X", "W_Y"]
+    # Only the variables of the households: the language (sprache) is the one of the person
+    df_zp = take_join(df_zp, index_table(df_hh), columns=household_columns)
     df_zp["year"] = year
     return df_zp
@@ -6,6 +6,9 @@ import pandas as pd
 from simba.mobi.choice.utils.mobi import add_mobi_variables
 from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hh
 from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hhp
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import segment_reduce
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
 
 
 def get_data(path_to_input, path_to_mobi, path_to_mtmc) -> pd.DataFrame:
@@ -71,10 +74,10 @@ def get_data_per_year(year, path_to_mtmc) -> pd.DataFrame:
     ] = 0  # no driving licence -> 0
     df_hhp["is_child"] = np.where(df_hhp.age < 18, 1, 0)
     df_hhp["is_adult"] = np.where(df_hhp.age < 18, 0, 1)
-    df_hhp_agg = df_hhp.groupby("HHNR")[
-        ["driving_licence", "is_child", "is_adult"]
-    ].sum()
-    df_hh = pd.merge(df_hh, df_hhp_agg, left_on="HHNR", right_index=True, how="left")
+    df_hhp_agg = segment_reduce(
+        index_table(df_hhp), ["driving_licence", "is_child", "is_adult"], "sum"
+    )
+    df_hh = take_join(df_hh, df_hhp_agg)
     df_hh = df_hh.rename(
         columns={
             "driving_licence": "nb_driving_licences",  # Negative = NA
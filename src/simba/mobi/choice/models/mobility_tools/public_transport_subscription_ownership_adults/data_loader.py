@@ -1,27 +1,57 @@
-import os
 from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
 
 import numpy as np
 import pandas as pd
 
 from simba.mobi.choice.utils.mobi import add_mobi_variables
+from simba.mobi.choice.utils.year_store import read_years
 from simba.mobi.mzmv.utils2015.add_urban_typology import add_urban_typology
-from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hh
-from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hhp
-from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_zp
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import load_many
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import segment_reduce
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
 
 
 def get_data(
-    path_to_input: Path, path_to_mtmc_data: Path, path_to_mobi_zones: Path
+    path_to_input: Path,
+    path_to_mtmc_data: Path,
+    path_to_mobi_zones: Path,
+    years: Sequence[int] = (2015, 2021),
 ) -> pd.DataFrame:
-    if os.path.isdir(path_to_input) is False:
-        path_to_input.mkdir(parents=True, exist_ok=True)
-    if os.path.isfile(path_to_input / "zp_mtmc_2015_2021.csv"):
-        df_zp = pd.read_csv(path_to_input / "zp_mtmc_2015_2021.csv")
-    else:
-        df_zp_2015 = get_data_per_year(2015, path_to_mtmc_data)
-        df_zp_2021 = get_data_per_year(2021, path_to_mtmc_data)
-        df_zp = pd.concat([df_zp_2015, df_zp_2021])
+    """Persons of the years, stored with one file per year in path_to_input/zp_mtmc (see year_store.py).
+    Only the years not stored yet are generated from the raw data of the MTMC."""
+    df_zp = read_years(
+        path_to_input / "zp_mtmc",
+        years,
+        lambda missing_years: generate_years(
+            missing_years, path_to_mtmc_data, path_to_mobi_zones
+        ),
+        # File of all years of the previous versions
+        path_to_combined_file=path_to_input / "zp_mtmc_2015_2021.csv",
+    )
+    # Variables missing in some years
+    df_zp.fillna(0, inplace=True)
+    return df_zp
+
+
+def generate_years(
+    years: List[int], path_to_mtmc_data: Path, path_to_mobi_zones: Path
+) -> Dict[int, pd.DataFrame]:
+    # The raw tables of all years are read concurrently
+    mtmc_tables = load_many(
+        [request for year in years for request in get_mtmc_requests(year)],
+        path_to_mtmc_data,
+    )
+    data_of_years = {}
+    for year in years:
+        df_zp = get_data_per_year(
+            year, path_to_mtmc_data, mtmc_tables, path_to_mobi_zones
+        )
         # Rename variables
         df_zp = df_zp.rename(
             columns={
@@ -40,26 +70,20 @@ def get_data(
 
         df_zp = df_zp.drop(columns=["ERWERB", "nation"])
 
-        df_zp = add_mobi_variables(
-            df_zp,
-            path_to_mobi_zones,
-            mobi_variables=["accsib_mul", "accsib_pt", "accsib_car"],
-        )
-
         # Remove children
         df_zp = df_zp[df_zp.age > 17]
 
         df_zp["driving_licence"].replace({2: 0}, inplace=True)  # 0: no, 1: yes
 
         df_zp.fillna(0, inplace=True)
-        df_zp.to_csv(path_to_input / "zp_mtmc_2015_2021.csv", index=False)
-    return df_zp
+        data_of_years[year] = df_zp
+    return data_of_years
 
 
-def get_data_per_year(year: int, path_to_mtmc_data: Path) -> pd.DataFrame:
-    # Load row data of the Mobility and Transpot Microcensus (MTMC)
+def get_mtmc_requests(year: int) -> List[Tuple[int, str, List[str]]]:
+    """Tables and columns of the Mobility and Transport Microcensus (MTMC) needed for one year."""
     if year == 2015:
-        selected_columns = [
+        selected_columns_zp = [
             "HHNR",
             "alter",
             "sprache",
@@ -70,8 +94,17 @@ def get_data_per_year(year: int, path_to_mtmc_data: Path) -> pd.DataFrame:
             "f41610b",  # Halbtax
             "f41610c",
         ]  # Verbundabo
+        selected_columns_hh = [
+            "HHNR",
+            "hhtyp",
+            "W_X",
+            "W_Y",
+            "hhgr",
+            "f30100",
+            "W_BFS",
+        ]
     elif year == 2021:
-        selected_columns = [
+        selected_columns_zp = [
             "HHNR",
             "alter",
             "sprache",
@@ -82,9 +115,37 @@ def get_data_per_year(year: int, path_to_mtmc_data: Path) -> pd.DataFrame:
             "f41600_01b",  # Halbtax
             "f41600_01c",
         ]  # Verbundabo
+        selected_columns_hh = [
+            "HHNR",
+            "hhtyp",
+            "W_X",
+            "W_Y",
+            "hhgr",
+            "f30100",
+            "W_stadt_land_2012",
+        ]
     else:
         raise ValueError("Year not well defined! It must be 2015 or 2021...")
-    df_zp = get_zp(year, path_to_mtmc_data, selected_columns=selected_columns)
+    return [
+        (year, "zp", selected_columns_zp),
+        (year, "hh", selected_columns_hh),
+        (year, "hhp", ["HHNR", "alter"]),
+    ]
+
+
+def get_data_per_year(
+    year: int,
+    path_to_mtmc_data: Path,
+    mtmc_tables: Optional[Dict[Tuple[int, str], pd.DataFrame]] = None,
+    path_to_mobi_zones: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Persons of the year with the variables of their household.
+    If path_to_mobi_zones is given, the MOBi variables of the home zone are added to the households, before they
+    are joined to the persons."""
+    # Load row data of the Mobility and Transpot Microcensus (MTMC), if not already loaded
+    if mtmc_tables is None:
+        mtmc_tables = load_many(get_mtmc_requests(year), path_to_mtmc_data)
+    df_zp = mtmc_tables[(year, "zp")]
     df_zp = df_zp.rename(
         columns={
             "f41610c": "Verbund_Abo",
@@ -94,34 +155,31 @@ def get_data_per_year(year: int, path_to_mtmc_data: Path) -> pd.DataFrame:
             "f41600_01b": "halbtax_ticket",
         }
     )
-    df_zp["subscriptions"] = df_zp.apply(lambda row: label_subscriptions(row), axis=1)
+    # The tables of mtmc_tables may be shared with other models: new columns are added to copies
+    df_zp = df_zp.assign(
+        subscriptions=df_zp.apply(lambda row: label_subscriptions(row), axis=1)
+    )
     df_zp = df_zp[df_zp.subscriptions >= 0]
 
-    if year == 2015:
-        selected_columns = ["HHNR", "hhtyp", "W_X", "W_Y", "hhgr", "f30100", "W_BFS"]
-    elif year == 2021:
-        selected_columns = [
-            "HHNR",
-            "hhtyp",
-            "W_X",
-            "W_Y",
-            "hhgr",
-            "f30100",
-            "W_stadt_land_2012",
-        ]
-    df_hh = get_hh(year, path_to_mtmc_data, selected_columns=selected_columns)
+    df_hh = mtmc_tables[(year, "hh")]
     if year == 2015:
         df_hh = add_urban_typology(df_hh)
         df_hh = df_hh.drop("W_BFS", axis=1)
-    df_hh["year"] = year
-    df_hhp = get_hhp(year, path_to_mtmc_data, selected_columns=["HHNR", "alter"])
+    df_hh = df_hh.assign(year=year)
+    df_hhp = mtmc_tables[(year, "hhp")]
     df_hhp = df_hhp.rename(columns={"alter": "age"})
     df_hhp["is_adult"] = np.where(df_hhp.age < 18, 0, 1)
     df_hhp = df_hhp.drop(columns=["age"])
-    df_hhp_agg = df_hhp.groupby("HHNR").sum()
-    df_hh = pd.merge(df_hh, df_hhp_agg, left_on="HHNR", right_index=True, how="left")
+    df_hhp_agg = segment_reduce(index_table(df_hhp), ["is_adult"], "sum")
+    df_hh = take_join(df_hh, df_hhp_agg)
     df_hh = df_hh.rename(columns={"is_adult": "nb_adults"})
-    df_zp = pd.merge(df_zp, df_hh, on="HHNR", how="left")
+    if path_to_mobi_zones is not None:
+        df_hh = add_mobi_variables(
+            df_hh,
+            path_to_mobi_zones,
+            mobi_variables=["accsib_mul", "accsib_pt", "accsib_car"],
+        )
+    df_zp = take_join(df_zp, index_table(df_hh))
     return df_zp
 
 
@@ -8,54 +8,29 @@ from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_zp
 
 def distribution_half_fare_regional_travelcards(path_to_mtmc: Path) -> None:
     for year in [2015, 2021]:
-        if year == 2015:
-            selected_columns = [
-                "HHNR",
-                "WP",
-                "alter",
-                "f41610b",  # Halbtax
-                "f41610c",
-            ]  # Verbundabo
-        elif year == 2021:
-            selected_columns = [
-                "HHNR",
-                "WP",
-                "alter",
-                "f41600_01b",  # Halbtax
-                "f41600_01c",
-            ]  # Verbundabo
-        else:
-            raise ValueError("Year not well defined! It must be 2015 or 2021...")
-        df_zp = get_zp(year, path_to_mtmc, selected_columns=selected_columns)
-        df_zp = df_zp.rename(
-            columns={
-                "f41610c": "Verbund_Abo",
-                "f41610b": "halbtax_ticket",
-                "f41600_01c": "Verbund_Abo",
-                "f41600_01b": "halbtax_ticket",
-            }
+        # Lazy table: only the columns used below are read, in one pass over the file.
+        # Generic names: "has_hta" (Halbtax) and "has_va" (Verbundabo) have other codes in 2015 and 2021.
+        df_zp = (
+            get_zp(year, path_to_mtmc, lazy=True)
+            .filter(
+                [
+                    ("alter", ">=", 18),  # Adults only
+                    ("has_va", ">=", 1),  # Valid ansers only, regional tickets
+                    ("has_hta", ">=", 1),  # Valid ansers only, halfare tickets
+                ]
+            )
+            .select(["has_va", "has_hta", "WP"])
+            .collect()
         )
-        df_zp = df_zp.loc[df_zp.alter >= 18, :]  # Adults only
-        df_zp = df_zp.loc[
-            df_zp.Verbund_Abo >= 1, :
-        ]  # Valid ansers only, regional tickets
-        df_zp = df_zp.loc[
-            df_zp.halbtax_ticket >= 1, :
-        ]  # Valid ansers only, halfare tickets
-        total = df_zp.WP.sum()
-        df_zp = df_zp.loc[
-            (df_zp.Verbund_Abo == 1) | (df_zp.halbtax_ticket == 1), :
-        ]  # People with at least one abo
-        nb_halfare_only = df_zp.loc[
-            (df_zp.Verbund_Abo == 2) & (df_zp.halbtax_ticket == 1), "WP"
-        ].sum()
-        nb_regional_only = df_zp.loc[
-            (df_zp.Verbund_Abo == 1) & (df_zp.halbtax_ticket == 2), "WP"
-        ].sum()
-        nb_both = df_zp.loc[
-            (df_zp.Verbund_Abo == 1) & (df_zp.halbtax_ticket == 1), "WP"
-        ].sum()
-        subtotal = df_zp.WP.sum()
+        regional_ticket = df_zp["has_va"]
+        halbtax_ticket = df_zp["has_hta"]
+        weights = df_zp["WP"]
+        total = weights.sum()
+        nb_halfare_only = weights[(regional_ticket == 2) & (halbtax_ticket == 1)].sum()
+        nb_regional_only = weights[(regional_ticket == 1) & (halbtax_ticket == 2)].sum()
+        nb_both = weights[(regional_ticket == 1) & (halbtax_ticket == 1)].sum()
+        # People with at least one abo
+        subtotal = weights[(regional_ticket == 1) | (halbtax_ticket == 1)].sum()
         print(year)
         print("Relative ratio of both:", nb_both / subtotal)
         print("Relative ratio of halfare only:", nb_halfare_only / subtotal)
@@ -89,20 +89,12 @@ def generate_data_file_for_simulation(
         df_persons = get_persons_from_synthetic_population(year)
         nb_of_persons_before = len(df_persons)
         df_persons = add_information_about_households_from_synthetic_population(
-            df_persons, year
+            df_persons, year, path_to_mobi_zones
         )
         """ Test that the number of people are still the same """
         nb_of_persons_after = len(df_persons)
         if nb_of_persons_after != nb_of_persons_before:
             raise Exception("Error: Some people got lost on the way!")
-        df_persons = add_mobi_variables(
-            df_persons,
-            path_to_mobi_zones,
-            mobi_variables=["accsib_mul", "accsib_pt", "accsib_car"],
-            x_variable="xcoord",
-            y_variable="ycoord",
-            crs="epsg:2056",
-        )
         # Keep only the variables for the simulation of the model
         df_persons["cars_per_adult"] = (df_persons["nb_persons_in_hh"] > 0) * (
             df_persons["hcar_ownership"] / df_persons["nb_persons_in_hh"]
@@ -159,9 +151,10 @@ def generate_data_file_for_simulation(
 
 
 def add_information_about_households_from_synthetic_population(
-    df_persons: pd.DataFrame, year: int
+    df_persons: pd.DataFrame, year: int, path_to_mobi_zones: Path
 ) -> pd.DataFrame:
-    """Read the households from the synthetic population"""
+    """Read the households from the synthetic population, with the MOBi variables of their zone.
+    The households are located in the zones before being merged with the persons (one location per household)."""
     if year == 2022:
         synpop_folder_path = Path(
             r"\\wsbbrz0283\mobi\42_SynPop\22_SynPop_MOBi_5.x\Lieferungen_Strittmatter\240402_ARE_SBB_Schlussabgabe_4\01_Daten\240327_CH_2022_NPVM_v29_040_BEST1"
@@ -182,6 +175,14 @@ def add_information_about_households_from_synthetic_population(
     with open(synpop_folder_path / synpop_households_file_name, "r") as households_file:
         df_households = pd.read_csv(households_file, sep=";", usecols=selected_columns)
     df_households = add_urban_typology(df_households)
+    df_households = add_mobi_variables(
+        df_households,
+        path_to_mobi_zones,
+        mobi_variables=["accsib_mul", "accsib_pt", "accsib_car"],
+        x_variable="xcoord",
+        y_variable="ycoord",
+        crs="epsg:2056",
+    )
     df_persons = pd.merge(df_persons, df_households, on="household_id", how="left")
     return df_persons
 
@@ -1,25 +1,55 @@
-import os
 from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Sequence
 
 import pandas as pd
 
 from simba.mobi.choice.models.mobility_tools.public_transport_subscription_ownership_adults.data_loader import (
     get_data_per_year,
 )
-from simba.mobi.choice.utils.mobi import add_mobi_variables
+from simba.mobi.choice.models.mobility_tools.public_transport_subscription_ownership_adults.data_loader import (
+    get_mtmc_requests,
+)
+from simba.mobi.choice.utils.year_store import read_years
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import load_many
 
 
 def get_data(
-    path_to_input: Path, path_to_mtmc_data: Path, path_to_mobi_zones: Path
+    path_to_input: Path,
+    path_to_mtmc_data: Path,
+    path_to_mobi_zones: Path,
+    years: Sequence[int] = (2015, 2021),
 ) -> pd.DataFrame:
-    if os.path.isdir(path_to_input) is False:
-        path_to_input.mkdir(parents=True, exist_ok=True)
-    if os.path.isfile(path_to_input):
-        df_zp = pd.read_csv(path_to_input / "zp_mtmc_2015_2021.csv")
-    else:
-        df_zp_2015 = get_data_per_year(2015, path_to_mtmc_data)
-        df_zp_2021 = get_data_per_year(2021, path_to_mtmc_data)
-        df_zp = pd.concat([df_zp_2015, df_zp_2021])
+    """Persons of the years, stored with one file per year in path_to_input/zp_mtmc (see year_store.py).
+    Only the years not stored yet are generated from the raw data of the MTMC."""
+    df_zp = read_years(
+        path_to_input / "zp_mtmc",
+        years,
+        lambda missing_years: generate_years(
+            missing_years, path_to_mtmc_data, path_to_mobi_zones
+        ),
+        # File of all years of the previous versions
+        path_to_combined_file=path_to_input / "zp_mtmc_2015_2021.csv",
+    )
+    # Variables missing in some years
+    df_zp.fillna(0, inplace=True)
+    return df_zp
+
+
+def generate_years(
+    years: List[int], path_to_mtmc_data: Path, path_to_mobi_zones: Path
+) -> Dict[int, pd.DataFrame]:
+    # The raw tables of all years are read concurrently
+    mtmc_tables = load_many(
+        [request for year in years for request in get_mtmc_requests(year)],
+        path_to_mtmc_data,
+    )
+    data_of_years = {}
+    for year in years:
+        df_zp = get_data_per_year(
+            year, path_to_mtmc_data, mtmc_tables, path_to_mobi_zones
+        )
         # Rename variables
         df_zp = df_zp.rename(
             columns={
@@ -38,20 +68,15 @@ def get_data(
 
         df_zp = df_zp.drop(columns=["ERWERB", "nation"])
 
-        df_zp = add_mobi_variables(
-            df_zp,
-            path_to_mobi_zones,
-            mobi_variables=["accsib_mul", "accsib_pt", "accsib_car"],
-        )
-
         # Remove adults
         df_zp = df_zp[df_zp.age <= 17]
 
         df_zp["has_driving_licence"].replace({2: 0}, inplace=True)  # 0: no, 1: yes
 
         # Remove the one person being 12 and having a half fare subscription
-        df_zp = df_zp.loc[(df_zp["HHNR"] != 292694) | (df_zp["year"] != 2015), :]
+        if year == 2015:
+            df_zp = df_zp.loc[df_zp["HHNR"] != 292694, :]
 
         df_zp.fillna(0, inplace=True)
-        df_zp.to_csv(path_to_input / "zp_mtmc_2015_2021.csv", index=False)
-    return df_zp
+        data_of_years[year] = df_zp
+    return data_of_years
@@ -0,0 +1,127 @@
+"""Times the loaders of the MTMC (get_zp, get_hh, ..., load_many) and the get_data of the models on synthetic raw
+files (see synthetic_mtmc.py), so that the load path can be measured without the confidential data.
+
+The synthetic files, and their columnar cache, are written to a temporary folder at the given scale (1: about the size
+of the MTMC, 100: a hundred times). The first run of each benchmark includes the parsing of the raw file and the
+writing of the columnar cache (if used, see simba.mobi.mzmv.config), the best run over NUMBER_OF_REPETITIONS reads the
+cache.
+The models whose data loader cannot be imported (e.g. missing optional package) are skipped.
+"""
+import importlib
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+from simba.mobi.mzmv import config
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import MTMC_TABLE_LOADERS
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import load_many
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import MTMC_CATALOG
+from simba.mobi.mzmv.utils_mtmc.synthetic_mtmc import write_synthetic_mtmc
+
+NUMBER_OF_REPETITIONS = 3
+
+# get_data_per_year(year, path_to_mtmc_data) of the models, and the years they can load
+MODEL_DATA_LOADERS = [
+    (
+        "simba.mobi.choice.models.mobility_tools.driving_license.data_loader",
+        (2015, 2020, 2021),
+    ),
+    (
+        "simba.mobi.choice.models.mobility_tools.household_car_ownership.data_loader",
+        (2021,),
+    ),
+    (
+        "simba.mobi.choice.models.mobility_tools.public_transport_subscription_ownership_adults.data_loader",
+        (2015, 2021),
+    ),
+]
+
+
+def get_times(function: Callable[[], object]) -> Tuple[float, float]:
+    """Time of the first run and best time over NUMBER_OF_REPETITIONS runs, in seconds."""
+    times = []
+    for _ in range(NUMBER_OF_REPETITIONS):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times[0], min(times)
+
+
+def print_times(name: str, function: Callable[[], object]) -> None:
+    first_time, best_time = get_times(function)
+    print("{}: first {:.2f} s, best {:.2f} s".format(name, first_time, best_time))
+
+
+def get_benchmarks(
+    years: Sequence[int], path_to_mtmc_data: Path
+) -> List[Tuple[str, Callable[[], object]]]:
+    benchmarks: List[Tuple[str, Callable[[], object]]] = []
+    for year in years:
+        for mtmc_table, loader in MTMC_TABLE_LOADERS.items():
+            if (year, mtmc_table) in MTMC_CATALOG:
+                benchmarks.append(
+                    (
+                        "{} {}".format(loader.__name__, year),
+                        lambda loader=loader, year=year: loader(
+                            year, path_to_mtmc_data
+                        ),
+                    )
+                )
+    requests = [
+        (year, mtmc_table, None)
+        for year in years
+        for mtmc_table in MTMC_TABLE_LOADERS
+        if (year, mtmc_table) in MTMC_CATALOG
+    ]
+    benchmarks.append(
+        ("load_many (all tables)", lambda: load_many(requests, path_to_mtmc_data))
+    )
+    for module_name, years_of_model in MODEL_DATA_LOADERS:
+        try:
+            data_loader = importlib.import_module(module_name)
+        except ImportError as error:
+            print("Skipped", module_name + ":", error)
+            continue
+        for year in years_of_model:
+            if year in years:
+                benchmarks.append(
+                    (
+                        "{} get_data_per_year {}".format(
+                            module_name.split(".")[-2], year
+                        ),
+                        lambda data_loader=data_loader, year=year: data_loader.get_data_per_year(
+                            year, path_to_mtmc_data
+                        ),
+                    )
+                )
+    return benchmarks
+
+
+def benchmark_loaders(
+    scale: float = 1.0, years: Sequence[int] = (2015, 2020, 2021)
+) -> None:
+    path_to_mtmc_cache = config.path_to_mtmc_cache
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        path_to_mtmc_data = Path(temporary_directory) / "mtmc"
+        # The columnar cache is deleted with the synthetic data
+        config.path_to_mtmc_cache = Path(temporary_directory) / "cache"
+        try:
+            start = time.perf_counter()
+            write_synthetic_mtmc(path_to_mtmc_data, years, scale)
+            print(
+                "Synthetic MTMC (scale {:g}) written in {:.2f} s".format(
+                    scale, time.perf_counter() - start
+                )
+            )
+            for name, function in get_benchmarks(years, path_to_mtmc_data):
+                print_times(name, function)
+        finally:
+            config.path_to_mtmc_cache = path_to_mtmc_cache
+
+
+if __name__ == "__main__":
+    benchmark_loaders()
@@ -0,0 +1,239 @@
+"""Columns of the Mobility and Transport Microcensus (MTMC) needed by a model, derived from its specification.
+
+The files of the model (model_definition.py and model_estimation.py) are parsed, not imported (biogeme is not needed).
+The columns of the model are the names in Variable("...") and the names used without definition, which come from
+globals().update(database.variables), except the variables defined with database.DefineVariable("...", ...).
+They are traced back through the data loader (data_loader.py) of the model to the columns of the raw MTMC files:
+- renames: df.rename(columns={"alter": "age"}),
+- derived columns: df["full_time"] = (df.ERWERB == 1).astype(int), also through the functions of the data loader,
+- helper functions of other modules reading MTMC columns (COLUMNS_USED_BY_FUNCTIONS).
+Column names built at run time (e.g. df[name_of_new_variable]) cannot be traced.
+The result is intersected with the header of the raw files, so that the loader reads exactly the needed columns.
+"""
+import ast
+import builtins
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import get_path_to_raw_file
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import get_table_spec
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import read_header
+from simba.mobi.mzmv.utils_mtmc.mtmc_codes import get_mzmv_codes
+
+MODEL_FILES = ["model_definition.py", "model_estimation.py"]
+DATA_LOADER_FILE = "data_loader.py"
+
+# Columns used to join the tables of the MTMC, always read
+KEY_COLUMNS = ["HHNR"]
+
+# MTMC columns read by helper functions called in the data loaders
+COLUMNS_USED_BY_FUNCTIONS = {
+    "add_mobi_variables": ["W_X", "W_Y"],
+    "add_urban_typology": ["W_BFS"],
+}
+
+
+def get_string_constants(node: ast.AST) -> Set[str]:
+    return {
+        child.value
+        for child in ast.walk(node)
+        if isinstance(child, ast.Constant) and isinstance(child.value, str)
+    }
+
+
+def get_model_columns(path_to_model_directory: Path) -> Set[str]:
+    """Names of the columns of the dataset used in the specification of the model."""
+    column_names: Set[str] = set()
+    free_names: Set[str] = set()
+    defined_names: Set[str] = set(dir(builtins))
+    for file_name in MODEL_FILES:
+        path_to_file = Path(path_to_model_directory) / file_name
+        if not path_to_file.is_file():
+            continue
+        tree = ast.parse(path_to_file.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                function_name = get_function_name(node)
+                if (function_name == "Variable") and node.args:
+                    column_names |= get_string_constants(node.args[0])
+                elif (function_name == "DefineVariable") and node.args:
+                    defined_names |= get_string_constants(node.args[0])
+            elif isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Load):
+                # e.g. df_zp["year"] or row["telecommuting_is_possible"]
+                if isinstance(node.slice, ast.Constant) and isinstance(
+                    node.slice.value, str
+                ):
+                    column_names.add(node.slice.value)
+            elif isinstance(node, ast.Name):
+                if isinstance(node.ctx, ast.Load):
+                    free_names.add(node.id)
+                else:
+                    defined_names.add(node.id)
+            elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                defined_names.add(node.name)
+            elif isinstance(node, ast.arg):
+                defined_names.add(node.arg)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                defined_names |= {
+                    (alias.asname or alias.name).split(".")[0] for alias in node.names
+                }
+    # Names used without definition come from globals().update(database.variables)
+    return column_names | (free_names - defined_names)
+
+
+def get_function_name(node: ast.Call) -> Optional[str]:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+def get_column_names_in_expression(
+    node: ast.AST, functions: Dict[str, ast.FunctionDef], visited: Set[str]
+) -> Set[str]:
+    """Possible column names read in an expression: attributes (df.ERWERB), strings (df["ERWERB"], lists of
+    columns) and, recursively, the column names read in the functions of the data loader called in the expression."""
+    column_names: Set[str] = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Attribute):
+            column_names.add(child.attr)
+        elif isinstance(child, ast.Constant) and isinstance(child.value, str):
+            column_names.add(child.value)
+        elif isinstance(child, ast.Name) and (child.id in functions):
+            # Function of the data loader given as argument, e.g. df.apply(label_subscriptions, axis=1)
+            if child.id not in visited:
+                visited.add(child.id)
+                column_names |= get_column_names_in_expression(
+                    functions[child.id], functions, visited
+                )
+    return column_names
+
+
+def get_assigned_column(target: ast.AST) -> Optional[str]:
+    """Column assigned by df["column"] = ... or df.loc[..., "column"] = ..."""
+    if not isinstance(target, ast.Subscript):
+        return None
+    index = target.slice
+    if isinstance(index, ast.Tuple) and index.elts:
+        index = index.elts[-1]
+    if isinstance(index, ast.Constant) and isinstance(index.value, str):
+        return index.value
+    return None
+
+
+def get_loader_dependencies(path_to_data_loader: Path) -> Dict[str, Set[str]]:
+    """For each column created or renamed in the data loader, the columns it comes from."""
+    tree = ast.parse(Path(path_to_data_loader).read_text(encoding="utf-8"))
+    functions = {
+        node.name: node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)
+    }
+    dependencies: Dict[str, Set[str]] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and (get_function_name(node) == "rename"):
+            for keyword in node.keywords:
+                if (keyword.arg == "columns") and isinstance(keyword.value, ast.Dict):
+                    for old_name, new_name in zip(
+                        keyword.value.keys, keyword.value.values
+                    ):
+                        if isinstance(old_name, ast.Constant) and isinstance(
+                            new_name, ast.Constant
+                        ):
+                            dependencies.setdefault(str(new_name.value), set()).add(
+                                str(old_name.value)
+                            )
+        elif isinstance(node, ast.Call) and (get_function_name(node) == "assign"):
+            for keyword in node.keywords:
+                if keyword.arg is not None:
+                    dependencies.setdefault(keyword.arg, set()).update(
+                        get_column_names_in_expression(keyword.value, functions, set())
+                    )
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                column = get_assigned_column(target)
+                if column is not None:
+                    dependencies.setdefault(column, set()).update(
+                        get_column_names_in_expression(node.value, functions, set())
+                        - {column}
+                    )
+    return dependencies
+
+
+def get_functions_called(path_to_data_loader: Path) -> Set[str]:
+    tree = ast.parse(Path(path_to_data_loader).read_text(encoding="utf-8"))
+    return {
+        get_function_name(node) for node in ast.walk(tree) if isinstance(node, ast.Call)
+    } - {None}
+
+
+def trace_to_raw_columns(column_names: Set[str], path_to_data_loader: Path) -> Set[str]:
+    """Column names of the MTMC (raw or generic names) from which the columns of the model are computed."""
+    dependencies = get_loader_dependencies(path_to_data_loader)
+    traced_names: Set[str] = set()
+    names_to_trace = list(column_names)
+    while names_to_trace:
+        name = names_to_trace.pop()
+        if name in traced_names:
+            continue
+        traced_names.add(name)
+        names_to_trace.extend(dependencies.get(name, set()) - traced_names)
+    for function_name in get_functions_called(path_to_data_loader):
+        traced_names.update(COLUMNS_USED_BY_FUNCTIONS.get(function_name, []))
+    return traced_names | set(KEY_COLUMNS)
+
+
+def select_columns_of_table(
+    column_names: Set[str], year: int, mtmc_table: str, path_to_mtmc_data: Path
+) -> List[str]:
+    """Names in column_names which can be read from the table, in the order of the raw file.
+    Generic names (e.g. "has_ga") are kept if the columns they stand for are in the table."""
+    table_spec = get_table_spec(year, mtmc_table)
+    header = read_header(
+        get_path_to_raw_file(year, mtmc_table, path_to_mtmc_data), table_spec
+    )
+    position_in_file = {column: position for position, column in enumerate(header)}
+    selected_columns = []
+    for name in column_names:
+        # Only the persons (zp) and households (hh) are read with generic names
+        if mtmc_table in ["zp", "hh"]:
+            raw_columns = get_mzmv_codes([name], year, mtmc_table)
+        else:
+            raw_columns = [name]
+        if all(raw_column in position_in_file for raw_column in raw_columns):
+            selected_columns.append(
+                (min(position_in_file[column] for column in raw_columns), name)
+            )
+    return [name for _, name in sorted(selected_columns)]
+
+
+def get_projected_requests(
+    path_to_model_directory: Path,
+    year: int,
+    mtmc_tables: List[str],
+    path_to_mtmc_data: Path,
+) -> List[Tuple[int, str, List[str]]]:
+    """Requests for load_many (see get_mtmc_files.py) reading only the columns needed by the model.
+    A column found in several tables (e.g. sprache in zp and hh) is read only from the first of mtmc_tables,
+    so that joining the tables does not replace it. The key columns are read from all tables."""
+    path_to_model_directory = Path(path_to_model_directory)
+    column_names = trace_to_raw_columns(
+        get_model_columns(path_to_model_directory),
+        path_to_model_directory / DATA_LOADER_FILE,
+    )
+    requests = []
+    requested_columns: Set[str] = set()
+    for mtmc_table in mtmc_tables:
+        selected_columns = [
+            column
+            for column in select_columns_of_table(
+                column_names, year, mtmc_table, path_to_mtmc_data
+            )
+            if column in KEY_COLUMNS or column not in requested_columns
+        ]
+        requested_columns.update(selected_columns)
+        requests.append((year, mtmc_table, selected_columns))
+    return requests
@@ -0,0 +1,134 @@
+"""Persistent memo of the zones of coordinates, for the point-in-zone queries of a zone service (see zone_service.py).
+
+Households keep the same coordinates for all their members, and often across the years of the MTMC. The coordinates
+are deduplicated before being located, and the zone of each coordinate already located is stored in a memo file
+(NumPy .npz) in the cache directory of the zones. Only the coordinates not seen before go through the
+point-in-polygon test, and the results are broadcast back to the rows.
+The key of a coordinate is its exact pair of values, stored as one complex number (x + 1j * y). The memo stores the
+position of the zone in the zone service (-1 outside of the zones): the attributes of the zones (zone_id, MOBi
+variables) are taken from the zone service. Coordinates with missing values are not stored.
+The new coordinates are kept in memory and written once, by flush (called by the zone services at the end of the
+process, see zone_service.py). flush merges them with the memo file on disk, which may have been extended by other
+processes since it was read, before replacing it. If the memo file cannot be read or written (e.g. read-only cache
+folder), the memo is only kept in memory: flush never raises, as it runs at the end of the process.
+"""
+import threading
+import zipfile
+from pathlib import Path
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.cache_files import write_cache_file
+
+# Position returned for the coordinates not in the memo (-1 means "outside of the zones")
+NOT_IN_MEMO = -2
+
+
+def get_coordinate_keys(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64) + 1j * np.asarray(y, dtype=np.float64)
+
+
+def get_unique_coordinates(
+    x: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Unique keys of the coordinates, and for each row the position of its key in the unique keys."""
+    unique_keys, inverse = np.unique(get_coordinate_keys(x, y), return_inverse=True)
+    return unique_keys, inverse.ravel()
+
+
+def get_first_entries(list_of_keys: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Unique keys of the arrays, and the position of the first entry of each key in the concatenated arrays."""
+    return np.unique(np.concatenate(list_of_keys), return_index=True)
+
+
+def read_memo_file(path_to_memo_file: Optional[Path]) -> Tuple[np.ndarray, np.ndarray]:
+    """Keys and positions of the memo file, empty if there is no file or if it cannot be read."""
+    if path_to_memo_file is not None and Path(path_to_memo_file).exists():
+        try:
+            with np.load(path_to_memo_file) as memo_file:
+                return memo_file["keys"], memo_file["positions"]
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as error:
+            print("The memo file", path_to_memo_file, "could not be read:", error)
+    return np.array([], dtype=np.complex128), np.array([], dtype=np.int64)
+
+
+class CoordinateMemo:
+    def __init__(self, path_to_memo_file: Optional[Path] = None) -> None:
+        """path_to_memo_file: file storing the memo. If None, the memo is only kept in memory."""
+        self.path_to_memo_file = path_to_memo_file
+        self.lock = threading.Lock()
+        self.keys, self.positions = read_memo_file(path_to_memo_file)
+        self.index = pd.Index(self.keys)
+        # Entries added since the memo was read or flushed. Their index (unique keys, with the position of the
+        # first entry of each key) is built again only when looked up after an addition.
+        self.new_keys: List[np.ndarray] = []
+        self.new_positions: List[np.ndarray] = []
+        self.new_index: Optional[pd.Index] = None
+        self.positions_of_new_index = np.array([], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.keys) + sum(len(keys) for keys in self.new_keys)
+
+    def look_up(self, keys: np.ndarray) -> np.ndarray:
+        """Position of the zone of each key, NOT_IN_MEMO for the keys not in the memo."""
+        with self.lock:
+            positions = np.full(len(keys), NOT_IN_MEMO, dtype=np.int64)
+            rows = self.index.get_indexer(keys)
+            positions[rows >= 0] = self.positions[rows[rows >= 0]]
+            if self.new_keys:
+                if self.new_index is None:
+                    new_keys, first_entries = get_first_entries(self.new_keys)
+                    self.new_index = pd.Index(new_keys)
+                    self.positions_of_new_index = np.concatenate(self.new_positions)[
+                        first_entries
+                    ]
+                new_rows = self.new_index.get_indexer(keys)
+                is_new = (rows < 0) & (new_rows >= 0)
+                positions[is_new] = self.positions_of_new_index[new_rows[is_new]]
+            return positions
+
+    def add(self, keys: np.ndarray, positions: np.ndarray) -> None:
+        """Adds the positions of keys not in the memo (see look_up). They are written by flush."""
+        is_valid = np.isfinite(keys)
+        if not is_valid.any():
+            return
+        with self.lock:
+            self.new_keys.append(keys[is_valid])
+            self.new_positions.append(np.asarray(positions, dtype=np.int64)[is_valid])
+            self.new_index = None
+
+    def flush(self) -> None:
+        """Writes the entries added since the last flush, merged with the entries of the memo file on disk.
+        The memo keeps the merged entries, also if the file could not be written: the added entries are then
+        dropped from the entries to write. Does nothing if no entry was added or without memo file."""
+        with self.lock:
+            if not self.new_keys or self.path_to_memo_file is None:
+                return
+            keys_on_disk, positions_on_disk = read_memo_file(self.path_to_memo_file)
+            # The first entry of each key is kept: the file on disk, then the memo
+            keys, first_entries = get_first_entries(
+                [keys_on_disk, self.keys] + self.new_keys
+            )
+            positions = np.concatenate(
+                [positions_on_disk, self.positions] + self.new_positions
+            )[first_entries]
+            self.write(keys, positions)
+            self.keys = keys
+            self.positions = positions
+            self.index = pd.Index(keys)
+            self.new_keys = []
+            self.new_positions = []
+            self.new_index = None
+
+    def write(self, keys: np.ndarray, positions: np.ndarray) -> bool:
+        """Writes the entries to the memo file. Returns False if the file could not be written."""
+
+        def write_entries(path_to_file: Path) -> None:
+            with open(path_to_file, "wb") as memo_file:
+                np.savez(memo_file, keys=keys, positions=positions)
+
+        return write_cache_file(self.path_to_memo_file, write_entries)
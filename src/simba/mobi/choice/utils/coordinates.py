@@ -0,0 +1,50 @@
+"""Projection of coordinates and crow-fly distances on arrays, without geometry objects.
+
+The coordinates of the MTMC (home, work and education places) are in WGS84. Distances are computed in LV95
+(CH1903+, in metres): the coordinates are projected with one batched call of a pyproj Transformer and the distances
+are computed with NumPy, without building GeoDataFrames or Shapely points. The transformers are created once per
+pair of CRS. The axis order is always x, y (longitude, latitude for WGS84), as in geopandas.
+Coordinates with missing values give missing values.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+import pyproj
+
+# Coordinates of the MTMC: WGS84
+MTMC_CRS = "EPSG:4326"
+
+# Projected CRS of the distances: CH1903+ / LV95, in metres
+LV95_CRS = "EPSG:2056"
+
+
+@lru_cache(maxsize=None)
+def get_transformer(source_crs: str, target_crs: str) -> pyproj.Transformer:
+    return pyproj.Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
+
+def project_coordinates(
+    x: np.ndarray,
+    y: np.ndarray,
+    source_crs: str = MTMC_CRS,
+    target_crs: str = LV95_CRS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Coordinates projected from source_crs to target_crs, as arrays of floats."""
+    return get_transformer(source_crs, target_crs).transform(
+        np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    )
+
+
+def get_crow_fly_distances(
+    x_from: np.ndarray,
+    y_from: np.ndarray,
+    x_to: np.ndarray,
+    y_to: np.ndarray,
+    crs: str = MTMC_CRS,
+) -> np.ndarray:
+    """Euclidean distances in LV95 (in metres) between pairs of points, e.g. home and work places.
+    The coordinates of both points are in crs."""
+    x_from, y_from = project_coordinates(x_from, y_from, crs)
+    x_to, y_to = project_coordinates(x_to, y_to, crs)
+    return np.hypot(x_to - x_from, y_to - y_from)
@@ -1,25 +1,32 @@
 from pathlib import Path
 from typing import List
 
-import geopandas
 import pandas as pd
 
+from simba.mobi.choice.utils.coordinates import MTMC_CRS
+from simba.mobi.choice.utils.zone_service import get_zone_service
+from simba.mobi.mzmv.utils_mtmc.loader_telemetry import instrument
 
+
+@instrument()
 def add_mobi_variables(
-    df: pd.DataFrame, path_to_mobi_zones: Path, mobi_variables: List[str]
+    df: pd.DataFrame,
+    path_to_mobi_zones: Path,
+    mobi_variables: List[str],
+    x_variable: str = "W_X",
+    y_variable: str = "W_Y",
+    crs: str = MTMC_CRS,
 ) -> pd.DataFrame:
-    # Add MOBi variables
-    df = geopandas.GeoDataFrame(
-        df, geometry=geopandas.points_from_xy(df.W_X, df.W_Y), crs="epsg:4326"
+    # Add MOBi variables of the zone of the home location (by default the WGS84 coordinates of the MTMC).
+    # Call it on the households, before joining them to the persons: the members of a household share its location.
+    # The zones are projected to CH1903_LV03 and indexed once (see zone_service.py)
+    zone_service = get_zone_service(
+        path_to_mobi_zones, mobi_variables, crs="EPSG:21781"
     )
-    df.to_crs(epsg=21781, inplace=True)
-    # Read the shape file with MOBi variables
-    df_mobi = geopandas.read_file(path_to_mobi_zones, ignore_fields="area_land")
-    df_mobi.to_crs(epsg=21781, inplace=True)  # Define the projection (CH1903_LV03)
-    list_of_variables = mobi_variables + ["geometry"]
-    df = geopandas.sjoin(
-        df, df_mobi[list_of_variables], how="left", predicate="intersects"
+    df_mobi = zone_service.get_attributes(
+        df[x_variable], df[y_variable], mobi_variables, crs=crs
     )
-    # From geodataframe to dataframe
-    df = pd.DataFrame(df.drop(columns=["geometry", "W_X", "W_Y", "index_right"]))
+    df = df.drop(columns=[x_variable, y_variable])
+    for variable in mobi_variables:
+        df[variable] = df_mobi[variable].to_numpy()
     return df
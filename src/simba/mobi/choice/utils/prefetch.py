@@ -0,0 +1,59 @@
+"""Prefetching of the inputs of a data pipeline (zones, skims, typologies, tables of the MTMC) in background threads.
+
+A stage of the pipeline declares the inputs it will need next with prefetcher.prefetch(name, loader, *args).
+They are loaded on a pool of threads while the current stage computes, so that reading files and computing overlap.
+prefetcher.get(name) waits for the input if it is still loading, and returns it. The errors of the loader are raised
+by get. Each input is loaded once: declaring the same name again (e.g. the zones, for the next year) reuses the load.
+The inputs are shared between the stages: copy them before changing them in place.
+Reading and decompressing files (pyarrow, pyogrio, numpy) releases the GIL. Parsers written in Python
+(e.g. openpyxl for the Excel files) overlap less with the computation.
+"""
+import os
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+
+# Reading files is mostly I/O: a few threads are enough
+DEFAULT_MAX_WORKERS = 4
+
+
+class Prefetcher:
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        if max_workers is None:
+            max_workers = min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prefetch"
+        )
+        self.futures: Dict[Hashable, Future] = {}
+
+    def prefetch(
+        self, name: Hashable, loader: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> None:
+        """Starts loading the input in the background: loader(*args, **kwargs). Does nothing if name is declared."""
+        if name not in self.futures:
+            self.futures[name] = self.executor.submit(loader, *args, **kwargs)
+
+    def get(self, name: Hashable) -> Any:
+        """Returns the input, waiting for the end of its load if needed."""
+        if name not in self.futures:
+            raise ValueError(
+                "The input "
+                + str(name)
+                + " has not been declared with prefetch! Declared inputs: "
+                + ", ".join(str(declared_name) for declared_name in self.futures)
+            )
+        return self.futures[name].result()
+
+    def close(self) -> None:
+        """Cancels the loads not started yet and waits for the running ones."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,142 @@
+"""Datasets of several years of the Mobility and Transport Microcensus (MTMC), stored with one file per year.
+
+The datasets of the models (e.g. the persons of the homeoffice model) combine several years of the MTMC.
+Each year is stored as a partition: a CSV file named after the year in the directory of the dataset,
+e.g. input/driving_license/persons/2021.csv, and the types of its columns in a JSON file next to it (2021.dtypes.json),
+so that a stored year is read with the same types as when it was built. Reading the dataset for some years reads the
+partitions of these years, and builds and writes only the missing ones. A new year of the MTMC is processed alone and
+added as a new partition, without changing the partitions of the other years. Delete a partition to build its year
+again.
+The loaders used to store all years in one CSV file (e.g. input15_20_21.csv of the driving licence model). Such a
+file is still used: the missing years it contains are split into partitions (see read_combined_file), instead of being
+built from the raw data. It can be deleted afterwards. Its types are those inferred by pandas, as before.
+"""
+import json
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.cache_files import write_atomically
+
+PARTITION_EXTENSION = ".csv"
+DTYPES_EXTENSION = ".dtypes.json"
+
+
+def get_path_to_partition(path_to_store: Path, year: int) -> Path:
+    return Path(path_to_store) / (str(year) + PARTITION_EXTENSION)
+
+
+def get_path_to_dtypes(path_to_store: Path, year: int) -> Path:
+    return Path(path_to_store) / (str(year) + DTYPES_EXTENSION)
+
+
+def get_stored_years(path_to_store: Path) -> List[int]:
+    """Years with a partition in the store, sorted."""
+    if not Path(path_to_store).is_dir():
+        return []
+    return sorted(
+        int(path_to_partition.stem)
+        for path_to_partition in Path(path_to_store).glob("*" + PARTITION_EXTENSION)
+        if path_to_partition.stem.isdigit()
+    )
+
+
+def write_partition(
+    df: pd.DataFrame, path_to_store: Path, year: int, sep: str = ","
+) -> Path:
+    """Writes the data of one year, and the types of its columns. The types are written first: a partition without
+    types is one of a previous version, read with the types inferred by pandas."""
+    path_to_partition = get_path_to_partition(path_to_store, year)
+    path_to_partition.parent.mkdir(parents=True, exist_ok=True)
+    dtypes = {str(column): str(dtype) for column, dtype in df.dtypes.items()}
+
+    def write_dtypes(path_to_file: Path) -> None:
+        with open(path_to_file, "w") as dtypes_file:
+            json.dump(dtypes, dtypes_file, indent=4)
+
+    write_atomically(get_path_to_dtypes(path_to_store, year), write_dtypes)
+    write_atomically(
+        path_to_partition,
+        lambda path_to_file: df.to_csv(path_to_file, sep=sep, index=False),
+    )
+    return path_to_partition
+
+
+def read_partition(path_to_store: Path, year: int, sep: str = ",") -> pd.DataFrame:
+    """Data of one year, with the types it was written with."""
+    path_to_partition = get_path_to_partition(path_to_store, year)
+    path_to_dtypes = get_path_to_dtypes(path_to_store, year)
+    if not path_to_dtypes.exists():
+        return pd.read_csv(path_to_partition, sep=sep)
+    with open(path_to_dtypes) as dtypes_file:
+        dtypes = json.load(dtypes_file)
+    # The categories (whose values are parsed as strings by read_csv) and the dates are converted after parsing
+    converted_dtypes = {
+        column: dtype
+        for column, dtype in dtypes.items()
+        if dtype == "category" or dtype.startswith("datetime64")
+    }
+    df = pd.read_csv(
+        path_to_partition,
+        sep=sep,
+        dtype={
+            column: dtype
+            for column, dtype in dtypes.items()
+            if column not in converted_dtypes
+        },
+    )
+    return df.astype(converted_dtypes)
+
+
+def read_combined_file(
+    path_to_combined_file: Path, years: Sequence[int], sep: str = ","
+) -> Dict[int, pd.DataFrame]:
+    """Data of the years found in a CSV file of all years (column "year"), as written by the previous versions of
+    the loaders."""
+    df = pd.read_csv(path_to_combined_file, sep=sep)
+    return {
+        year: df[df["year"] == year].reset_index(drop=True)
+        for year in years
+        if (df["year"] == year).any()
+    }
+
+
+def read_years(
+    path_to_store: Path,
+    years: Sequence[int],
+    build_years: Callable[[List[int]], Dict[int, pd.DataFrame]],
+    sep: str = ",",
+    path_to_combined_file: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Data of the years, concatenated in the order of the years.
+    build_years is called once with the years without partition (e.g. a new year of the MTMC), so that their raw
+    tables can be loaded together. It returns the data by year, which is written as new partitions.
+    path_to_combined_file: file of all years of a previous version of the loader. If it exists, the missing years it
+    contains are taken from it, and build_years is called only with the other ones."""
+    stored_years = get_stored_years(path_to_store)
+    missing_years = [year for year in years if year not in stored_years]
+    built_years: Dict[int, pd.DataFrame] = {}
+    if (
+        missing_years
+        and path_to_combined_file is not None
+        and Path(path_to_combined_file).is_file()
+    ):
+        built_years = read_combined_file(path_to_combined_file, missing_years, sep)
+    years_to_build = [year for year in missing_years if year not in built_years]
+    if years_to_build:
+        built_years.update(build_years(years_to_build))
+    list_of_df = []
+    for year in years:
+        if year in missing_years:
+            if year not in built_years:
+                raise ValueError("The data of " + str(year) + " has not been built!")
+            write_partition(built_years[year], path_to_store, year, sep)
+            list_of_df.append(built_years[year])
+        else:
+            list_of_df.append(read_partition(path_to_store, year, sep))
+    return pd.concat(list_of_df, ignore_index=True)
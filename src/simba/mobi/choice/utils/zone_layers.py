@@ -0,0 +1,100 @@
+"""Cache of zone layers (MOBi zones, NPVM zones, public transport quality classes) as GeoParquet files.
+
+Reading a shapefile or a GeoPackage with geopandas.read_file and projecting its polygons with to_crs takes time at
+each call. A zone layer is cached once per source file, target CRS and selected attributes, as a GeoParquet file with
+the projected geometries and only these attributes. Later reads open the small binary file, without parsing and
+projecting again.
+The cache files are keyed by a fingerprint of the zone files (name, size and modification time of the .shp, .dbf,
+... files), the CRS and the attributes, so that a cache file is ignored (and replaced) when the zone file changes.
+The cache files of a zone file are in their own subfolder of the zone cache (see get_cache_directory). A cache file
+that cannot be written is skipped (see cache_files.py). The cache is used only if pyarrow is installed. It can be
+switched off in simba.mobi.mzmv.config (use_zone_cache).
+"""
+import hashlib
+from pathlib import Path
+from typing import List
+from typing import Optional
+
+import geopandas
+
+from simba.mobi.mzmv import config
+from simba.mobi.mzmv.utils_mtmc.cache_files import get_cache_subdirectory
+from simba.mobi.mzmv.utils_mtmc.cache_files import write_cache_file
+
+try:
+    import pyarrow
+except ImportError:  # pyarrow is an optional dependency
+    pyarrow = None
+
+CACHE_FORMAT_VERSION = 1
+
+
+def get_zone_files(path_to_zones: Path) -> List[Path]:
+    """The zone file and its companion files (for a shapefile: .dbf, .shx, .prj, ...)."""
+    path_to_zones = Path(path_to_zones)
+    return sorted(
+        path
+        for path in path_to_zones.parent.glob(path_to_zones.stem + ".*")
+        if path.is_file()
+    )
+
+
+def get_fingerprint(path_to_zones: Path, options: str = "") -> str:
+    """Fingerprint of the zone files, based on their names, sizes and modification times, and on the options
+    (e.g. CRS and attributes) of the cached data."""
+    key = "|".join(
+        [options]
+        + [
+            "{}:{}:{}".format(path.name, path.stat().st_size, path.stat().st_mtime_ns)
+            for path in get_zone_files(path_to_zones)
+        ]
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def get_cache_directory(path_to_zones: Path) -> Path:
+    """Folder of the cache files of the zone file, see cache_files.get_cache_subdirectory."""
+    if config.path_to_zone_cache is None:
+        return Path(path_to_zones).parent / "zone_cache"
+    return get_cache_subdirectory(config.path_to_zone_cache, path_to_zones)
+
+
+def is_layer_cache_enabled() -> bool:
+    return config.use_zone_cache and (pyarrow is not None)
+
+
+def read_zone_layer_from_file(
+    path_to_zones: Path, crs: str, columns: List[str], source_crs: Optional[str]
+) -> geopandas.GeoDataFrame:
+    zones = geopandas.read_file(path_to_zones, columns=columns)
+    zones = zones[columns + [zones.geometry.name]]
+    if source_crs is not None:
+        zones = zones.set_crs(source_crs, allow_override=True)
+    return zones.to_crs(crs)
+
+
+def read_zone_layer(
+    path_to_zones: Path,
+    crs: str,
+    columns: List[str],
+    source_crs: Optional[str] = None,
+) -> geopandas.GeoDataFrame:
+    """Zones of the file with the attributes in columns, projected to crs, from the cache if possible.
+    source_crs: CRS of the file, if not (or wrongly) defined in the file, e.g. "EPSG:2056" for the MOBi zones."""
+    if not is_layer_cache_enabled():
+        return read_zone_layer_from_file(path_to_zones, crs, columns, source_crs)
+    options = "{}|{}|{}|{}".format(
+        CACHE_FORMAT_VERSION, crs, ",".join(columns), source_crs
+    )
+    path_to_cache_file = get_cache_directory(path_to_zones) / "{}_{}.parquet".format(
+        Path(path_to_zones).stem, get_fingerprint(path_to_zones, options)
+    )
+    if path_to_cache_file.exists():
+        return geopandas.read_parquet(path_to_cache_file)
+    zones = read_zone_layer_from_file(path_to_zones, crs, columns, source_crs)
+    # If the cache file cannot be written (e.g. read-only cache folder), the zones are used without cache
+    write_cache_file(
+        path_to_cache_file,
+        lambda path_to_file: zones.to_parquet(path_to_file, index=False),
+    )
+    return zones
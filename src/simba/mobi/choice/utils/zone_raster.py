@@ -0,0 +1,159 @@
+"""Raster of the zones of a zone service, to locate points in the zones by integer arithmetic (see zone_service.py).
+
+The extent of the zones (e.g. Switzerland, in the projected CRS of the zone service) is divided into square cells.
+Each cell stores the position of its zone in the zone service, -1 if the cell is outside of all zones, or
+ON_BOUNDARY if a border of a zone crosses or touches the cell. A point is located by computing its cell and reading
+one value of the raster. Only the points in cells on a border go through the exact point-in-polygon test, so that the
+results are the same as with the exact test (and geopandas.sjoin with the predicate "intersects").
+The raster is built from the borders of the zones: the borders are densified to vertices at most half a cell apart,
+and the cells around each vertex are marked as on a border. The other cells form regions without border, each in one
+zone or outside of the zones: the zone of a region is found by locating the centre of one of its cells.
+The raster is stored as a NumPy .npy file in the cache directory of the zones (see zone_layers.get_cache_directory)
+and memory-mapped, so that only the pages of the cells used are read. If the file cannot be written, the raster is
+only kept in memory. The cell size can be set in simba.mobi.mzmv.config (zone_raster_cell_size).
+"""
+from pathlib import Path
+from typing import Callable
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import shapely
+from scipy import ndimage
+
+from simba.mobi.mzmv.utils_mtmc.cache_files import write_cache_file
+
+# Value of the cells crossed or touched by a border of a zone
+ON_BOUNDARY = -2
+
+
+class ZoneRaster:
+    def __init__(
+        self, cells: np.ndarray, x_min: float, y_min: float, cell_size: float
+    ) -> None:
+        """cells: positions of the zones, one row per band of y and one column per band of x, from (x_min, y_min)."""
+        self.cells = cells
+        self.x_min = x_min
+        self.y_min = y_min
+        self.cell_size = cell_size
+
+    @classmethod
+    def from_geometries(
+        cls,
+        geometries: np.ndarray,
+        cell_size: float,
+        locate_points: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    ) -> "ZoneRaster":
+        """geometries: zones, in the order of their positions. locate_points: exact test of the zone service."""
+        x_min, y_min, shape = get_grid(geometries, cell_size)
+        raster = cls(np.zeros(shape, dtype=np.int32), x_min, y_min, cell_size)
+        # Cells around the vertices of the borders. The vertices of a border are at most half a cell apart:
+        # each point of the border is in the cell of its previous vertex or in a neighbouring cell.
+        on_boundary = np.zeros(shape, dtype=bool)
+        vertices = shapely.get_coordinates(
+            shapely.segmentize(shapely.boundary(geometries), cell_size / 2)
+        )
+        rows, columns, _ = raster.get_cells(vertices[:, 0], vertices[:, 1])
+        on_boundary[rows, columns] = True
+        on_boundary = ndimage.binary_dilation(
+            on_boundary, structure=np.ones((3, 3), dtype=bool)
+        )
+        # Regions of cells without border, connected by their sides: each region is in one zone or outside
+        regions, number_of_regions = ndimage.label(~on_boundary)
+        _, first_cells = np.unique(regions.ravel(), return_index=True)
+        first_rows, first_columns = np.unravel_index(first_cells, shape)
+        positions_of_regions = np.full(number_of_regions + 1, ON_BOUNDARY)
+        positions_of_regions[regions[first_rows, first_columns]] = locate_points(
+            x_min + (first_columns + 0.5) * cell_size,
+            y_min + (first_rows + 0.5) * cell_size,
+        )
+        # Region 0: the cells on a border
+        positions_of_regions[0] = ON_BOUNDARY
+        raster.cells = positions_of_regions[regions].astype(np.int32)
+        return raster
+
+    @classmethod
+    def read(
+        cls, path_to_raster_file: Path, geometries: np.ndarray, cell_size: float
+    ) -> "ZoneRaster":
+        """Raster memory-mapped from the file. The grid is computed again from the geometries."""
+        x_min, y_min, shape = get_grid(geometries, cell_size)
+        cells = np.load(path_to_raster_file, mmap_mode="r")
+        if cells.shape != shape:
+            raise ValueError(
+                "The raster "
+                + str(path_to_raster_file)
+                + " does not match the zones: shape "
+                + str(cells.shape)
+                + " instead of "
+                + str(shape)
+            )
+        return cls(cells, x_min, y_min, cell_size)
+
+    def write(self, path_to_raster_file: Path) -> bool:
+        """Writes the cells to the file. Returns False if the file could not be written."""
+
+        def write_cells(path_to_file: Path) -> None:
+            with open(path_to_file, "wb") as raster_file:
+                np.save(raster_file, np.ascontiguousarray(self.cells))
+
+        return write_cache_file(path_to_raster_file, write_cells)
+
+    def get_cells(
+        self, x: np.ndarray, y: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row and column of the cell of the points in the extent, and for each point whether it is in the extent."""
+        rows = np.floor((y - self.y_min) / self.cell_size)
+        columns = np.floor((x - self.x_min) / self.cell_size)
+        # Points with missing coordinates are not in the extent
+        in_extent = (
+            (rows >= 0)
+            & (rows < self.cells.shape[0])
+            & (columns >= 0)
+            & (columns < self.cells.shape[1])
+        )
+        return (
+            rows[in_extent].astype(np.int64),
+            columns[in_extent].astype(np.int64),
+            in_extent,
+        )
+
+    def look_up(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Position of the zone of each point (coordinates in the CRS of the zones), -1 outside of the zones
+        (also outside of the extent), ON_BOUNDARY for the points needing the exact test."""
+        rows, columns, in_extent = self.get_cells(
+            np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        )
+        positions = np.full(len(in_extent), -1, dtype=np.int64)
+        positions[in_extent] = self.cells[rows, columns]
+        return positions
+
+
+def get_grid(
+    geometries: np.ndarray, cell_size: float
+) -> Tuple[float, float, Tuple[int, int]]:
+    """Origin and shape (rows, columns) of the grid covering the zones. The points on the maximum of the extent are
+    in the last cells."""
+    x_min, y_min, x_max, y_max = shapely.total_bounds(geometries)
+    shape = (
+        int(np.floor((y_max - y_min) / cell_size)) + 1,
+        int(np.floor((x_max - x_min) / cell_size)) + 1,
+    )
+    return float(x_min), float(y_min), shape
+
+
+def get_zone_raster(
+    geometries: np.ndarray,
+    cell_size: float,
+    locate_points: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    path_to_raster_file: Optional[Path] = None,
+) -> ZoneRaster:
+    """Raster of the zones, read from the file if it exists, else built (and written to the file, if given).
+    If the file cannot be written, the raster is kept in memory."""
+    if path_to_raster_file is not None and Path(path_to_raster_file).exists():
+        return ZoneRaster.read(path_to_raster_file, geometries, cell_size)
+    raster = ZoneRaster.from_geometries(geometries, cell_size, locate_points)
+    if path_to_raster_file is not None and raster.write(path_to_raster_file):
+        # Memory-mapped, as when read later
+        return ZoneRaster.read(path_to_raster_file, geometries, cell_size)
+    return raster
@@ -0,0 +1,233 @@
+"""Zones (MOBi zones, NPVM zones) with a spatial index, loaded once and reused for all point-in-zone queries.
+
+A zone service holds the zones of a file (shapefile, GeoPackage), projected to one CRS, with the selected attributes
+(e.g. zone_id or the MOBi variables) and an STRtree of the prepared geometries. Bulk queries locate the points
+(e.g. home or work places, in WGS84) in the zones with one query of the tree, as geopandas.sjoin with the predicate
+"intersects", without building a new spatial index at each call.
+The services are kept in memory for the process (get_zone_service). Later runs read the projected zones from the
+GeoParquet cache (see zone_layers.py), then prepare the geometries and build the tree again, which is fast.
+The zones of the coordinates already located are kept in a memo (see coordinate_memo.py), written at the end of the
+process or by flush_zone_services. Most points are located with a raster of the zones, without point-in-polygon test
+(see zone_raster.py).
+The files of the memos and of the raster are keyed by a fingerprint of the zone files, the CRS and the attributes
+(see zone_layers.py): they are ignored and replaced when the zone file changes.
+The caches and the raster can be switched off in simba.mobi.mzmv.config (use_zone_cache, use_zone_raster).
+"""
+import atexit
+import threading
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import geopandas
+import numpy as np
+import pandas as pd
+import pyproj
+import shapely
+
+from simba.mobi.choice.utils.coordinate_memo import NOT_IN_MEMO
+from simba.mobi.choice.utils.coordinate_memo import CoordinateMemo
+from simba.mobi.choice.utils.coordinate_memo import get_unique_coordinates
+from simba.mobi.choice.utils.coordinates import MTMC_CRS
+from simba.mobi.choice.utils.coordinates import project_coordinates
+from simba.mobi.choice.utils.zone_layers import get_cache_directory
+from simba.mobi.choice.utils.zone_layers import get_fingerprint
+from simba.mobi.choice.utils.zone_layers import read_zone_layer
+from simba.mobi.choice.utils.zone_raster import ON_BOUNDARY
+from simba.mobi.choice.utils.zone_raster import ZoneRaster
+from simba.mobi.choice.utils.zone_raster import get_zone_raster
+from simba.mobi.mzmv import config
+
+CACHE_FORMAT_VERSION = 3
+
+
+class ZoneService:
+    def __init__(
+        self, attributes: pd.DataFrame, tree: shapely.STRtree, crs: str
+    ) -> None:
+        """attributes: one row per zone, in the order of the geometries of the tree."""
+        self.attributes = attributes.reset_index(drop=True)
+        self.tree = tree
+        self.crs = crs
+        # Memos of the zones of the coordinates already located, by CRS of the coordinates (see coordinate_memo.py)
+        self.path_to_memo_files: Optional[Path] = None
+        self.memos: Dict[str, CoordinateMemo] = {}
+        self.memos_lock = threading.Lock()
+        # Raster of the zones, memory-mapped from its own file (see zone_raster.py)
+        self.raster: Optional[ZoneRaster] = None
+
+    @classmethod
+    def from_zones(cls, zones: geopandas.GeoDataFrame) -> "ZoneService":
+        geometries = zones.geometry.to_numpy()
+        # Prepared geometries make the exact point-in-polygon tests faster
+        shapely.prepare(geometries)
+        return cls(
+            pd.DataFrame(zones.drop(columns=zones.geometry.name)),
+            shapely.STRtree(geometries),
+            zones.crs.to_string(),
+        )
+
+    def add_raster(
+        self, cell_size: float, path_to_raster_file: Optional[Path] = None
+    ) -> None:
+        """Adds the raster of the zones, read from the file or built. The CRS of the zones must be projected."""
+        if not self.is_projected:
+            raise ValueError(
+                "A raster of the zones needs a projected CRS, not " + str(self.crs)
+            )
+        self.raster = get_zone_raster(
+            self.tree.geometries,
+            cell_size,
+            self.locate_projected_points,
+            path_to_raster_file,
+        )
+
+    @property
+    def is_projected(self) -> bool:
+        return pyproj.CRS.from_user_input(self.crs).is_projected
+
+    @property
+    def number_of_zones(self) -> int:
+        return len(self.attributes)
+
+    def get_memo(self, crs: str) -> CoordinateMemo:
+        with self.memos_lock:
+            if crs not in self.memos:
+                path_to_memo_file = None
+                if self.path_to_memo_files is not None:
+                    path_to_memo_file = self.path_to_memo_files.with_name(
+                        "{}_{}.memo.npz".format(
+                            self.path_to_memo_files.name, crs.replace(":", "-")
+                        )
+                    )
+                self.memos[crs] = CoordinateMemo(path_to_memo_file)
+            return self.memos[crs]
+
+    def flush(self) -> None:
+        """Writes the coordinates located since the last flush to the memo files (see coordinate_memo.py)."""
+        with self.memos_lock:
+            memos = list(self.memos.values())
+        for memo in memos:
+            memo.flush()
+
+    def get_zone_positions(
+        self, x: pd.Series, y: pd.Series, crs: str = MTMC_CRS
+    ) -> np.ndarray:
+        """Position (row of self.attributes) of the zone of each point, -1 for the points outside of the zones and
+        without valid coordinates. Points on the border of several zones get the first of these zones.
+        Each coordinate is located once: the coordinates are deduplicated, and those already located (in this or
+        a previous run) are taken from the memo."""
+        unique_keys, inverse = get_unique_coordinates(x, y)
+        memo = self.get_memo(crs)
+        positions = memo.look_up(unique_keys)
+        not_in_memo = positions == NOT_IN_MEMO
+        if not_in_memo.any():
+            new_keys = unique_keys[not_in_memo]
+            positions[not_in_memo] = self.locate_points(
+                new_keys.real, new_keys.imag, crs
+            )
+            memo.add(new_keys, positions[not_in_memo])
+        return positions[inverse]
+
+    def locate_points(self, x: np.ndarray, y: np.ndarray, crs: str) -> np.ndarray:
+        """Positions of the zones of the points, see get_zone_positions.
+        The coordinates are projected with a batched transformer (see coordinates.py). With a raster, only the
+        points in cells on a border of a zone go through the exact test (see zone_raster.py)."""
+        x, y = project_coordinates(x, y, crs, self.crs)
+        if self.raster is None:
+            return self.locate_projected_points(x, y)
+        positions = self.raster.look_up(x, y)
+        on_boundary = positions == ON_BOUNDARY
+        if on_boundary.any():
+            positions[on_boundary] = self.locate_projected_points(
+                x[on_boundary], y[on_boundary]
+            )
+        return positions
+
+    def locate_projected_points(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Exact point-in-polygon test with the tree, for coordinates in the CRS of the zones."""
+        points = shapely.points(x, y)
+        points_in_zones, zones_of_points = self.tree.query(
+            points, predicate="intersects"
+        )
+        positions = np.full(len(points), self.number_of_zones, dtype=np.int64)
+        np.minimum.at(positions, points_in_zones, zones_of_points)
+        positions[positions == self.number_of_zones] = -1
+        return positions
+
+    def get_attributes(
+        self,
+        x: pd.Series,
+        y: pd.Series,
+        columns: Optional[List[str]] = None,
+        crs: str = MTMC_CRS,
+    ) -> pd.DataFrame:
+        """Attributes (by default all) of the zone of each point, missing values outside of the zones.
+        The rows are in the order of the points, with a new index 0..n-1."""
+        if columns is None:
+            columns = self.attributes.columns.tolist()
+        positions = self.get_zone_positions(x, y, crs)
+        # The last row, full of missing values, is taken for the points outside of the zones
+        attributes = self.attributes[columns].reindex(
+            np.arange(self.number_of_zones + 1)
+        )
+        return attributes.take(
+            np.where(positions >= 0, positions, self.number_of_zones)
+        ).reset_index(drop=True)
+
+
+# Zone services of the process, by zone file, CRS and attributes
+ZONE_SERVICES: Dict[Tuple[str, str, Tuple[str, ...]], ZoneService] = {}
+ZONE_SERVICES_LOCK = threading.Lock()
+
+
+def flush_zone_services() -> None:
+    """Writes the memos of all zone services of the process. Called at the end of the process."""
+    with ZONE_SERVICES_LOCK:
+        zone_services = list(ZONE_SERVICES.values())
+    for zone_service in zone_services:
+        zone_service.flush()
+
+
+atexit.register(flush_zone_services)
+
+
+def get_path_to_cache_files(path_to_zones: Path, crs: str, columns: List[str]) -> Path:
+    """Path, without suffix, of the files of the memos and of the raster of a zone service."""
+    options = "service|{}|{}|{}".format(CACHE_FORMAT_VERSION, crs, ",".join(columns))
+    return get_cache_directory(path_to_zones) / "{}_{}".format(
+        Path(path_to_zones).stem, get_fingerprint(path_to_zones, options)
+    )
+
+
+def get_zone_service(
+    path_to_zones: Path, columns: List[str], crs: str = "EPSG:2056"
+) -> ZoneService:
+    """Zone service of the zone file, with the attributes in columns and the geometries projected to crs.
+    Built once per process (and, with the cache, once until the zone file changes)."""
+    key = (str(Path(path_to_zones).resolve()), crs, tuple(columns))
+    with ZONE_SERVICES_LOCK:
+        zone_service = ZONE_SERVICES.get(key)
+    if zone_service is None:
+        # Loaded without the lock, so that several zone files can be loaded concurrently (see prefetch.py).
+        # The zones are read from the GeoParquet cache if the layer was already used.
+        zone_service = ZoneService.from_zones(
+            read_zone_layer(path_to_zones, crs, list(columns))
+        )
+        if config.use_zone_cache:
+            zone_service.path_to_memo_files = get_path_to_cache_files(
+                path_to_zones, crs, list(columns)
+            )
+        # The cells of the raster are squares in a projected CRS (e.g. LV95)
+        if config.use_zone_raster and zone_service.is_projected:
+            path_to_raster_file = None
+            if config.use_zone_cache:
+                path_to_raster_file = get_path_to_cache_files(
+                    path_to_zones, crs, list(columns)
+                ).with_suffix(".raster_{:g}m.npy".format(config.zone_raster_cell_size))
+            zone_service.add_raster(config.zone_raster_cell_size, path_to_raster_file)
+        with ZONE_SERVICES_LOCK:
+            zone_service = ZONE_SERVICES.setdefault(key, zone_service)
+    return zone_service
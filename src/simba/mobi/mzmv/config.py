@@ -1,3 +1,40 @@
 from pathlib import Path
+from typing import Optional
 
 path_to_mtmc_data = Path(r"path_to_MZMV")
+
+# Columnar (Parquet) cache of the raw MTMC tables, see utils_mtmc/columnar_cache.py
+use_columnar_cache = True
+# Folder of the cache, outside of the folder of the MTMC data (which may be shared or read-only). Each folder of MTMC
+# data gets its own subfolder. If None, a folder "parquet_cache" is created in the folder of the MTMC data.
+path_to_mtmc_cache: Optional[Path] = (
+    Path.home() / ".cache" / "simba" / "mtmc_parquet_cache"
+)
+
+# Compact types (int8/int16 codes, categories, float64 weights) for the MTMC tables, see utils_mtmc/mtmc_schema.py
+use_compact_dtypes = False
+# Print the memory usage of each table before and after the conversion to compact types
+print_memory_usage = False
+
+# Parser of the raw MTMC files: "pandas" or "pyarrow" (optional, multi-threaded, if installed), see utils_mtmc/arrow_csv.py
+mtmc_csv_engine = "pandas"
+
+# Record the file, rows, columns, time and peak memory of each call of get_zp, get_hh, ..., see utils_mtmc/loader_telemetry.py
+record_loader_telemetry = False
+
+# Caches of the zones, see choice/utils/zone_layers.py and choice/utils/zone_service.py:
+# - use_zone_cache switches off all files of the zone cache: the projected zones (GeoParquet), the memos of the zones
+#   of located coordinates and the zone rasters. Without it, the zones are read from the zone file and the memos and
+#   the raster are only kept in memory, for the current process.
+# - use_zone_raster switches off the raster (in memory and on disk): all points then go through the exact
+#   point-in-polygon test.
+use_zone_cache = True
+# Folder of the cache, outside of the folder of the zones (which may be shared or read-only). Each zone file gets its
+# own subfolder. If None, a folder "zone_cache" is created in the folder of the zone file.
+path_to_zone_cache: Optional[Path] = Path.home() / ".cache" / "simba" / "zone_cache"
+
+# Raster of the zones to locate most points without point-in-polygon test (see use_zone_cache above), see
+# choice/utils/zone_raster.py
+use_zone_raster = True
+# Size of the cells of the raster, in the unit of the CRS of the zones (metres for LV95 and LV03)
+zone_raster_cell_size = 100.0
@@ -14,6 +14,11 @@ from simba.mobi.mzmv.utils2015.compute_confidence_interval import (
 from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hh
 from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_trips_in_switzerland
 from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_zp
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import TripHierarchy
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import add_person_columns
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import aggregate_per_person
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import build_hierarchy
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import select_stages
 
 
 def run_pedestrian_descr_stats(year: int) -> None:
@@ -36,21 +41,24 @@ def results_urban_rural(year: int) -> None:
         "rdist",  # distance
         "e_dauer",  # duration
         "WP",  # weights
+        "WEGNR",  # trip of the segment
     ]
-    walk_etappen = get_and_filter_walk_etappen(year, selected_columns_etappen)
+    walk_etappen = build_hierarchy(
+        get_and_filter_walk_etappen(year, selected_columns_etappen)
+    )
 
     selected_columns_households = ["HHNR", "W_stadt_land_2012"]
     households = get_hh(year, path_to_mtmc_data, selected_columns_households)
-    walk_etappen = pd.merge(walk_etappen, households, on="HHNR", how="left")
+    walk_etappen = add_person_columns(walk_etappen, households)
 
     list_urban_rural: List[str] = []
     list_speeds_per_hour = []
     list_errors = []
 
     for region_code, region_name in [[1, "Urban"], [2, "Intermediary"], [3, "Rural"]]:
-        walk_etappen_region = walk_etappen.loc[
-            walk_etappen["W_stadt_land_2012"] == region_code, :
-        ]
+        walk_etappen_region = select_stages(
+            walk_etappen, walk_etappen.stages["W_stadt_land_2012"] == region_code
+        )
         avg, std = sum_and_average(walk_etappen_region)
         print(f"Average speed, {region_name}: {avg:.2f} (+/- {std:.2f})")
         list_urban_rural.append(str(region_name))
@@ -86,12 +94,15 @@ def results_region(year: int) -> None:
         "rdist",  # distance
         "e_dauer",  # duration
         "WP",  # weights
+        "WEGNR",  # trip of the segment
     ]
-    walk_etappen = get_and_filter_walk_etappen(year, selected_columns_etappen)
+    walk_etappen = build_hierarchy(
+        get_and_filter_walk_etappen(year, selected_columns_etappen)
+    )
 
     selected_columns_households = ["HHNR", "W_REGION"]
     households = get_hh(year, path_to_mtmc_data, selected_columns_households)
-    walk_etappen = pd.merge(walk_etappen, households, on="HHNR", how="left")
+    walk_etappen = add_person_columns(walk_etappen, households)
 
     list_region: List[str] = []
     list_speeds_per_hour = []
@@ -106,9 +117,9 @@ def results_region(year: int) -> None:
         [6, "Zentralschweiz"],
         [7, "Ticino"],
     ]:
-        walk_etappen_region = walk_etappen.loc[
-            walk_etappen["W_REGION"] == region_code, :
-        ]
+        walk_etappen_region = select_stages(
+            walk_etappen, walk_etappen.stages["W_REGION"] == region_code
+        )
         avg, std = sum_and_average(walk_etappen_region)
         print(f"Average speed, {region_name}: {avg:.2f} (+/- {std:.2f})")
         list_region.append(str(region_name))
@@ -145,18 +156,23 @@ def results_sprache(year: int) -> None:
         "rdist",  # distance
         "e_dauer",  # duration
         "WP",  # weights
+        "WEGNR",  # trip of the segment
     ]
-    walk_etappen = get_and_filter_walk_etappen(year, selected_columns_etappen)
+    walk_etappen = build_hierarchy(
+        get_and_filter_walk_etappen(year, selected_columns_etappen)
+    )
 
     selected_columns_households = ["HHNR", "sprache"]
     households = get_hh(year, path_to_mtmc_data, selected_columns_households)
-    walk_etappen = pd.merge(walk_etappen, households, on="HHNR", how="left")
+    walk_etappen = add_person_columns(walk_etappen, households)
 
     list_language = []
     list_speeds_per_hour = []
     list_errors = []
 
-    walk_etappen_german = walk_etappen.loc[walk_etappen["sprache"] == 1, :]
+    walk_etappen_german = select_stages(
+        walk_etappen, walk_etappen.stages["sprache"] == 1
+    )
     language = "German"
     avg, std = sum_and_average(walk_etappen_german)
     print(f"Average speed, {language}: {avg:.2f} (+/- {std:.2f})")
@@ -164,17 +180,23 @@ def results_sprache(year: int) -> None:
     list_speeds_per_hour.append(avg)
     list_errors.append(std)
 
-    walk_etappen_german = walk_etappen.loc[walk_etappen["sprache"] == 2, :]
+    walk_etappen_german = select_stages(
+        walk_etappen, walk_etappen.stages["sprache"] == 2
+    )
     language = "French"
     avg, std = sum_and_average(walk_etappen_german)
     print(f"Average speed, {language}: {avg:.2f} (+/- {std:.2f})")
 
-    walk_etappen_german = walk_etappen.loc[walk_etappen["sprache"] == 3, :]
+    walk_etappen_german = select_stages(
+        walk_etappen, walk_etappen.stages["sprache"] == 3
+    )
     language = "Italian"
     avg, std = sum_and_average(walk_etappen_german)
     print(f"Average speed, {language}: {avg:.2f} (+/- {std:.2f})")
 
-    walk_etappen_german = walk_etappen.loc[walk_etappen["sprache"] != 1, :]
+    walk_etappen_german = select_stages(
+        walk_etappen, walk_etappen.stages["sprache"] != 1
+    )
     language = "Not German"
     avg, std = sum_and_average(walk_etappen_german)
     print(f"Average speed, {language}: {avg:.2f} (+/- {std:.2f})")
@@ -214,19 +236,22 @@ def results_by_daytime(year: int) -> None:
         "WP",  # weights
         "f51100",  # Departure time (in minute after midnight)
         "f51400",  # Arrival time (in minute after midnight)
+        "WEGNR",  # trip of the segment
     ]
-    walk_etappen = get_and_filter_walk_etappen(year, selected_columns_etappen)
+    walk_etappen = build_hierarchy(
+        get_and_filter_walk_etappen(year, selected_columns_etappen)
+    )
 
     list_hours_as_text = []
     list_speeds_per_hour = []
     list_errors = []
     for lower_bound_interval in range(1, 24 * 60, 60 * 3):
         upper_bound_interval = lower_bound_interval + 60 * 3
-        walk_etappen_time_interval = walk_etappen.loc[
-            (walk_etappen["f51100"] >= lower_bound_interval)
-            & (walk_etappen["f51100"] < upper_bound_interval),
-            :,
-        ]
+        walk_etappen_time_interval = select_stages(
+            walk_etappen,
+            (walk_etappen.stages["f51100"] >= lower_bound_interval)
+            & (walk_etappen.stages["f51100"] < upper_bound_interval),
+        )
         hours_as_text = get_hours_as_text(lower_bound_interval, upper_bound_interval)
         avg, std = sum_and_average(walk_etappen_time_interval)
         # print(f"Average speed, {hours_as_text}: {avg:.2f} (+/- {std:.2f})")
@@ -270,11 +295,11 @@ def results_by_daytime(year: int) -> None:
             lower_bound_interval = lower_bound_interval * 60 + 1
         upper_bound_interval = lower_bound_interval + 60 * time_interval_in_hours
         hours_as_text = get_hours_as_text(lower_bound_interval, upper_bound_interval)
-        walk_etappen_time_interval = walk_etappen.loc[
-            (walk_etappen["f51100"] >= lower_bound_interval)
-            & (walk_etappen["f51100"] < upper_bound_interval),
-            :,
-        ]
+        walk_etappen_time_interval = select_stages(
+            walk_etappen,
+            (walk_etappen.stages["f51100"] >= lower_bound_interval)
+            & (walk_etappen.stages["f51100"] < upper_bound_interval),
+        )
         avg, std = sum_and_average(walk_etappen_time_interval)
         print(f"Average speed, {hours_as_text}: {avg:.2f} (+/- {std:.2f})")
 
@@ -289,11 +314,11 @@ def results_by_purpose(year: int) -> None:
         "WP",  # weights
         "WEGNR",  # for merging with the trip dataset
     ]
-    walk_etappen = get_and_filter_walk_etappen(year, selected_columns_etappen)
-
     selected_columns_trips = ["HHNR", "WEGNR", "wzweck1"]
     df_trips = get_trips_in_switzerland(year, path_to_mtmc_data, selected_columns_trips)
-    walk_etappen = pd.merge(walk_etappen, df_trips, on=["HHNR", "WEGNR"], how="left")
+    walk_etappen = build_hierarchy(
+        get_and_filter_walk_etappen(year, selected_columns_etappen), df_trips
+    )
 
     list_purpose: List[str] = []
     list_avg = []
@@ -305,9 +330,9 @@ def results_by_purpose(year: int) -> None:
         [4, "shopping"],
         [8, "leisure"],
     ]:
-        walk_etappen_purpose = walk_etappen.loc[
-            walk_etappen["wzweck1"] == purpose_code, :
-        ]
+        walk_etappen_purpose = select_stages(
+            walk_etappen, walk_etappen.stages["wzweck1"] == purpose_code
+        )
         avg, std = sum_and_average(walk_etappen_purpose)
         print(f"Average speed, {purpose_name}: {avg:.2f} (+/- {std:.2f})")
         if (purpose_code == 4) | (purpose_code == 8):
@@ -315,9 +340,10 @@ def results_by_purpose(year: int) -> None:
             list_avg.append(avg)
             list_std.append(std)
 
-    walk_etappen_work_education = walk_etappen.loc[
-        (walk_etappen["wzweck1"] == 2) | (walk_etappen["wzweck1"] == 3), :
-    ]
+    walk_etappen_work_education = select_stages(
+        walk_etappen,
+        (walk_etappen.stages["wzweck1"] == 2) | (walk_etappen.stages["wzweck1"] == 3),
+    )
     avg, std = sum_and_average(walk_etappen_work_education)
     purpose_name = "work & education"
     print(f"Average speed, {purpose_name}: {avg:.2f} (+/- {std:.2f})")
@@ -346,29 +372,31 @@ def results_by_purpose(year: int) -> None:
 
 
 def results_by_age(year: int) -> None:
-    walk_etappen = get_and_filter_walk_etappen(
-        year,
-        selected_columns=[
-            "f51300",  # transport mode
-            "HHNR",
-            "E_Ausland",  # Is abroad or not
-            "rdist",  # distance
-            "e_dauer",  # duration
-            "WP",  # weights
-            "WEGNR",  # for merging with the trip dataset
-        ],
+    walk_etappen = build_hierarchy(
+        get_and_filter_walk_etappen(
+            year,
+            selected_columns=[
+                "f51300",  # transport mode
+                "HHNR",
+                "E_Ausland",  # Is abroad or not
+                "rdist",  # distance
+                "e_dauer",  # duration
+                "WP",  # weights
+                "WEGNR",  # for merging with the trip dataset
+            ],
+        )
     )
     df_persons = get_zp(year, path_to_mtmc_data, selected_columns=["HHNR", "alter"])
-    walk_etappen = pd.merge(walk_etappen, df_persons, on="HHNR", how="left")
+    walk_etappen = add_person_columns(walk_etappen, df_persons)
 
     list_age_category = []
     list_avg = []
     list_std = []
 
     for upper_bound_age in [17, 24]:
-        walk_etappen_age_category = walk_etappen.loc[
-            walk_etappen["alter"] <= upper_bound_age, :
-        ]
+        walk_etappen_age_category = select_stages(
+            walk_etappen, walk_etappen.stages["alter"] <= upper_bound_age
+        )
         avg, std = sum_and_average(walk_etappen_age_category)
         age_category = f"6-{upper_bound_age} old"
         print(f"Average speed, {age_category}: {avg:.2f} (+/- {std:.2f})")
@@ -378,10 +406,11 @@ def results_by_age(year: int) -> None:
             list_std.append(std)
 
     for lower_age, upper_age in [[18, 24], [25, 64], [65, 74]]:
-        walk_etappen_age_category = walk_etappen.loc[
-            (walk_etappen["alter"] >= lower_age) & (walk_etappen["alter"] <= upper_age),
-            :,
-        ]
+        walk_etappen_age_category = select_stages(
+            walk_etappen,
+            (walk_etappen.stages["alter"] >= lower_age)
+            & (walk_etappen.stages["alter"] <= upper_age),
+        )
         avg, std = sum_and_average(walk_etappen_age_category)
         age_category = f"{lower_age}-{upper_age} old"
         print(f"Average speed, {age_category}: {avg:.2f} (+/- {std:.2f})")
@@ -392,7 +421,9 @@ def results_by_age(year: int) -> None:
             list_avg.append(avg)
             list_std.append(std)
 
-    walk_etappen_75plus = walk_etappen.loc[walk_etappen["alter"] >= 75, :]
+    walk_etappen_75plus = select_stages(
+        walk_etappen, walk_etappen.stages["alter"] >= 75
+    )
     avg, std = sum_and_average(walk_etappen_75plus)
     age_category = "75+ old"
     print(f"Average speed, {age_category}: {avg:.2f} (+/- {std:.2f})")
@@ -427,19 +458,6 @@ def results_by_type_of_trip(year: int) -> None:
     """
 
     # Retrieve and merge data
-    walk_etappen = get_and_filter_walk_etappen(
-        year,
-        selected_columns=[
-            "f51300",  # transport mode
-            "HHNR",
-            "E_Ausland",  # abroad indicator
-            "rdist",  # distance
-            "e_dauer",  # duration
-            "WP",  # weights
-            "WEGNR",  # merging key
-        ],
-    )
-
     df_trips = get_trips_in_switzerland(
         year,
         path_to_mtmc_data,
@@ -453,7 +471,22 @@ def results_by_type_of_trip(year: int) -> None:
     )
 
     # Merge walk_etappen data with trip data
-    walk_etappen = pd.merge(walk_etappen, df_trips, on=["HHNR", "WEGNR"], how="left")
+    walk_etappen = build_hierarchy(
+        get_and_filter_walk_etappen(
+            year,
+            selected_columns=[
+                "f51300",  # transport mode
+                "HHNR",
+                "E_Ausland",  # abroad indicator
+                "rdist",  # distance
+                "e_dauer",  # duration
+                "WP",  # weights
+                "WEGNR",  # merging key
+            ],
+        ),
+        df_trips,
+    )
+    stages = walk_etappen.stages
 
     # Lists to record results for certain trip types (for plotting)
     trip_types = []
@@ -462,14 +495,14 @@ def results_by_type_of_trip(year: int) -> None:
 
     # A helper function to calculate and print the average speed.
     def calc_and_print(
-        df: pd.DataFrame, trip_description: str, include_in_plot: bool = False
+        mask: pd.Series, trip_description: str, include_in_plot: bool = False
     ) -> tuple[float, float]:
         """
-        Computes average and standard deviation using sum_and_average() on the provided dataframe.
+        Computes average and standard deviation using sum_and_average() on the segments selected by the mask.
         Prints the results and, if include_in_plot is True, appends the results to the plot lists.
         Returns the average and standard deviation.
         """
-        avg, std = sum_and_average(df)
+        avg, std = sum_and_average(select_stages(walk_etappen, mask))
         print(f"Average speed, {trip_description}: {avg:.2f} (+/- {std:.2f})")
         if include_in_plot:
             trip_types.append(trip_description)
@@ -479,36 +512,32 @@ def results_by_type_of_trip(year: int) -> None:
 
     # 1. Pure walk trips: 100% walking, trip with more than one segment,
     #    and with hierarchical transport mode=16.
-    walk_trips = walk_etappen.loc[
-        (walk_etappen["wmittel1"] == 16) & (walk_etappen["w_etappen"] > 1)
-    ]
+    walk_trips = (stages["wmittel1"] == 16) & (stages["w_etappen"] > 1)
     calc_and_print(walk_trips, "pure walk trips")
 
     # 2. Round trips: trips with exactly one segment.
-    round_trips = walk_etappen.loc[walk_etappen["w_etappen"] == 1]
+    round_trips = stages["w_etappen"] == 1
     calc_and_print(round_trips, "round trips")
 
     # 3. Trips by public transport: using aggregated transport mode indicator.
-    pt_trips = walk_etappen.loc[walk_etappen["wmittel1a"] == 3]
+    pt_trips = stages["wmittel1a"] == 3
     calc_and_print(pt_trips, "trips by public transport")
 
     # 4. Trips NOT by public transport.
-    non_pt_trips = walk_etappen.loc[walk_etappen["wmittel1a"] != 3]
+    non_pt_trips = stages["wmittel1a"] != 3
     # Append these to the plotting lists.
     calc_and_print(non_pt_trips, "trips NOT by public transport", include_in_plot=True)
 
     # 5. Specific transport modes: "car" (code=8) and "train" (code=2)
     for mode_code, mode_name in ((8, "car"), (2, "train")):
-        mode_trips = walk_etappen.loc[walk_etappen["wmittel1"] == mode_code]
+        mode_trips = stages["wmittel1"] == mode_code
         # Only include the train trips in the bar plot data.
         calc_and_print(
             mode_trips, f"trips by {mode_name}", include_in_plot=(mode_code == 2)
         )
 
     # 6. Non-train public transport: use trips by public transport that are not by train.
-    non_train_pt = walk_etappen.loc[
-        (walk_etappen["wmittel1a"] == 3) & (walk_etappen["wmittel1"] != 2)
-    ]
+    non_train_pt = (stages["wmittel1a"] == 3) & (stages["wmittel1"] != 2)
     calc_and_print(
         non_train_pt, "trips by non-train public transport", include_in_plot=True
     )
@@ -552,23 +581,21 @@ def results_for_full_population(year: int) -> None:
         "WEGNR",  # for merging with the trip datasets later, for detailed analysis
         "f51100",  # Departure time (minutes after midnight)
     ]
-    df_etappen = get_and_filter_etappen(year, selected_columns)
+    df_etappen = build_hierarchy(get_and_filter_etappen(year, selected_columns))
     statistical_basis = len(
-        df_etappen["HHNR"].unique()
+        df_etappen.persons
     )  # Corresponds to the basis in the MTMC main report
     print("Basis:", statistical_basis, "people")
-    walk_etappen = df_etappen.loc[df_etappen["f51300"] == 1, :]
+    walk_etappen = select_stages(df_etappen, df_etappen.stages["f51300"] == 1)
     avg, std = sum_and_average(walk_etappen)
     print(f"Average speed: {avg}, (+/- {std})")
 
 
-def sum_and_average(walk_etappen: pd.DataFrame) -> Tuple[float, float]:
+def sum_and_average(walk_etappen: TripHierarchy) -> Tuple[float, float]:
     # We aggregate the distance and the travel times for each person and compute one speed per person
     # (which is then weighted per person with WP)
-    sum_walk_etappen = (
-        walk_etappen.groupby("HHNR")
-        .agg({"rdist": "sum", "e_dauer": "sum", "WP": "first"})
-        .reset_index()
+    sum_walk_etappen = aggregate_per_person(
+        walk_etappen, {"rdist": "sum", "e_dauer": "sum", "WP": "first"}
     )
     sum_walk_etappen["speed"] = (
         sum_walk_etappen["rdist"] / sum_walk_etappen["e_dauer"] * 60
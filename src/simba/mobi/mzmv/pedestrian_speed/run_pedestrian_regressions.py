@@ -8,6 +8,12 @@ from simba.mobi.mzmv.pedestrian_speed.utils import get_hours_as_text
 from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hh
 from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_trips_in_switzerland
 from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_zp
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import TripHierarchy
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import aggregate_per_person
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import broadcast_to_stages
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import build_hierarchy
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
 
 
 def linear_regression_person(year: int) -> None:
@@ -26,7 +32,7 @@ def linear_regression_person(year: int) -> None:
             "f51400",
         ],
     )
-    speed_person = get_speed(walk_etappen)
+    speed_person = get_speed(build_hierarchy(walk_etappen))
     # -- 2. Merge household and person data --
     speed_person = add_household_and_person_data(speed_person, year)
 
@@ -87,12 +93,6 @@ def linear_regression_trip(year: int) -> None:
         "f51100",
         "f51400",
     ]
-    walk_etappen = get_and_filter_walk_etappen(year, etappen_cols)
-    person_speed = get_speed(walk_etappen)
-    walk_etappen = pd.merge(
-        walk_etappen, person_speed[["HHNR", "speed"]], on="HHNR", how="left"
-    )
-
     # Merge trips data
     df_trips = get_trips_in_switzerland(
         year,
@@ -106,7 +106,14 @@ def linear_regression_trip(year: int) -> None:
             "wzweck1",
         ],
     )
-    walk_etappen = pd.merge(walk_etappen, df_trips, on=["HHNR", "WEGNR"], how="left")
+    hierarchy = build_hierarchy(
+        get_and_filter_walk_etappen(year, etappen_cols), df_trips
+    )
+    person_speed = get_speed(hierarchy)
+    walk_etappen = hierarchy.stages
+    walk_etappen["speed"] = broadcast_to_stages(
+        hierarchy, person_speed["speed"].to_numpy()
+    )
 
     # Merge person and household data
     walk_etappen = add_household_and_person_data(walk_etappen, year)
@@ -163,12 +170,10 @@ def linear_regression_trip(year: int) -> None:
     # print(weighted_result.summary())
 
 
-def get_speed(walk_etappen: pd.DataFrame) -> pd.DataFrame:
+def get_speed(walk_etappen: TripHierarchy) -> pd.DataFrame:
     # Compute speed per person (km/h)
-    person_speed = (
-        walk_etappen.groupby("HHNR")
-        .agg({"rdist": "sum", "e_dauer": "sum", "WP": "first"})
-        .reset_index()
+    person_speed = aggregate_per_person(
+        walk_etappen, {"rdist": "sum", "e_dauer": "sum", "WP": "first"}
     )
     person_speed["speed"] = person_speed["rdist"] / person_speed["e_dauer"] * 60
     return person_speed
@@ -187,7 +192,7 @@ def add_household_and_person_data(
         "nb_of_cars",
     ]
     households = get_hh(year, path_to_mtmc_data, selected_columns=hh_columns)
-    speed_person = pd.merge(speed_person, households, on="HHNR", how="left")
+    speed_person = take_join(speed_person, index_table(households))
 
     zp_columns = [
         "HHNR",
@@ -206,7 +211,7 @@ def add_household_and_person_data(
         "has_driving_licence",
     ]
     df_persons = get_zp(year, path_to_mtmc_data, selected_columns=zp_columns)
-    speed_person = pd.merge(speed_person, df_persons, on="HHNR", how="left")
+    speed_person = take_join(speed_person, index_table(df_persons))
 
     # Piecewise, linear specification for age
     age_breakpoint = 65
@@ -0,0 +1,44 @@
+"""Helpers of the pedestrian speed scripts (descr_stats.py, run_pedestrian_regressions.py), which import them.
+
+The helpers were not in the repository: they are new, written from their use in the scripts.
+Codes of the MTMC used by the filters:
+- f51300 (mode of the trip segment): 1 "Zu Fuss", see dict_detailed_mode2mobi_mode_2015 and
+  dict_detailed_mode2mobi_mode_2021 in utils2015/codes.py and utils2021/codes.py.
+- E_Ausland (trip segment abroad): 1 yes, 2 no. Segments with a missing value are removed (see mtmc_filters.py).
+"""
+from typing import Any
+from typing import List
+
+import pandas as pd
+
+from simba.mobi.mzmv.config import path_to_mtmc_data
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_etappen
+
+
+def get_and_filter_etappen(year: int, selected_columns: List[Any]) -> pd.DataFrame:
+    """Get the trip segments ("Etappen") in Switzerland.
+    The segments abroad (E_Ausland: 1) are removed while reading the file."""
+    return get_etappen(
+        year,
+        path_to_mtmc_data,
+        selected_columns=selected_columns,
+        filters=[("E_Ausland", "!=", 1)],
+    )
+
+
+def get_and_filter_walk_etappen(year: int, selected_columns: List[Any]) -> pd.DataFrame:
+    """Get the walk segments (f51300: 1, "zu Fuss") in Switzerland.
+    Only the walk segments are kept in memory, the other segments are filtered while reading the file."""
+    return get_etappen(
+        year,
+        path_to_mtmc_data,
+        selected_columns=selected_columns,
+        filters=[("f51300", "==", 1), ("E_Ausland", "!=", 1)],
+    )
+
+
+def get_hours_as_text(lower_bound_in_minutes: int, upper_bound_in_minutes: int) -> str:
+    """Transforms an interval in minutes after midnight, starting at minute 1 (e.g. 1-121), into hours (e.g. "0-2")."""
+    lower_bound_in_hours = (lower_bound_in_minutes - 1) // 60
+    upper_bound_in_hours = (upper_bound_in_minutes - 1) // 60
+    return str(lower_bound_in_hours) + "-" + str(upper_bound_in_hours)
@@ -1,17 +1,13 @@
 """Utils package dealing with data of the Mobility and Transport Microcensus (MTMC)."""
 from pathlib import Path
+from typing import Optional
 
 import pandas as pd
 
 
-def add_urban_typology(
-    df: pd.DataFrame, year: int, field_bfs: str = "W_BFS"
-) -> pd.DataFrame:
-    """Add an urban typology from the Federal Statistical Office (FSO) to the dataframe.
-    This typology is called "Stadt/Land-Typologie" in German.
-    More info: https://www.bfs.admin.ch/asset/de/2544676
-    The typology defines three levels (urban, rural and "intermediate").
-    Can be used e.g. with df_zp (with variable "W_BFS" or "A_BFS") or df_hh (with variable "W_BFS" for 2015)."""
+def read_urban_typology(year: int) -> pd.DataFrame:
+    """Urban typology of the communes from the Federal Statistical Office (FSO), with the columns "BFS Gde-nummer"
+    and "urban_typology"."""
     if (year != 2015) & (year != 2020) & (year != 2021):
         raise ValueError("Spatial typology is only available for 2015, 2020 and 2021!")
     path_to_typology = Path(r"path_to_typology")
@@ -26,9 +22,25 @@ def add_urban_typology(
         usecols="A,G",  # Selects only the BFS commune number and the column with the typology
     )
 
-    urban_rural_typology = urban_rural_typology.rename(
+    return urban_rural_typology.rename(
         columns={"Städtische / Ländliche Gebiete": "urban_typology"}
     )
+
+
+def add_urban_typology(
+    df: pd.DataFrame,
+    year: int,
+    field_bfs: str = "W_BFS",
+    urban_rural_typology: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Add an urban typology from the Federal Statistical Office (FSO) to the dataframe.
+    This typology is called "Stadt/Land-Typologie" in German.
+    More info: https://www.bfs.admin.ch/asset/de/2544676
+    The typology defines three levels (urban, rural and "intermediate").
+    Can be used e.g. with df_zp (with variable "W_BFS" or "A_BFS") or df_hh (with variable "W_BFS" for 2015).
+    The typology already read with read_urban_typology can be given, e.g. to add it to the home and work places."""
+    if urban_rural_typology is None:
+        urban_rural_typology = read_urban_typology(year)
     df = pd.merge(
         df,
         urban_rural_typology,
@@ -0,0 +1,189 @@
+"""Multi-threaded parsing of the raw files of the Mobility and Transport Microcensus (MTMC) with Arrow.
+
+pandas.read_csv on a file opened in text mode decodes latin1 in Python and parses on one thread.
+The Arrow CSV reader transcodes latin1 to UTF-8 in bulk and parses blocks of the file on several threads.
+The selection of the columns and the types are given to the reader. The types inferred on the blocks are unified,
+and dates and times are kept as strings, as with pandas.read_csv.
+With filters (see mtmc_filters.py), the file is streamed block by block and only the matching rows of each block are
+kept, so that memory scales with the result, as with the chunks of the pandas engine.
+The engine is optional: it is used if pyarrow is installed and if it is chosen in simba.mobi.mzmv.config
+(mtmc_csv_engine, "pandas" by default).
+"""
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import Filters
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import get_arrow_filter
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import get_filter_columns
+
+try:
+    import pyarrow
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is an optional dependency
+    pyarrow = None
+    pc = None
+    pa_csv = None
+
+# Size of the blocks of the file parsed in parallel
+BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def is_arrow_available() -> bool:
+    return pa_csv is not None
+
+
+def get_arrow_type(column_type: Any) -> Optional[Any]:
+    """Arrow type corresponding to a type given to pandas.read_csv, or None if it is converted after parsing."""
+    if column_type in [int, np.int64, "int64"]:
+        return pyarrow.int64()
+    if column_type in [float, np.float64, "float64"]:
+        return pyarrow.float64()
+    if column_type in [str, "str"]:
+        return pyarrow.string()
+    return None
+
+
+def get_string_types_of_temporal_columns(schema: "pyarrow.Schema") -> Dict[str, Any]:
+    """Arrow infers dates and times (date32, time32) even without timestamp parsers: as pandas.read_csv, they are
+    kept as strings."""
+    return {
+        field.name: pyarrow.string()
+        for field in schema
+        if pyarrow.types.is_temporal(field.type)
+    }
+
+
+def read_filtered_table(
+    path_to_raw_file: Path,
+    read_options: "pa_csv.ReadOptions",
+    parse_options: "pa_csv.ParseOptions",
+    get_convert_options: Callable[[Dict[str, Any]], "pa_csv.ConvertOptions"],
+    column_types: Dict[str, Any],
+    arrow_filter: "pc.Expression",
+) -> Optional["pyarrow.Table"]:
+    """Streams the file block by block and keeps only the rows of each block satisfying the filter, so that memory
+    scales with the result. The types not given are inferred on the first block: returns None if a later block does
+    not fit them (e.g. decimals in a column of integers), the file is then read at once with unified types."""
+
+    def open_reader(column_types: Dict[str, Any]) -> "pa_csv.CSVStreamingReader":
+        return pa_csv.open_csv(
+            path_to_raw_file,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=get_convert_options(column_types),
+        )
+
+    reader = open_reader(column_types)
+    temporal_types = get_string_types_of_temporal_columns(reader.schema)
+    if temporal_types:
+        reader = open_reader({**column_types, **temporal_types})
+    tables = []
+    try:
+        for batch in reader:
+            tables.append(pyarrow.Table.from_batches([batch]).filter(arrow_filter))
+    except pyarrow.ArrowInvalid:
+        return None
+    if not tables:  # No data in the file
+        return reader.schema.empty_table()
+    return pyarrow.concat_tables(tables)
+
+
+def read_csv_with_arrow(
+    path_to_raw_file: Path,
+    delimiter: str = ",",
+    encoding: str = "latin1",
+    usecols: Optional[List[Any]] = None,
+    dtype: Optional[Dict[str, Any]] = None,
+    na_values: Optional[List[str]] = None,
+    names: Optional[List[str]] = None,
+    filters: Optional[Filters] = None,
+) -> pd.DataFrame:
+    """Reads a raw MTMC file with the Arrow CSV reader and returns the same dataframe as pandas.read_csv.
+    names: names of the columns, which replace the header (first line) of the file, as read by
+    mtmc_catalog.read_header. They also give the order of the columns in the file.
+    With filters, only the matching rows are kept."""
+    if not is_arrow_available():
+        raise ImportError("The Arrow CSV engine needs the package pyarrow.")
+    if names is None:
+        raise ValueError(
+            "The Arrow CSV engine needs the names of the columns (see mtmc_catalog.read_header)."
+        )
+    read_options = pa_csv.ReadOptions(
+        encoding=encoding,
+        use_threads=True,
+        block_size=BLOCK_SIZE,
+        column_names=names,
+        skip_rows=1,
+    )
+    parse_options = pa_csv.ParseOptions(delimiter=delimiter)
+    columns_to_parse = None
+    if usecols is not None:
+        columns_to_parse = list(
+            dict.fromkeys(list(usecols) + get_filter_columns(filters))
+        )
+    column_types = {}
+    for column, column_type in (dtype or {}).items():
+        arrow_type = get_arrow_type(column_type)
+        if (arrow_type is not None) and (
+            (columns_to_parse is None) or (column in columns_to_parse)
+        ):
+            column_types[column] = arrow_type
+    # As pandas.read_csv, the values in na_values are added to the default missing values
+    null_values = pa_csv.ConvertOptions().null_values + list(na_values or [])
+
+    def get_convert_options(column_types: Dict[str, Any]) -> "pa_csv.ConvertOptions":
+        return pa_csv.ConvertOptions(
+            include_columns=columns_to_parse,
+            column_types=column_types,
+            null_values=null_values,
+            strings_can_be_null=True,
+            timestamp_parsers=[],
+        )
+
+    def read_table(column_types: Dict[str, Any]) -> "pyarrow.Table":
+        # The types inferred on the blocks of the file are unified, e.g. int64 then float64 or string
+        return pa_csv.read_csv(
+            path_to_raw_file,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=get_convert_options(column_types),
+        )
+
+    table = None
+    if filters:
+        table = read_filtered_table(
+            path_to_raw_file,
+            read_options,
+            parse_options,
+            get_convert_options,
+            column_types,
+            get_arrow_filter(filters),
+        )
+    if table is None:
+        table = read_table(column_types)
+        temporal_types = get_string_types_of_temporal_columns(table.schema)
+        if temporal_types:
+            table = read_table({**column_types, **temporal_types})
+        if filters:
+            table = table.filter(get_arrow_filter(filters))
+    df = table.to_pandas()
+    if usecols is not None:
+        # Columns in the order of the file, as pandas.read_csv does
+        df = df[[column for column in names if column in usecols]]
+    if dtype is not None:
+        df = df.astype(
+            {
+                column: column_type
+                for column, column_type in dtype.items()
+                if column in df.columns
+            }
+        )
+    return df
@@ -0,0 +1,103 @@
+"""Compares the time to parse the raw MTMC files with pandas and with the Arrow CSV engine (see arrow_csv.py).
+
+The columnar cache is not used, so that the raw files are parsed at each run.
+"""
+import time
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import pandas as pd
+
+from simba.mobi.mzmv.config import path_to_mtmc_data
+from simba.mobi.mzmv.utils_mtmc.arrow_csv import is_arrow_available
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import read_raw_csv
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import get_path_to_raw_file
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import get_table_spec
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import read_header
+
+NUMBER_OF_REPETITIONS = 3
+
+
+def parse_raw_file(
+    year: int,
+    mtmc_table: str,
+    path_to_mtmc_data: Path,
+    engine: str,
+    selected_columns: Optional[List[Any]] = None,
+) -> pd.DataFrame:
+    table_spec = get_table_spec(year, mtmc_table)
+    path_to_raw_file = get_path_to_raw_file(year, mtmc_table, path_to_mtmc_data)
+    read_csv_kwargs: Dict[str, Any] = {"delimiter": table_spec.delimiter}
+    if table_spec.na_values is not None:
+        read_csv_kwargs["na_values"] = table_spec.na_values
+    # As in mtmc_catalog.read_mtmc_table
+    read_csv_kwargs["names"] = read_header(path_to_raw_file, table_spec)
+    read_csv_kwargs["header"] = 0
+    return read_raw_csv(
+        path_to_raw_file,
+        usecols=selected_columns,
+        dtype=table_spec.dtype,
+        encoding=table_spec.encoding,
+        engine=engine,
+        **read_csv_kwargs,
+    )
+
+
+def get_best_time(
+    year: int,
+    mtmc_table: str,
+    path_to_mtmc_data: Path,
+    engine: str,
+    selected_columns: Optional[List[Any]] = None,
+) -> float:
+    """Best time in seconds over NUMBER_OF_REPETITIONS runs."""
+    times = []
+    for _ in range(NUMBER_OF_REPETITIONS):
+        start = time.perf_counter()
+        parse_raw_file(year, mtmc_table, path_to_mtmc_data, engine, selected_columns)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark_csv_engines(year: int, path_to_mtmc_data: Path) -> None:
+    if not is_arrow_available():
+        raise ImportError("The benchmark needs the package pyarrow.")
+    benchmarks = [
+        ("etappen", None),
+        ("etappen", ["HHNR", "ETNR", "f51300", "E_Ausland", "rdist"]),
+        ("zp", None),
+        ("zp", ["HHNR", "WP", "alter", "gesl"]),
+    ]
+    for mtmc_table, selected_columns in benchmarks:
+        # Both engines must return the same table, with the same types
+        pd.testing.assert_frame_equal(
+            parse_raw_file(
+                year, mtmc_table, path_to_mtmc_data, "pandas", selected_columns
+            ),
+            parse_raw_file(
+                year, mtmc_table, path_to_mtmc_data, "pyarrow", selected_columns
+            ),
+        )
+        time_pandas = get_best_time(
+            year, mtmc_table, path_to_mtmc_data, "pandas", selected_columns
+        )
+        time_arrow = get_best_time(
+            year, mtmc_table, path_to_mtmc_data, "pyarrow", selected_columns
+        )
+        print(
+            "{} {} ({}): pandas {:.2f} s, pyarrow {:.2f} s, speedup {:.1f}x".format(
+                mtmc_table,
+                year,
+                "all columns" if selected_columns is None else "selected columns",
+                time_pandas,
+                time_arrow,
+                time_pandas / time_arrow,
+            )
+        )
+
+
+if __name__ == "__main__":
+    benchmark_csv_engines(2021, path_to_mtmc_data)
@@ -0,0 +1,67 @@
+"""Writing of the cache files (columnar cache of the MTMC, zone cache, ...) and of the other files read by several
+processes (year partitions of the datasets, shared tables).
+
+A file is written to a temporary file in its folder, then renamed with os.replace, which is atomic: the readers
+(other processes or threads) see the previous file or the complete new one, never a partial file.
+Failure policy: write_atomically removes the temporary file and raises the error to the caller. write_cache_file is
+used for the caches, which only save time: a cache file that cannot be written (e.g. read-only folder, full disk,
+table not convertible) is skipped with a message, and the caller goes on with the data in memory.
+The caches are stored outside of the data folders, in folders of simba.mobi.mzmv.config: get_cache_subdirectory gives
+each data folder or file its own subfolder. The cache files are keyed by a fingerprint of their source files and
+options, which includes the CACHE_FORMAT_VERSION of their module: it is increased when the content of the files
+changes, so that the old files are ignored.
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+try:
+    import pyarrow
+except ImportError:  # pyarrow is an optional dependency
+    pyarrow = None
+
+# Errors of a cache file that cannot be written
+CACHE_WRITE_ERRORS = (OSError, ValueError) + (
+    (pyarrow.ArrowException,) if pyarrow is not None else ()
+)
+
+
+def get_temporary_file(path_to_file: Path) -> Path:
+    """Temporary file in the same folder, unique per process and thread."""
+    return path_to_file.with_name(
+        "{}.{}-{}.tmp".format(path_to_file.name, os.getpid(), threading.get_ident())
+    )
+
+
+def write_atomically(path_to_file: Path, write: Callable[[Path], None]) -> None:
+    """Writes the file with write(path_to_temporary_file), then replaces the file atomically.
+    The folder is created if needed. On error, the temporary file is removed and the error is raised."""
+    path_to_file = Path(path_to_file)
+    path_to_temporary_file = get_temporary_file(path_to_file)
+    try:
+        path_to_file.parent.mkdir(parents=True, exist_ok=True)
+        write(path_to_temporary_file)
+        os.replace(path_to_temporary_file, path_to_file)
+    finally:
+        if path_to_temporary_file.exists():
+            path_to_temporary_file.unlink()
+
+
+def write_cache_file(path_to_cache_file: Path, write: Callable[[Path], None]) -> bool:
+    """Writes a cache file with write_atomically. Returns False if it could not be written."""
+    try:
+        write_atomically(path_to_cache_file, write)
+    except CACHE_WRITE_ERRORS as error:
+        print("The cache file", path_to_cache_file, "could not be written:", error)
+        return False
+    return True
+
+
+def get_cache_subdirectory(path_to_cache: Path, path_to_data: Path) -> Path:
+    """Subfolder of the cache for a data folder or file, named after it and a hash of its absolute path, so that
+    data with the same name in different folders never share cache files."""
+    path_to_data = Path(path_to_data).resolve()
+    key = hashlib.sha1(str(path_to_data).encode("utf-8")).hexdigest()[:16]
+    return Path(path_to_cache) / (path_to_data.name + "_" + key)
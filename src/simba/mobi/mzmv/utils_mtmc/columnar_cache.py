@@ -0,0 +1,314 @@
+"""On-disk columnar cache (Parquet) of the raw tables of the Mobility and Transport Microcensus (MTMC).
+
+The first read of a raw CSV/DAT file parses all its columns and stores them as a Parquet file.
+Later reads only load the requested columns from the Parquet file.
+The integer types of the catalog (see mtmc_catalog.py) are applied to the requested columns only, after loading
+them: a missing value in an integer column fails a read of this column, as without cache, but not the reads of the
+other columns. The other types (e.g. strings) are applied while parsing the raw file.
+The cache files are keyed by year, table and a fingerprint of the raw file (size and modification time),
+so that a cache file is automatically ignored (and replaced) when the raw file changes.
+The cache files are stored outside of the folder of the MTMC data, by default in the user's cache folder
+(~/.cache/simba/mtmc_parquet_cache). The cache files of previous versions, in the folder "parquet_cache" of the MTMC
+data, are not used anymore and can be deleted.
+The cache is used only if pyarrow is installed. It can be switched off or moved in simba.mobi.mzmv.config.
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv import config
+from simba.mobi.mzmv.utils_mtmc.arrow_csv import is_arrow_available
+from simba.mobi.mzmv.utils_mtmc.arrow_csv import read_csv_with_arrow
+from simba.mobi.mzmv.utils_mtmc.cache_files import get_cache_subdirectory
+from simba.mobi.mzmv.utils_mtmc.cache_files import write_cache_file
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import Filters
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import apply_filters
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import check_filters
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import get_arrow_filter
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import get_filter_columns
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is an optional dependency
+    pq = None
+
+# Number of rows parsed at once when filtering a raw file
+CHUNK_SIZE = 100_000
+
+# Arguments of pandas.read_csv that the Arrow CSV engine understands (see arrow_csv.py)
+ARROW_READ_CSV_KWARGS = ["delimiter", "na_values", "names", "header"]
+
+CACHE_FORMAT_VERSION = 2
+
+
+def is_cache_enabled() -> bool:
+    return config.use_columnar_cache and (pq is not None)
+
+
+def get_cache_directory(path_to_mtmc_data: Path) -> Path:
+    """Folder of the cache files of the MTMC data, see cache_files.get_cache_subdirectory."""
+    if config.path_to_mtmc_cache is None:
+        return Path(path_to_mtmc_data) / "parquet_cache"
+    return get_cache_subdirectory(config.path_to_mtmc_cache, path_to_mtmc_data)
+
+
+def get_fingerprint(path_to_raw_file: Path, parser_options: str = "") -> str:
+    """Fingerprint of the raw file, based on its name, size and modification time,
+    and on the options used to parse it."""
+    stat = os.stat(path_to_raw_file)
+    key = "{}|{}|{}|{}|{}".format(
+        CACHE_FORMAT_VERSION,
+        Path(path_to_raw_file).name,
+        stat.st_size,
+        stat.st_mtime_ns,
+        parser_options,
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def get_cache_file(
+    path_to_mtmc_data: Path,
+    year: int,
+    mtmc_table: str,
+    path_to_raw_file: Path,
+    parser_options: str = "",
+) -> Path:
+    fingerprint = get_fingerprint(path_to_raw_file, parser_options)
+    return (
+        get_cache_directory(path_to_mtmc_data)
+        / str(year)
+        / (mtmc_table + "_" + fingerprint + ".parquet")
+    )
+
+
+def read_csv_with_cache(
+    path_to_raw_file: Path,
+    year: int,
+    mtmc_table: str,
+    path_to_mtmc_data: Path,
+    usecols: Optional[List[Any]] = None,
+    dtype: Optional[Dict[str, Any]] = None,
+    encoding: str = "latin1",
+    filters: Optional[Filters] = None,
+    engine: Optional[str] = None,
+    **read_csv_kwargs: Any,
+) -> pd.DataFrame:
+    """Reads a raw MTMC file as pandas.read_csv would, going through the columnar cache if enabled.
+    Only the rows satisfying the filters (see mtmc_filters.py) are returned. They are pushed down to the Parquet
+    reader, or evaluated chunk by chunk while parsing the raw file.
+    The arguments read_csv_kwargs (e.g., delimiter, na_values) are passed to pandas.read_csv.
+    The engine ("pandas" or "pyarrow") parses the raw file. If None, the engine of simba.mobi.mzmv.config is used."""
+    if filters:
+        check_filters(filters)
+    if not is_cache_enabled():
+        return read_raw_csv(
+            path_to_raw_file,
+            usecols=usecols,
+            dtype=dtype,
+            encoding=encoding,
+            filters=filters,
+            engine=engine,
+            **read_csv_kwargs,
+        )
+    # The engine is part of the options: the types inferred by pandas and Arrow may differ
+    parser_options = repr(
+        (
+            sorted((str(k), str(v)) for k, v in (dtype or {}).items()),
+            encoding,
+            sorted((str(k), str(v)) for k, v in read_csv_kwargs.items()),
+            "pyarrow" if use_arrow_engine(engine, read_csv_kwargs) else "pandas",
+        )
+    )
+    path_to_cache_file = get_cache_file(
+        path_to_mtmc_data, year, mtmc_table, path_to_raw_file, parser_options
+    )
+    if not path_to_cache_file.is_file():
+        # First read: all columns are parsed, without the integer types (see apply_dtypes)
+        df = read_raw_csv(
+            path_to_raw_file,
+            dtype=get_parser_dtypes(dtype),
+            encoding=encoding,
+            engine=engine,
+            **read_csv_kwargs,
+        )
+        if not write_table_to_cache(df, path_to_cache_file):
+            # Cache folder not writable or table not convertible: use the parsed data directly
+            if filters:
+                df = apply_filters(df, filters).reset_index(drop=True)
+            if usecols is not None:
+                df = df[select_in_file_order(df.columns.tolist(), usecols)]
+            return apply_dtypes(df, dtype)
+    return read_cache_file(
+        path_to_cache_file, usecols=usecols, dtype=dtype, filters=filters
+    )
+
+
+def read_raw_csv(
+    path_to_raw_file: Path,
+    usecols: Optional[List[Any]] = None,
+    dtype: Optional[Dict[str, Any]] = None,
+    encoding: str = "latin1",
+    filters: Optional[Filters] = None,
+    engine: Optional[str] = None,
+    **read_csv_kwargs: Any,
+) -> pd.DataFrame:
+    if use_arrow_engine(engine, read_csv_kwargs):
+        return read_csv_with_arrow(
+            path_to_raw_file,
+            delimiter=read_csv_kwargs.get("delimiter", ","),
+            encoding=encoding,
+            usecols=usecols,
+            dtype=dtype,
+            na_values=read_csv_kwargs.get("na_values"),
+            names=read_csv_kwargs.get("names"),
+            filters=filters,
+        )
+    if not filters:
+        with open(path_to_raw_file, "r", encoding=encoding) as raw_file:
+            return pd.read_csv(
+                raw_file, usecols=usecols, dtype=dtype, **read_csv_kwargs
+            )
+    # The filters are evaluated chunk by chunk: only the selected rows are kept in memory
+    columns_to_parse = None
+    if usecols is not None:
+        columns_to_parse = list(
+            dict.fromkeys(list(usecols) + get_filter_columns(filters))
+        )
+    chunks = []
+    with open(path_to_raw_file, "r", encoding=encoding) as raw_file:
+        for chunk in pd.read_csv(
+            raw_file,
+            usecols=columns_to_parse,
+            dtype=dtype,
+            chunksize=CHUNK_SIZE,
+            **read_csv_kwargs,
+        ):
+            chunk = apply_filters(chunk, filters)
+            if usecols is not None:
+                chunk = chunk[select_in_file_order(chunk.columns.tolist(), usecols)]
+            chunks.append(chunk)
+    if not chunks:  # No data in the file
+        with open(path_to_raw_file, "r", encoding=encoding) as raw_file:
+            return pd.read_csv(
+                raw_file, usecols=usecols, dtype=dtype, nrows=0, **read_csv_kwargs
+            )
+    return pd.concat(chunks, ignore_index=True)
+
+
+def use_arrow_engine(engine: Optional[str], read_csv_kwargs: Dict[str, Any]) -> bool:
+    """The Arrow CSV engine is used if chosen, if pyarrow is installed and if it supports all arguments.
+    Otherwise, the file is parsed by pandas."""
+    if engine is None:
+        engine = config.mtmc_csv_engine
+    if engine not in ["pandas", "pyarrow"]:
+        raise ValueError(
+            "Unknown engine to parse the MTMC files: "
+            + str(engine)
+            + ". Possible engines: pandas, pyarrow"
+        )
+    if (engine == "pandas") or not is_arrow_available():
+        return False
+    # The Arrow CSV engine needs the names of the columns (see mtmc_catalog.read_header)
+    if ("names" not in read_csv_kwargs) or (read_csv_kwargs.get("header", 0) != 0):
+        return False
+    return all(argument in ARROW_READ_CSV_KWARGS for argument in read_csv_kwargs)
+
+
+def read_cache_file(
+    path_to_cache_file: Path,
+    usecols: Optional[List[Any]] = None,
+    dtype: Optional[Dict[str, Any]] = None,
+    filters: Optional[Filters] = None,
+) -> pd.DataFrame:
+    columns = None
+    if usecols is not None:
+        columns_in_file = pq.read_schema(path_to_cache_file).names
+        columns = select_in_file_order(columns_in_file, usecols)
+    # The filters are pushed down to the Parquet reader (row groups and rows)
+    df = pd.read_parquet(
+        path_to_cache_file,
+        columns=columns,
+        filters=get_arrow_filter(filters) if filters else None,
+    )
+    return apply_dtypes(df, dtype)
+
+
+def is_integer_type(column_type: Any) -> bool:
+    try:
+        return pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(column_type))
+    except TypeError:
+        return False
+
+
+def get_parser_dtypes(dtype: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Types applied while parsing all columns of the raw file for the cache: all types but the integer types,
+    which fail on missing values."""
+    if dtype is None:
+        return None
+    return {
+        column: column_type
+        for column, column_type in dtype.items()
+        if not is_integer_type(column_type)
+    }
+
+
+def apply_dtypes(df: pd.DataFrame, dtype: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """Converts the loaded columns to their types: the integer types, not applied while parsing for the cache, and
+    the types that cannot be stored in Parquet (e.g. np.longdouble)."""
+    if dtype is None:
+        return df
+    return df.astype(
+        {
+            column: column_type
+            for column, column_type in dtype.items()
+            if column in df.columns
+        }
+    )
+
+
+def write_table_to_cache(df: pd.DataFrame, path_to_cache_file: Path) -> bool:
+    """Writes the table in the cache and removes older versions of the same table.
+    Returns False if the cache file could not be written."""
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype == np.longdouble:
+            df[column] = df[column].astype(np.float64)
+    if not write_cache_file(
+        path_to_cache_file,
+        lambda path_to_file: df.to_parquet(path_to_file, index=False),
+    ):
+        return False
+    mtmc_table = path_to_cache_file.name.rsplit("_", 1)[0]
+    for old_cache_file in path_to_cache_file.parent.glob(mtmc_table + "_*.parquet"):
+        if (old_cache_file != path_to_cache_file) and (
+            old_cache_file.name.rsplit("_", 1)[0] == mtmc_table
+        ):
+            try:
+                old_cache_file.unlink()
+            except OSError:
+                pass  # Still in use (e.g. on Windows), will be removed at the next write
+    return True
+
+
+def select_in_file_order(columns_in_file: List[str], usecols: List[Any]) -> List[str]:
+    """Returns the selected columns in the order of the file, as pandas.read_csv does with usecols."""
+    missing_columns = [column for column in usecols if column not in columns_in_file]
+    if missing_columns:
+        raise ValueError(
+            "Usecols do not match columns, columns expected but not found: "
+            + str(missing_columns)
+        )
+    return [column for column in columns_in_file if column in usecols]
+
+
+def clear_cache(path_to_mtmc_data: Path) -> None:
+    """Removes all cache files."""
+    for cache_file in get_cache_directory(path_to_mtmc_data).glob("*/*.parquet"):
+        cache_file.unlink()
@@ -1,377 +1,265 @@
 """Gets the different datasets of the Mobility and Transport Microcensus for given years as dataframes."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
+from typing import Callable
+from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
 
-import numpy as np
 import pandas as pd
 
-from simba.mobi.mzmv.utils2015.codes import dict_mobi_names2mzmv_codes_hh_2015
-from simba.mobi.mzmv.utils2015.codes import dict_mobi_names2mzmv_codes_zp_2015
-from simba.mobi.mzmv.utils2021.codes import dict_mobi_names2mzmv_codes_hh_2021
-from simba.mobi.mzmv.utils2021.codes import dict_mobi_names2mzmv_codes_zp_2021
+from simba.mobi.mzmv.utils_mtmc.lazy_table import LazyTable
+from simba.mobi.mzmv.utils_mtmc.loader_telemetry import instrument
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import read_mtmc_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_codes import get_generic_names
+from simba.mobi.mzmv.utils_mtmc.mtmc_codes import get_mzmv_codes
+from simba.mobi.mzmv.utils_mtmc.mtmc_codes import get_mzmv_filters
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import Filters
+from simba.mobi.mzmv.utils_mtmc.shared_tables import FILE_EXTENSION
+from simba.mobi.mzmv.utils_mtmc.shared_tables import attach_table
+from simba.mobi.mzmv.utils_mtmc.shared_tables import publish_table
 
 
+@instrument("zp")
 def get_zp(
-    year: int, path_to_mtmc_data: Path, selected_columns: Optional[List[Any]] = None
-) -> pd.DataFrame:
-    """Get the data about the persons from the Mobility and Transport Microcensus ("zp": "Zielpersonen" in German)."""
-    if year not in [2005, 2010, 2015, 2020, 2021]:
-        raise ValueError(
-            "Cannot get data for other years than 2005, 2010, 2015, 2020 and 2021! (zp)"
+    year: int,
+    path_to_mtmc_data: Path,
+    selected_columns: Optional[List[Any]] = None,
+    filters: Optional[Filters] = None,
+    lazy: bool = False,
+) -> Union[pd.DataFrame, LazyTable]:
+    """Get the data about the persons from the Mobility and Transport Microcensus ("zp": "Zielpersonen" in German).
+    Filters (see mtmc_filters.py) are applied while reading. They can use generic names (e.g. "has_ga").
+    With lazy=True, returns a lazy handle reading only the columns used (see lazy_table.py)."""
+    if lazy:
+        return LazyTable(
+            get_zp, "zp", year, path_to_mtmc_data, selected_columns, filters
         )
-    # Define file name by year
-    if year == 2005:
-        file_name = "zielpersonen.dat"
-    else:
-        file_name = "zielpersonen.csv"
-    # Define delimiter by year
-    if year == 2005:
-        delimiter = "\t"
-    elif year == 2015:
-        delimiter = ","
-    else:
-        delimiter = ";"
-    with open(
-        path_to_mtmc_data.joinpath(str(year), file_name),
-        "r",
-        encoding="latin1",
-    ) as zielpersonen_file:
-        if selected_columns is None:
-            df_zp = pd.read_csv(
-                zielpersonen_file,
-                delimiter=delimiter,
-                dtype={
-                    "HHNR": int,
-                    "ZIELPNR": int,
-                    "WP": np.longdouble,
-                    "gesl": int,
-                    "nation": int,
-                },
-            )
-            if year == 2020:
-                df_zp.columns.values[
-                    0
-                ] = "HHNR"  # Wrong coding of the first column in the raw data
-        else:
-            selected_columns = get_mzmv_codes(selected_columns, year, "zp")
-            if year == 2020:
-                df_zp = pd.read_csv(zielpersonen_file, delimiter=delimiter)
-                df_zp.columns.values[
-                    0
-                ] = "HHNR"  # Wrong coding of the first column in the raw data
-                df_zp = df_zp[selected_columns]
-            else:
-                df_zp = pd.read_csv(
-                    zielpersonen_file,
-                    delimiter=delimiter,
-                    dtype={
-                        "HHNR": int,
-                        "ZIELPNR": int,
-                        "WP": np.longdouble,
-                        "gesl": int,
-                        "nation": int,
-                    },
-                    usecols=selected_columns,
-                )
-            # If generic names have been used, transform column names back to generic names
-            df_zp = get_generic_names(df_zp, year, "zp")
-    return df_zp
-
-
-def get_generic_names(df_zp: pd.DataFrame, year: int, mtmc_table: str) -> pd.DataFrame:
-    list_of_column_names = df_zp.columns.tolist()
-    if year == 2015:
-        if mtmc_table == "zp":
-            dict_mobi_names2mzmv_codes_2015 = dict_mobi_names2mzmv_codes_zp_2015
-        elif mtmc_table == "hh":
-            dict_mobi_names2mzmv_codes_2015 = dict_mobi_names2mzmv_codes_hh_2015
-        dict_mzmv_codes2mobi_names = {
-            v: k for k, v in dict_mobi_names2mzmv_codes_2015.items()
-        }
-    elif (year == 2020) | (year == 2021):
-        if mtmc_table == "zp":
-            dict_mobi_names2mzmv_codes_2021 = dict_mobi_names2mzmv_codes_zp_2021
-        elif mtmc_table == "hh":
-            dict_mobi_names2mzmv_codes_2021 = dict_mobi_names2mzmv_codes_hh_2021
-        dict_mzmv_codes2mobi_names = {
-            v: k for k, v in dict_mobi_names2mzmv_codes_2021.items()
-        }
-    else:
-        raise ValueError("Year must be 2015, 2020 or 2021.")
-    list_of_column_names = [
-        dict_mzmv_codes2mobi_names.get(item, item) for item in list_of_column_names
-    ]
-    df_zp.columns = pd.Index(list_of_column_names)
-    if (year == 2015) & (mtmc_table == "zp") & ("f40901_02" in list_of_column_names):
-        df_zp = df_zp.rename(
-            columns={
-                "f40900": "full_part_time_job",
-                "f40901_02": "percentage_first_part_time_job",  # only in 2015
-                "f40903": "percentage_second_part_time_job",  # only in 2015
-            }
-        )
-        df_zp["total_work_percentage"] = (
-            (df_zp["full_part_time_job"] == 1) * 100
-            + df_zp["percentage_first_part_time_job"]
-            * (df_zp["percentage_first_part_time_job"] > 0)
-            + df_zp["percentage_second_part_time_job"]
-            * (df_zp["percentage_second_part_time_job"] > 0)
-        )
-        del df_zp["percentage_first_part_time_job"]
-        del df_zp["percentage_second_part_time_job"]
-        del df_zp["full_part_time_job"]
+    filters = get_mzmv_filters(filters, year, "zp")
+    if selected_columns is None:
+        return read_mtmc_table(year, "zp", path_to_mtmc_data, filters=filters)
+    selected_columns = get_mzmv_codes(selected_columns, year, "zp")
+    df_zp = read_mtmc_table(
+        year, "zp", path_to_mtmc_data, selected_columns, filters=filters
+    )
+    # If generic names have been used, transform column names back to generic names
+    df_zp = get_generic_names(df_zp, year, "zp")
     return df_zp
 
 
-def get_mzmv_codes(
-    selected_columns: List[str], year: int, mtmc_table: str
-) -> List[str]:
-    """Translates generic codes (e.g. "has_ga") into the name of the variable in the MTMC, depending on the year.
-    If the original name of the MTMC variable is used, it stays as it is.
-    If a generic name is used, it is replaces by the name of the variable for this year."""
-    if year == 2015:
-        if mtmc_table == "zp":
-            dict_mobi_names2mzmv_codes_2015 = dict_mobi_names2mzmv_codes_zp_2015
-            if "total_work_percentage" in selected_columns:
-                selected_columns.extend(["f40901_02", "f40903", "f40900"])
-                selected_columns.remove("total_work_percentage")
-        elif mtmc_table == "hh":
-            dict_mobi_names2mzmv_codes_2015 = dict_mobi_names2mzmv_codes_hh_2015
-        selected_columns = [
-            dict_mobi_names2mzmv_codes_2015.get(item, item) for item in selected_columns
-        ]
-    elif (year == 2020) | (year == 2021):
-        if mtmc_table == "zp":
-            dict_mobi_names2mzmv_codes_2021 = dict_mobi_names2mzmv_codes_zp_2021
-        elif mtmc_table == "hh":
-            dict_mobi_names2mzmv_codes_2021 = dict_mobi_names2mzmv_codes_hh_2021
-        selected_columns = [
-            dict_mobi_names2mzmv_codes_2021.get(item, item) for item in selected_columns
-        ]
-    return selected_columns
-
-
+@instrument("hh")
 def get_hh(
-    year: int, path_to_mtmc_data: Path, selected_columns: Optional[List[Any]] = None
-) -> pd.DataFrame:
+    year: int,
+    path_to_mtmc_data: Path,
+    selected_columns: Optional[List[Any]] = None,
+    filters: Optional[Filters] = None,
+    lazy: bool = False,
+) -> Union[pd.DataFrame, LazyTable]:
     """Get the data about the households (hh) from the Mobility and Transport Microcensus."""
-    if year not in [2005, 2010, 2015, 2020, 2021]:
-        raise ValueError(
-            "Cannot get data for other years than 2005, 2010, 2015, 2020 and 2021! (zp)"
+    if lazy:
+        return LazyTable(
+            get_hh, "hh", year, path_to_mtmc_data, selected_columns, filters
         )
-    # Define file name by year
-    if year == 2005:
-        file_name = "Haushalte.dat"
-    else:
-        file_name = "haushalte.csv"
-    # Define delimiter by year
-    if year == 2005:
-        delimiter = "\t"
-    elif year == 2015:
-        delimiter = ","
-    else:
-        delimiter = ";"
-    with open(
-        path_to_mtmc_data.joinpath(str(year), file_name),
-        "r",
-        encoding="latin1",
-    ) as haushalte_file:
-        if selected_columns is None:
-            df_hh = pd.read_csv(
-                haushalte_file,
-                delimiter=delimiter,
-                dtype={"ZW2_HNR": str, "ZW3_HNR": str},
-            )
-            if year == 2020:
-                df_hh.columns.values[
-                    0
-                ] = "HHNR"  # Wrong coding of the first column in the raw data
-        else:
-            selected_columns = get_mzmv_codes(selected_columns, year, "hh")
-            if year == 2020:
-                df_hh = pd.read_csv(
-                    haushalte_file,
-                    delimiter=delimiter,
-                    dtype={"ZW2_HNR": str, "ZW3_HNR": str},
-                )
-                df_hh.columns.values[
-                    0
-                ] = "HHNR"  # Wrong coding of the first column in the raw data
-                df_hh = df_hh[selected_columns]
-            else:
-                df_hh = pd.read_csv(
-                    haushalte_file,
-                    delimiter=delimiter,
-                    dtype={"HHNR": int},
-                    usecols=selected_columns,
-                )
-            # If generic names have been used, transform column names back to generic names
-            df_hh = get_generic_names(df_hh, year, "hh")
+    filters = get_mzmv_filters(filters, year, "hh")
+    if selected_columns is None:
+        return read_mtmc_table(year, "hh", path_to_mtmc_data, filters=filters)
+    selected_columns = get_mzmv_codes(selected_columns, year, "hh")
+    df_hh = read_mtmc_table(
+        year, "hh", path_to_mtmc_data, selected_columns, filters=filters
+    )
+    # If generic names have been used, transform column names back to generic names
+    df_hh = get_generic_names(df_hh, year, "hh")
     return df_hh
 
 
+@instrument("hhp")
 def get_hhp(
-    year: int, path_to_mtmc_data: Path, selected_columns: Optional[List[Any]] = None
-) -> pd.DataFrame:
+    year: int,
+    path_to_mtmc_data: Path,
+    selected_columns: Optional[List[Any]] = None,
+    filters: Optional[Filters] = None,
+    lazy: bool = False,
+) -> Union[pd.DataFrame, LazyTable]:
     """Get the data about the persons in the households from the Mobility and Transport Microcensus.
 
     "hhp" stands for the German word "haushaltpersonen".
     """
-    if year not in [2015, 2020, 2021]:
-        raise ValueError(
-            "Cannot get data for other years than 2015, 2020 and 2021! (hhp)"
-        )
-    if year == 2015:
-        delimiter = ","
-    else:
-        delimiter = ";"
-    if (year == 2015) | (year == 2021) | (year == 2020):
-        with open(
-            path_to_mtmc_data.joinpath(str(year), "haushaltspersonen.csv"),
-            "r",
-            encoding="latin1",
-        ) as haushaltspersonen_file:
-            df_hhp = pd.read_csv(
-                haushaltspersonen_file,
-                delimiter=delimiter,
-                dtype={"HHNR": int},
-                usecols=selected_columns,
-            )
-    else:
-        raise ValueError(
-            "Cannot get data for other years than 2015, 2020 and 2021! (hhp)"
+    if lazy:
+        return LazyTable(
+            get_hhp, "hhp", year, path_to_mtmc_data, selected_columns, filters
         )
-    return df_hhp
+    return read_mtmc_table(
+        year, "hhp", path_to_mtmc_data, selected_columns, filters=filters
+    )
 
 
+@instrument("reisenmueb")
 def get_overnight_trips(
-    year: int, path_to_mtmc_data: Path, selected_columns: Optional[List[Any]] = None
-) -> pd.DataFrame:
+    year: int,
+    path_to_mtmc_data: Path,
+    selected_columns: Optional[List[Any]] = None,
+    filters: Optional[Filters] = None,
+    lazy: bool = False,
+) -> Union[pd.DataFrame, LazyTable]:
     """Get the data about the trips with overnight stays from the Mobility and Transport Microcensus."""
-    if year == 2015:
-        with open(
-            path_to_mtmc_data.joinpath("2015", "reisenmueb.csv"),
-            "r",
-            encoding="latin1",
-        ) as trips_with_overnight_file:
-            df_trips_with_overnight = pd.read_csv(
-                trips_with_overnight_file, delimiter=",", usecols=selected_columns
-            )
-    elif year == 2021:
-        with open(
-            path_to_mtmc_data.joinpath("2021", "reisenmueb.csv"),
-            "r",
-            encoding="latin1",
-        ) as trips_with_overnight_file:
-            df_trips_with_overnight = pd.read_csv(
-                trips_with_overnight_file, delimiter=";", usecols=selected_columns
-            )
-    else:
-        raise ValueError(
-            "Cannot get data for other years than 2015 and 2021! (trips with overnight stays) "
+    if lazy:
+        return LazyTable(
+            get_overnight_trips,
+            "reisenmueb",
+            year,
+            path_to_mtmc_data,
+            selected_columns,
+            filters,
         )
-    return df_trips_with_overnight
+    return read_mtmc_table(
+        year, "reisenmueb", path_to_mtmc_data, selected_columns, filters=filters
+    )
 
 
+@instrument("wegeinland")
 def get_trips_in_switzerland(
-    year: int, path_to_mtmc_data: Path, selected_columns: Optional[List[Any]] = None
-) -> pd.DataFrame:
-    if year == 2015:
-        with open(
-            path_to_mtmc_data.joinpath("2015", "wegeinland.csv"),
-            "r",
-            encoding="latin1",
-        ) as trips_in_switzerland_file:
-            df_trips_in_switzerland = pd.read_csv(
-                trips_in_switzerland_file, delimiter=",", usecols=selected_columns
-            )
-    elif year == 2021:
-        with open(
-            path_to_mtmc_data.joinpath("2021", "wegeinland.csv"),
-            "r",
-            encoding="latin1",
-        ) as trips_in_switzerland_file:
-            df_trips_in_switzerland = pd.read_csv(
-                trips_in_switzerland_file, delimiter=";", usecols=selected_columns
-            )
-    else:
-        raise ValueError("Year not well defined")
-    return df_trips_in_switzerland
+    year: int,
+    path_to_mtmc_data: Path,
+    selected_columns: Optional[List[Any]] = None,
+    filters: Optional[Filters] = None,
+    lazy: bool = False,
+) -> Union[pd.DataFrame, LazyTable]:
+    """Get the trips in Switzerland ("Wege Inland").
+    Filters such as [("wzweck1", "==", 4)] are applied while reading (see mtmc_filters.py)."""
+    if lazy:
+        return LazyTable(
+            get_trips_in_switzerland,
+            "wegeinland",
+            year,
+            path_to_mtmc_data,
+            selected_columns,
+            filters,
+        )
+    return read_mtmc_table(
+        year, "wegeinland", path_to_mtmc_data, selected_columns, filters=filters
+    )
 
 
+@instrument("ausgaenge")
 def get_tours(
-    year: int, path_to_mtmc_data: Path, selected_columns: Optional[List[Any]] = None
-) -> pd.DataFrame:
-    if year == 2015:
-        with open(
-            path_to_mtmc_data.joinpath("2015", "ausgaenge.csv"),
-            "r",
-            encoding="latin1",
-        ) as tours_file:
-            df_tours = pd.read_csv(tours_file, delimiter=",", usecols=selected_columns)
-    elif year == 2021:
-        with open(
-            path_to_mtmc_data.joinpath("2021", "ausgaenge.csv"),
-            "r",
-            encoding="latin1",
-        ) as tours_file:
-            df_tours = pd.read_csv(tours_file, delimiter=";", usecols=selected_columns)
-    else:
-        raise ValueError("Year not well defined")
-    return df_tours
+    year: int,
+    path_to_mtmc_data: Path,
+    selected_columns: Optional[List[Any]] = None,
+    filters: Optional[Filters] = None,
+    lazy: bool = False,
+) -> Union[pd.DataFrame, LazyTable]:
+    if lazy:
+        return LazyTable(
+            get_tours, "ausgaenge", year, path_to_mtmc_data, selected_columns, filters
+        )
+    return read_mtmc_table(
+        year, "ausgaenge", path_to_mtmc_data, selected_columns, filters=filters
+    )
 
 
+@instrument("etappen")
 def get_etappen(
-    year: int, path_to_mtmc_data: Path, selected_columns: Optional[List[Any]] = None
-) -> pd.DataFrame:
-    if year == 2021:
-        with open(
-            path_to_mtmc_data.joinpath("2021", "etappen.csv"), "r", encoding="latin1"
-        ) as etappen_file:
-            df_etappen = pd.read_csv(
-                etappen_file,
-                sep=";",
-                dtype={"HHNR": int, "W_AGGLO_GROESSE2012": int},
-                usecols=selected_columns,
-            )
-    elif year == 2015:
-        with open(
-            path_to_mtmc_data.joinpath("2015", "etappen.csv"), "r", encoding="latin1"
-        ) as etappen_file:
-            df_etappen = pd.read_csv(
-                etappen_file,
-                dtype={"HHNR": int, "W_AGGLO_GROESSE2012": int},
-                usecols=selected_columns,
-            )
-    elif year == 2010:
-        with open(
-            path_to_mtmc_data.joinpath("2010", "/etappen.csv"), "r", encoding="latin1"
-        ) as etappen_file:
-            df_etappen = pd.read_csv(
-                etappen_file, sep=";", dtype={"HHNR": int}, usecols=selected_columns
+    year: int,
+    path_to_mtmc_data: Path,
+    selected_columns: Optional[List[Any]] = None,
+    filters: Optional[Filters] = None,
+    lazy: bool = False,
+) -> Union[pd.DataFrame, LazyTable]:
+    """Get the trip segments ("Etappen").
+    Filters such as [("f51300", "==", 1)] (walk only) are applied while reading (see mtmc_filters.py).
+    Only the selected rows are kept in memory.
+    With lazy=True, returns a lazy handle reading only the columns used (see lazy_table.py)."""
+    if lazy:
+        return LazyTable(
+            get_etappen, "etappen", year, path_to_mtmc_data, selected_columns, filters
+        )
+    return read_mtmc_table(
+        year, "etappen", path_to_mtmc_data, selected_columns, filters=filters
+    )
+
+
+# Function reading each table of the MTMC, by name of the table in the catalog (see mtmc_catalog.py)
+MTMC_TABLE_LOADERS: Dict[str, Callable[..., pd.DataFrame]] = {
+    "zp": get_zp,
+    "hh": get_hh,
+    "hhp": get_hhp,
+    "reisenmueb": get_overnight_trips,
+    "wegeinland": get_trips_in_switzerland,
+    "ausgaenge": get_tours,
+    "etappen": get_etappen,
+}
+
+
+def load_many(
+    requests: Sequence[Tuple[int, str, Optional[List[Any]]]],
+    path_to_mtmc_data: Path,
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> Dict[Tuple[int, str], pd.DataFrame]:
+    """Loads several tables of the MTMC concurrently and returns them by (year, table).
+    Each request is (year, table, selected_columns), e.g. (2021, "zp", ["HHNR", "alter"]) or (2015, "hh", None).
+    The files are parsed on a pool of threads (default), or of processes if use_processes is True.
+    Loading several years takes about as long as loading the biggest file."""
+    keys = [(year, mtmc_table) for year, mtmc_table, _ in requests]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Each table can only be requested once per year!")
+    for _, mtmc_table, _ in requests:
+        if mtmc_table not in MTMC_TABLE_LOADERS:
+            raise ValueError(
+                "Unknown table of the MTMC: "
+                + mtmc_table
+                + ". Possible tables: "
+                + ", ".join(MTMC_TABLE_LOADERS)
             )
-    elif year == 2005:
-        with open(
-            path_to_mtmc_data.joinpath("2005", "etappen.dat"), "r", encoding="latin1"
-        ) as etappen_file:
-            df_etappen = pd.read_csv(
-                etappen_file,
-                sep="\t",
-                na_values=" ",
-                dtype={
-                    "HHNR": int,
-                    "ZIELPNR": int,
-                    "E_AUSLAND": int,
-                    "PSEUDO": int,
-                    "F510": int,
-                    "rdist": float,
-                },
-                usecols=selected_columns,
+    if not requests:
+        return {}
+    if max_workers is None:
+        max_workers = min(len(requests), os.cpu_count() or 1)
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        futures = {
+            (year, mtmc_table): executor.submit(
+                MTMC_TABLE_LOADERS[mtmc_table],
+                year,
+                path_to_mtmc_data,
+                selected_columns,
             )
-    else:
-        raise ValueError(
-            "Cannot get data for other years than 2005, 2010, 2015 & 2021! (etappen)"
+            for year, mtmc_table, selected_columns in requests
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
+def publish_mtmc_tables(
+    requests: Sequence[Tuple[int, str, Optional[List[Any]]]],
+    path_to_mtmc_data: Path,
+    path_to_shared_tables: Path,
+) -> Dict[Tuple[int, str], Path]:
+    """Loads tables of the MTMC (see load_many) and publishes them as memory-mapped Arrow files
+    (see shared_tables.py). Returns the path of each file by (year, table).
+    The paths can be given to worker processes, which call attach_mtmc_tables instead of loading the tables again."""
+    mtmc_tables = load_many(requests, path_to_mtmc_data)
+    return {
+        (year, mtmc_table): publish_table(
+            df,
+            Path(path_to_shared_tables).joinpath(
+                mtmc_table + "_" + str(year) + FILE_EXTENSION
+            ),
         )
-    return df_etappen
+        for (year, mtmc_table), df in mtmc_tables.items()
+    }
+
+
+def attach_mtmc_tables(
+    paths_to_shared_tables: Dict[Tuple[int, str], Path]
+) -> Dict[Tuple[int, str], pd.DataFrame]:
+    """Attaches the tables published by publish_mtmc_tables, without copying the numerical columns."""
+    return {
+        key: attach_table(path_to_shared_file)
+        for key, path_to_shared_file in paths_to_shared_tables.items()
+    }
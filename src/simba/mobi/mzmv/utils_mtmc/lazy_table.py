@@ -0,0 +1,131 @@
+"""Lazy handles on the tables of the Mobility and Transport Microcensus (MTMC).
+
+A lazy handle, returned by get_zp(..., lazy=True), get_hh(..., lazy=True), etc., does not read the raw file.
+It records the filters (see mtmc_filters.py) and the selected columns, and reads the file only when data is needed:
+- handle["WP"] returns the column as a series,
+- handle[["WP", "alter"]] and handle.collect() return a dataframe.
+Only the columns used are read, with the filters applied while reading. Declare them before the first access with
+handle.select([...]): the first access then reads all selected columns in one pass over the file. Without selection,
+each access to new columns reads the file again (cheap with the columnar cache enabled). The columns already read
+are kept, so that each column is read once.
+"""
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.mtmc_codes import CODES2GENERIC_NAMES
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import Filters
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import check_filters
+
+
+class LazyTable:
+    def __init__(
+        self,
+        loader: Callable[..., pd.DataFrame],
+        mtmc_table: str,
+        year: int,
+        path_to_mtmc_data: Path,
+        selected_columns: Optional[List[Any]] = None,
+        filters: Optional[Filters] = None,
+    ) -> None:
+        """loader: function reading the table (e.g. get_zp), called with selected_columns and filters."""
+        if filters:
+            check_filters(filters)
+        self.loader = loader
+        self.mtmc_table = mtmc_table
+        self.year = year
+        self.path_to_mtmc_data = path_to_mtmc_data
+        self.selected_columns = (
+            None if selected_columns is None else list(selected_columns)
+        )
+        self.filters = list(filters or [])
+        # Columns already read, in the order of the accesses
+        self.loaded_columns: Dict[str, pd.Series] = {}
+        self.number_of_reads = 0
+
+    def __repr__(self) -> str:
+        return "LazyTable({}, {}, columns={}, filters={}, loaded={})".format(
+            self.mtmc_table,
+            self.year,
+            self.selected_columns,
+            self.filters,
+            list(self.loaded_columns),
+        )
+
+    def filter(self, filters: Filters) -> "LazyTable":
+        """Returns a new handle with additional filters. Nothing is read."""
+        return LazyTable(
+            self.loader,
+            self.mtmc_table,
+            self.year,
+            self.path_to_mtmc_data,
+            self.selected_columns,
+            self.filters + list(filters),
+        )
+
+    def select(self, columns: List[Any]) -> "LazyTable":
+        """Returns a new handle restricted to the columns. Nothing is read."""
+        return LazyTable(
+            self.loader,
+            self.mtmc_table,
+            self.year,
+            self.path_to_mtmc_data,
+            columns,
+            self.filters,
+        )
+
+    def load(self, columns: List[Any]) -> None:
+        """Reads the columns not read yet, in one pass over the file. With a selection of columns, all selected columns
+        not read yet are read at once, so that the file is read once for all accesses."""
+        if self.selected_columns is not None:
+            unknown_columns = [
+                column for column in columns if column not in self.selected_columns
+            ]
+            if unknown_columns:
+                raise ValueError(
+                    "Columns not selected in the lazy table: " + str(unknown_columns)
+                )
+        if all(column in self.loaded_columns for column in columns):
+            return
+        columns_to_read = (
+            columns if self.selected_columns is None else self.selected_columns
+        )
+        missing_columns = [
+            column for column in columns_to_read if column not in self.loaded_columns
+        ]
+        df = self.loader(
+            self.year,
+            self.path_to_mtmc_data,
+            selected_columns=missing_columns,
+            filters=self.filters or None,
+        )
+        self.number_of_reads += 1
+        # Codes of the MTMC are returned under their generic name (e.g. "f41610a" as "has_ga")
+        codes2generic_names = CODES2GENERIC_NAMES.get((self.year, self.mtmc_table), {})
+        for column in missing_columns:
+            self.loaded_columns[column] = df[codes2generic_names.get(column, column)]
+
+    def collect(self) -> pd.DataFrame:
+        """Reads and returns the selected columns (all columns if no selection)."""
+        if self.selected_columns is None:
+            df = self.loader(
+                self.year, self.path_to_mtmc_data, filters=self.filters or None
+            )
+            self.number_of_reads += 1
+            for column in df.columns:
+                self.loaded_columns[column] = df[column]
+            return df
+        return self[self.selected_columns]
+
+    def __getitem__(self, key: Union[str, List[Any]]) -> Union[pd.Series, pd.DataFrame]:
+        if isinstance(key, list):
+            self.load(key)
+            return pd.DataFrame({column: self.loaded_columns[column] for column in key})
+        self.load([key])
+        return self.loaded_columns[key]
@@ -0,0 +1,160 @@
+"""Opt-in measurements of the functions loading data (get_zp, get_hh, get_etappen, spatial joins, ...).
+
+If enabled in simba.mobi.mzmv.config (record_loader_telemetry), each call of an instrumented function records:
+the file read, its size, the number of rows and columns returned, the memory used by the returned table,
+the wall time and the increase of the peak memory (resident set size, RSS) of the process.
+The records can be queried in the process (get_records, get_summary) and written to a JSON file (dump_records).
+The peak memory is measured for the whole process: with concurrent loads (load_many), the increase is attributed
+to the call during which the peak happened. Calls in worker processes are not recorded in the main process.
+"""
+import functools
+import inspect
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import pandas as pd
+
+from simba.mobi.mzmv import config
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import get_path_to_raw_file
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:  # psutil is an optional dependency
+    psutil = None
+
+
+@dataclass(frozen=True)
+class LoadRecord:
+    function: str
+    file: Optional[str]
+    file_bytes: Optional[int]
+    rows: int
+    columns: int
+    memory_bytes: int
+    wall_time_seconds: float
+    # Increase of the peak memory of the process during the call, None if it cannot be measured
+    peak_rss_delta_bytes: Optional[int]
+
+
+records: List[LoadRecord] = []
+records_lock = threading.Lock()
+
+
+def get_peak_rss() -> Optional[int]:
+    """Peak resident set size of the process in bytes, None if it cannot be measured."""
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+    if psutil is not None:
+        memory_info = psutil.Process().memory_info()
+        # Peak working set on Windows
+        return getattr(memory_info, "peak_wset", memory_info.rss)
+    return None
+
+
+def get_path_to_file(
+    arguments: Dict[str, Any], mtmc_table: Optional[str]
+) -> Optional[Path]:
+    if mtmc_table is not None:
+        return get_path_to_raw_file(
+            arguments["year"], mtmc_table, arguments["path_to_mtmc_data"]
+        )
+    for name, value in arguments.items():
+        if name.startswith("path_to_") and isinstance(value, (str, Path)):
+            return Path(value)
+    return None
+
+
+def instrument(mtmc_table: Optional[str] = None) -> Callable:
+    """Decorator recording the calls of a function returning a dataframe, if enabled in the config.
+    mtmc_table: table of the MTMC read by the function (see mtmc_catalog.py). Otherwise, the file is the first
+    argument whose name starts with "path_to_"."""
+
+    def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not config.record_loader_telemetry:
+                return function(*args, **kwargs)
+            arguments = signature.bind(*args, **kwargs).arguments
+            path_to_file = get_path_to_file(arguments, mtmc_table)
+            peak_rss_before = get_peak_rss()
+            start = time.perf_counter()
+            df = function(*args, **kwargs)
+            wall_time = time.perf_counter() - start
+            if not isinstance(df, pd.DataFrame):
+                return df  # Lazy handle (see lazy_table.py): recorded when the data is read
+            peak_rss_after = get_peak_rss()
+            file_bytes = None
+            if (path_to_file is not None) and path_to_file.is_file():
+                file_bytes = path_to_file.stat().st_size
+            record = LoadRecord(
+                function=function.__name__,
+                file=None if path_to_file is None else str(path_to_file),
+                file_bytes=file_bytes,
+                rows=len(df),
+                columns=len(df.columns),
+                memory_bytes=int(df.memory_usage(deep=True).sum()),
+                wall_time_seconds=wall_time,
+                peak_rss_delta_bytes=None
+                if peak_rss_before is None
+                else peak_rss_after - peak_rss_before,
+            )
+            with records_lock:
+                records.append(record)
+            return df
+
+        return wrapper
+
+    return decorator
+
+
+def get_records() -> List[LoadRecord]:
+    with records_lock:
+        return list(records)
+
+
+def clear_records() -> None:
+    with records_lock:
+        records.clear()
+
+
+def get_summary() -> pd.DataFrame:
+    """Number of calls, total wall time, rows and peak memory increase per function, slowest first."""
+    df_records = pd.DataFrame([asdict(record) for record in get_records()])
+    if df_records.empty:
+        return df_records
+    return (
+        df_records.groupby("function")
+        .agg(
+            calls=("function", "size"),
+            wall_time_seconds=("wall_time_seconds", "sum"),
+            rows=("rows", "sum"),
+            memory_bytes=("memory_bytes", "sum"),
+            peak_rss_delta_bytes=("peak_rss_delta_bytes", "sum"),
+        )
+        .sort_values("wall_time_seconds", ascending=False)
+    )
+
+
+def dump_records(path_to_json_file: Path) -> None:
+    """Writes all records to a JSON file (list of objects)."""
+    with open(path_to_json_file, "w", encoding="utf-8") as json_file:
+        json.dump([asdict(record) for record in get_records()], json_file, indent=2)
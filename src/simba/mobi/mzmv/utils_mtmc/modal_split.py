@@ -0,0 +1,225 @@
+"""Weighted modal split of the trips ("wegeinland") or trip segments ("etappen") of the Mobility and Transport
+Microcensus (MTMC), by segment of the population (e.g. year, region, purpose, urban typology).
+
+The modes of the MTMC are recoded into the modes of MOBi (walk, bike, car, ride, pt, other) with the recoding
+tables of utils2015/codes.py and utils2021/codes.py, stored as dense lookup arrays indexed by the code of the MTMC.
+The shares by number of trips, distance and travel time are computed for all segments at once: the weighted sums
+of each pair (segment, mode) are accumulated with one np.bincount per measure, instead of one loop per segment.
+The confidence intervals follow the methodology of the Federal Statistical Office (FSO) used in 2015 for
+percentages (see utils2015/compute_confidence_interval.py), with the number of persons of the segment as basis.
+"""
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv.utils2015.codes import dict_detailed_mode2mobi_mode_2015
+from simba.mobi.mzmv.utils2015.codes import dict_main_mode2mobi_mode_2015
+from simba.mobi.mzmv.utils2015.compute_confidence_interval import MAGIC_NUMBER
+from simba.mobi.mzmv.utils2021.codes import dict_detailed_mode2mobi_mode_2021
+from simba.mobi.mzmv.utils2021.codes import dict_main_mode2mobi_mode_2021
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import load_many
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
+
+MOBI_MODES = ["walk", "bike", "car", "ride", "pt", "other"]
+
+# Z-score for 90% confidence interval, as in utils2015/compute_confidence_interval.py
+Z_SCORE = 1.645
+
+# Column of the mode of the MTMC, by table: main mode of the trip (hierarchical), mode of the trip segment
+MODE_COLUMNS = {"wegeinland": "wmittel1", "etappen": "f51300"}
+
+# Columns of the measures other than the number of trips, by table (dauer2: travel time without waiting times)
+MEASURE_COLUMNS = {
+    "wegeinland": {"distance": "rdist", "time": "dauer2"},
+    "etappen": {"distance": "rdist", "time": "e_dauer"},
+}
+
+# Recoding tables: code of the mode in the MTMC -> mode of MOBi, by year and table
+MODE_RECODING: Dict[Tuple[int, str], Dict[int, str]] = {
+    (2015, "wegeinland"): dict_main_mode2mobi_mode_2015,
+    (2015, "etappen"): dict_detailed_mode2mobi_mode_2015,
+    (2020, "wegeinland"): dict_main_mode2mobi_mode_2021,
+    (2020, "etappen"): dict_detailed_mode2mobi_mode_2021,
+    (2021, "wegeinland"): dict_main_mode2mobi_mode_2021,
+    (2021, "etappen"): dict_detailed_mode2mobi_mode_2021,
+}
+
+
+def get_mode_lookup(recoding: Dict[int, str]) -> Tuple[int, np.ndarray]:
+    """Dense lookup array of a recoding table: lookup[code - smallest_code] is the index of the mode in
+    MOBI_MODES, -1 for the codes not in the table. Returns the smallest code and the array."""
+    smallest_code = min(recoding)
+    lookup = np.full(max(recoding) - smallest_code + 1, -1, dtype=np.int8)
+    for code, mobi_mode in recoding.items():
+        lookup[code - smallest_code] = MOBI_MODES.index(mobi_mode)
+    return smallest_code, lookup
+
+
+# Built once, when the module is imported
+MODE_LOOKUPS: Dict[Tuple[int, str], Tuple[int, np.ndarray]] = {
+    key: get_mode_lookup(recoding) for key, recoding in MODE_RECODING.items()
+}
+
+
+def recode_modes(codes: pd.Series, year: int, mtmc_table: str) -> np.ndarray:
+    """Index in MOBI_MODES of the mode of each trip (or trip segment), from the code of the mode in the MTMC."""
+    if (year, mtmc_table) not in MODE_LOOKUPS:
+        raise ValueError(
+            "No recoding of the modes for the table "
+            + mtmc_table
+            + " in "
+            + str(year)
+            + "!"
+        )
+    smallest_code, lookup = MODE_LOOKUPS[(year, mtmc_table)]
+    positions = codes.to_numpy(dtype=np.int64) - smallest_code
+    in_range = (positions >= 0) & (positions < len(lookup))
+    modes = np.where(in_range, lookup[np.where(in_range, positions, 0)], -1)
+    if (modes < 0).any():
+        unknown_codes = np.unique(codes.to_numpy()[modes < 0])
+        raise ValueError(
+            "Unknown codes of the mode in " + str(year) + ": " + str(unknown_codes)
+        )
+    return modes
+
+
+def get_mobi_modes(
+    df: pd.DataFrame, mtmc_table: str, year: Optional[int] = None
+) -> np.ndarray:
+    """Index in MOBI_MODES of the mode (MODE_COLUMNS) of each row of df. The codes of the modes are those of the year,
+    or of the column "year" of df if year is None (several years of the MTMC)."""
+    mode_column = MODE_COLUMNS[mtmc_table]
+    if year is not None:
+        return recode_modes(df[mode_column], year, mtmc_table)
+    modes = np.empty(len(df), dtype=np.int8)
+    years = df["year"].to_numpy()
+    for year_of_data in np.unique(years):
+        is_year = years == year_of_data
+        modes[is_year] = recode_modes(
+            df.loc[is_year, mode_column], int(year_of_data), mtmc_table
+        )
+    return modes
+
+
+def get_non_negative_values(series: pd.Series) -> np.ndarray:
+    """Values of the column, with 0 for the missing values and the negative codes of the MTMC (no answer, ...)."""
+    values = series.to_numpy(dtype=np.float64, na_value=0.0)
+    return np.where(values > 0, values, 0.0)
+
+
+def get_modal_split(
+    df: pd.DataFrame,
+    mtmc_table: str,
+    segment_columns: Optional[List[str]] = None,
+    year: Optional[int] = None,
+    weights: str = "WP",
+    measure_columns: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """Modal split of the trips (mtmc_table "wegeinland") or trip segments ("etappen") in df, by segment.
+    df contains HHNR, the mode of the MTMC (MODE_COLUMNS), the weights, the measures (MEASURE_COLUMNS, unless given
+    in measure_columns) and the segment columns (e.g. ["year", "W_REGION"]). The codes of the modes are those of
+    the year, or of the column "year" of df if year is None (several years of the MTMC).
+    Returns one row per segment and mode of MOBi, with the share and the confidence interval (FSO) of each measure
+    ("trips", "distance", "time"), e.g. share_distance and confidence_interval_distance, and the number of
+    persons (nb_of_obs) in the segment."""
+    if segment_columns is None:
+        segment_columns = []
+    if measure_columns is None:
+        measure_columns = MEASURE_COLUMNS[mtmc_table]
+    modes = get_mobi_modes(df, mtmc_table, year)
+    # Index of the segment of each row, sorted by segment. Rows with a missing segment value are ignored (-1).
+    if segment_columns:
+        grouped = df.groupby(segment_columns, sort=True)
+        segment_ids = grouped.ngroup().to_numpy(dtype=np.float64, na_value=-1.0)
+        segment_ids = segment_ids.astype(np.int64)
+        df_segments = grouped.size().index.to_frame(index=False)
+    else:
+        segment_ids = np.zeros(len(df), dtype=np.int64)
+        df_segments = pd.DataFrame(index=[0])
+    in_segment = segment_ids >= 0
+    segment_ids = segment_ids[in_segment]
+    modes = modes[in_segment]
+    number_of_segments = len(df_segments)
+    number_of_modes = len(MOBI_MODES)
+    bins = segment_ids * number_of_modes + modes
+    # Number of persons per segment: basis of the confidence intervals
+    hhnr = df["HHNR"].to_numpy(dtype=np.int64)[in_segment]
+    number_of_hhnr = int(hhnr.max(initial=0)) + 1
+    segments_of_persons = (
+        np.unique(segment_ids * number_of_hhnr + hhnr) // number_of_hhnr
+    )
+    nb_of_obs = np.bincount(segments_of_persons, minlength=number_of_segments)
+    df_modal_split = df_segments.loc[
+        np.repeat(np.arange(number_of_segments), number_of_modes), segment_columns
+    ].reset_index(drop=True)
+    df_modal_split["mode"] = np.tile(MOBI_MODES, number_of_segments)
+    # Missing weights count as 0. Missing measures and the negative codes of the MTMC (-99, -98, -97) count as 0.
+    weights_of_rows = df[weights].to_numpy(dtype=np.float64, na_value=0.0)[in_segment]
+    measures = {"trips": weights_of_rows}
+    for measure, column in measure_columns.items():
+        measures[measure] = (
+            weights_of_rows * get_non_negative_values(df[column])[in_segment]
+        )
+    for measure, weighted_values in measures.items():
+        sums = np.bincount(
+            bins,
+            weights=weighted_values,
+            minlength=number_of_segments * number_of_modes,
+        ).reshape(number_of_segments, number_of_modes)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shares = sums / sums.sum(axis=1, keepdims=True)
+            confidence_intervals = (
+                Z_SCORE
+                * MAGIC_NUMBER
+                * np.sqrt(shares * (1.0 - shares) / nb_of_obs[:, np.newaxis])
+            )
+        df_modal_split["share_" + measure] = shares.ravel()
+        df_modal_split["confidence_interval_" + measure] = confidence_intervals.ravel()
+    df_modal_split["nb_of_obs"] = np.repeat(nb_of_obs, number_of_modes)
+    return df_modal_split
+
+
+def get_modal_split_of_years(
+    years: Sequence[int],
+    path_to_mtmc_data: Path,
+    segment_columns: Optional[List[str]] = None,
+    household_columns: Optional[List[str]] = None,
+    mtmc_table: str = "wegeinland",
+) -> pd.DataFrame:
+    """Modal split of several years of the MTMC, by year and segment (see get_modal_split).
+    The tables of all years are loaded concurrently (see load_many). The segments are given by columns of the
+    table in segment_columns (e.g. "wzweck1") and by columns of the households in household_columns
+    (e.g. "W_REGION" or "W_stadt_land_2012"), joined to the trips."""
+    if segment_columns is None:
+        segment_columns = []
+    if household_columns is None:
+        household_columns = []
+    selected_columns = list(
+        dict.fromkeys(
+            ["HHNR", "WP", MODE_COLUMNS[mtmc_table]]
+            + list(MEASURE_COLUMNS[mtmc_table].values())
+            + segment_columns
+        )
+    )
+    requests = [(year, mtmc_table, selected_columns) for year in years]
+    if household_columns:
+        requests += [(year, "hh", ["HHNR"] + household_columns) for year in years]
+    mtmc_tables = load_many(requests, path_to_mtmc_data)
+    list_of_df = []
+    for year in years:
+        df = mtmc_tables[(year, mtmc_table)]
+        if household_columns:
+            df = take_join(df, index_table(mtmc_tables[(year, "hh")]))
+        list_of_df.append(df.assign(year=year))
+    return get_modal_split(
+        pd.concat(list_of_df, ignore_index=True),
+        mtmc_table,
+        ["year"] + segment_columns + household_columns,
+    )
@@ -0,0 +1,159 @@
+"""Catalog of the raw files of the Mobility and Transport Microcensus (MTMC), by year and table.
+
+Each entry describes how to read one raw file: file name, delimiter, encoding, types of the columns and fixes
+of the header. A new year of the MTMC only needs new entries in MTMC_CATALOG.
+The tables are: "zp" (Zielpersonen), "hh" (Haushalte), "hhp" (Haushaltspersonen), "etappen",
+"wegeinland" (trips in Switzerland), "ausgaenge" (tours) and "reisenmueb" (trips with overnight stays).
+"""
+import csv
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv import config
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import read_csv_with_cache
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import Filters
+from simba.mobi.mzmv.utils_mtmc.mtmc_schema import compact_dtypes
+
+
+@dataclass(frozen=True)
+class MTMCTable:
+    file_name: str
+    delimiter: str
+    encoding: str = "latin1"
+    dtype: Dict[str, Any] = field(default_factory=dict)
+    na_values: Optional[List[str]] = None
+    # Name replacing the (wrongly coded) name of the first column in the header of the raw file
+    first_column_name: Optional[str] = None
+
+
+DTYPE_ZP = {
+    "HHNR": int,
+    "ZIELPNR": int,
+    "WP": np.float64,
+    "gesl": int,
+    "nation": int,
+}
+DTYPE_HH = {"HHNR": int, "ZW2_HNR": str, "ZW3_HNR": str}
+# The raw tables of 2020 were read without types, except the numbers of the secondary residences (ZW2_HNR, ZW3_HNR)
+DTYPE_HH_2020 = {"ZW2_HNR": str, "ZW3_HNR": str}
+DTYPE_HHP = {"HHNR": int}
+DTYPE_ETAPPEN = {"HHNR": int, "W_AGGLO_GROESSE2012": int}
+
+MTMC_CATALOG = {
+    (2005, "zp"): MTMCTable("zielpersonen.dat", "\t", dtype=DTYPE_ZP),
+    (2010, "zp"): MTMCTable("zielpersonen.csv", ";", dtype=DTYPE_ZP),
+    (2015, "zp"): MTMCTable("zielpersonen.csv", ",", dtype=DTYPE_ZP),
+    (2020, "zp"): MTMCTable("zielpersonen.csv", ";", first_column_name="HHNR"),
+    (2021, "zp"): MTMCTable("zielpersonen.csv", ";", dtype=DTYPE_ZP),
+    (2005, "hh"): MTMCTable("Haushalte.dat", "\t", dtype=DTYPE_HH),
+    (2010, "hh"): MTMCTable("haushalte.csv", ";", dtype=DTYPE_HH),
+    (2015, "hh"): MTMCTable("haushalte.csv", ",", dtype=DTYPE_HH),
+    (2020, "hh"): MTMCTable(
+        "haushalte.csv", ";", dtype=DTYPE_HH_2020, first_column_name="HHNR"
+    ),
+    (2021, "hh"): MTMCTable("haushalte.csv", ";", dtype=DTYPE_HH),
+    (2015, "hhp"): MTMCTable("haushaltspersonen.csv", ",", dtype=DTYPE_HHP),
+    (2020, "hhp"): MTMCTable("haushaltspersonen.csv", ";", dtype=DTYPE_HHP),
+    (2021, "hhp"): MTMCTable("haushaltspersonen.csv", ";", dtype=DTYPE_HHP),
+    (2005, "etappen"): MTMCTable(
+        "etappen.dat",
+        "\t",
+        dtype={
+            "HHNR": int,
+            "ZIELPNR": int,
+            "E_AUSLAND": int,
+            "PSEUDO": int,
+            "F510": int,
+            "rdist": float,
+        },
+        na_values=[" "],
+    ),
+    (2010, "etappen"): MTMCTable("etappen.csv", ";", dtype={"HHNR": int}),
+    (2015, "etappen"): MTMCTable("etappen.csv", ",", dtype=DTYPE_ETAPPEN),
+    (2021, "etappen"): MTMCTable("etappen.csv", ";", dtype=DTYPE_ETAPPEN),
+    (2015, "wegeinland"): MTMCTable("wegeinland.csv", ","),
+    (2021, "wegeinland"): MTMCTable("wegeinland.csv", ";"),
+    (2015, "ausgaenge"): MTMCTable("ausgaenge.csv", ","),
+    (2021, "ausgaenge"): MTMCTable("ausgaenge.csv", ";"),
+    (2015, "reisenmueb"): MTMCTable("reisenmueb.csv", ","),
+    (2021, "reisenmueb"): MTMCTable("reisenmueb.csv", ";"),
+}
+
+
+def get_available_years(mtmc_table: str) -> List[int]:
+    return sorted(year for (year, table) in MTMC_CATALOG if table == mtmc_table)
+
+
+def get_table_spec(year: int, mtmc_table: str) -> MTMCTable:
+    if (year, mtmc_table) not in MTMC_CATALOG:
+        available_years = get_available_years(mtmc_table)
+        if not available_years:
+            raise ValueError("Unknown table of the MTMC: " + mtmc_table)
+        raise ValueError(
+            "Cannot get data for other years than "
+            + ", ".join(str(available_year) for available_year in available_years)
+            + "! ("
+            + mtmc_table
+            + ")"
+        )
+    return MTMC_CATALOG[(year, mtmc_table)]
+
+
+def get_path_to_raw_file(year: int, mtmc_table: str, path_to_mtmc_data: Path) -> Path:
+    return Path(path_to_mtmc_data).joinpath(
+        str(year), get_table_spec(year, mtmc_table).file_name
+    )
+
+
+def read_header(path_to_raw_file: Path, table_spec: MTMCTable) -> List[str]:
+    """Reads the names of the columns (first line) of the raw file and applies the fixes of the catalog."""
+    with open(path_to_raw_file, "r", encoding=table_spec.encoding) as raw_file:
+        header = next(csv.reader(raw_file, delimiter=table_spec.delimiter))
+    if table_spec.first_column_name is not None:
+        header[0] = table_spec.first_column_name
+    return header
+
+
+def read_mtmc_table(
+    year: int,
+    mtmc_table: str,
+    path_to_mtmc_data: Path,
+    selected_columns: Optional[List[Any]] = None,
+    filters: Optional[Filters] = None,
+) -> pd.DataFrame:
+    """Reads one raw table of the MTMC as described in the catalog.
+    The selection of the columns is always done by the parser, also when the header has to be fixed.
+    Only the rows satisfying the filters are read (see mtmc_filters.py).
+    The names in selected_columns must be the names of the raw file (after the fixes of the header).
+    If enabled in simba.mobi.mzmv.config, the columns are converted to compact types (see mtmc_schema.py)."""
+    table_spec = get_table_spec(year, mtmc_table)
+    path_to_raw_file = get_path_to_raw_file(year, mtmc_table, path_to_mtmc_data)
+    read_csv_kwargs: Dict[str, Any] = {"delimiter": table_spec.delimiter}
+    if table_spec.na_values is not None:
+        read_csv_kwargs["na_values"] = table_spec.na_values
+    # The names of the catalog (with the fixes of the header) replace the header before the selection of the
+    # columns. They also give the order of the columns to the Arrow CSV engine.
+    read_csv_kwargs["names"] = read_header(path_to_raw_file, table_spec)
+    read_csv_kwargs["header"] = 0
+    df = read_csv_with_cache(
+        path_to_raw_file,
+        year,
+        mtmc_table,
+        path_to_mtmc_data,
+        usecols=selected_columns,
+        dtype=table_spec.dtype,
+        encoding=table_spec.encoding,
+        filters=filters,
+        **read_csv_kwargs,
+    )
+    if config.use_compact_dtypes:
+        df = compact_dtypes(df, verbose=config.print_memory_usage)
+    return df
@@ -0,0 +1,116 @@
+"""Registry of the generic names of the variables of the Mobility and Transport Microcensus (MTMC).
+
+Generic names (e.g. "has_ga") stand for variables whose code changes between years (e.g. "f41610a" in 2015,
+"f41600_01a" in 2021). The forward (generic name -> code) and reverse (code -> generic name) maps of each year and
+table are built once, when the module is imported.
+Derived variables are generic names computed from several columns of the MTMC, e.g. "total_work_percentage" in 2015.
+They are declared with their source columns and a vectorised expression.
+"""
+from dataclasses import dataclass
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pandas as pd
+
+from simba.mobi.mzmv.utils2015.codes import dict_mobi_names2mzmv_codes_hh_2015
+from simba.mobi.mzmv.utils2015.codes import dict_mobi_names2mzmv_codes_zp_2015
+from simba.mobi.mzmv.utils2021.codes import dict_mobi_names2mzmv_codes_hh_2021
+from simba.mobi.mzmv.utils2021.codes import dict_mobi_names2mzmv_codes_zp_2021
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import Filters
+
+
+@dataclass(frozen=True)
+class DerivedColumn:
+    # Columns of the MTMC used to compute the variable. They are replaced by the variable.
+    source_columns: List[str]
+    compute: Callable[[pd.DataFrame], pd.Series]
+
+
+def compute_total_work_percentage_2015(df: pd.DataFrame) -> pd.Series:
+    """Full time job (f40900: 1) counts as 100%, otherwise the percentages of the first (f40901_02) and second
+    (f40903) part time jobs are added. Negative codes (no answer, not asked) count as 0."""
+    return (
+        (df["f40900"] == 1) * 100
+        + df["f40901_02"] * (df["f40901_02"] > 0)
+        + df["f40903"] * (df["f40903"] > 0)
+    )
+
+
+# Generic names -> codes of the MTMC, by year and table
+GENERIC_NAMES2CODES: Dict[Tuple[int, str], Dict[str, str]] = {
+    (2015, "zp"): dict_mobi_names2mzmv_codes_zp_2015,
+    (2015, "hh"): dict_mobi_names2mzmv_codes_hh_2015,
+    (2020, "zp"): dict_mobi_names2mzmv_codes_zp_2021,
+    (2020, "hh"): dict_mobi_names2mzmv_codes_hh_2021,
+    (2021, "zp"): dict_mobi_names2mzmv_codes_zp_2021,
+    (2021, "hh"): dict_mobi_names2mzmv_codes_hh_2021,
+}
+
+# Codes of the MTMC -> generic names, by year and table
+CODES2GENERIC_NAMES: Dict[Tuple[int, str], Dict[str, str]] = {
+    key: {code: generic_name for generic_name, code in generic_names2codes.items()}
+    for key, generic_names2codes in GENERIC_NAMES2CODES.items()
+}
+
+DERIVED_COLUMNS: Dict[Tuple[int, str], Dict[str, DerivedColumn]] = {
+    (2015, "zp"): {
+        "total_work_percentage": DerivedColumn(
+            ["f40900", "f40901_02", "f40903"], compute_total_work_percentage_2015
+        ),
+    },
+}
+
+
+def get_mzmv_codes(
+    selected_columns: List[str], year: int, mtmc_table: str
+) -> List[str]:
+    """Translates generic names (e.g. "has_ga") into the codes of the variables in the MTMC of the year.
+    Codes of the MTMC stay as they are. Derived variables are replaced by their source columns.
+    Returns a new list: the list of the caller is not changed."""
+    generic_names2codes = GENERIC_NAMES2CODES.get((year, mtmc_table), {})
+    derived_columns = DERIVED_COLUMNS.get((year, mtmc_table), {})
+    codes = []
+    for column in selected_columns:
+        if column in derived_columns:
+            codes.extend(derived_columns[column].source_columns)
+        else:
+            codes.append(generic_names2codes.get(column, column))
+    return list(dict.fromkeys(codes))
+
+
+def get_generic_names(df: pd.DataFrame, year: int, mtmc_table: str) -> pd.DataFrame:
+    """Renames the codes of the MTMC of the year into generic names and computes the derived variables
+    whose source columns are in the table."""
+    codes2generic_names = CODES2GENERIC_NAMES.get((year, mtmc_table), {})
+    df = df.rename(columns=codes2generic_names)
+    for name, derived_column in DERIVED_COLUMNS.get((year, mtmc_table), {}).items():
+        if all(column in df.columns for column in derived_column.source_columns):
+            df[name] = derived_column.compute(df)
+            df = df.drop(columns=derived_column.source_columns)
+    return df
+
+
+def get_mzmv_filters(
+    filters: Optional[Filters], year: int, mtmc_table: str
+) -> Optional[Filters]:
+    """Translates the generic names in the filters into the codes of the MTMC of the year."""
+    if not filters:
+        return filters
+    derived_columns = DERIVED_COLUMNS.get((year, mtmc_table), {})
+    mzmv_filters = []
+    for column, operator, value in filters:
+        if column in derived_columns:
+            raise ValueError(
+                "Cannot filter on a derived variable while reading the file: " + column
+            )
+        mzmv_filters.append(
+            (
+                GENERIC_NAMES2CODES.get((year, mtmc_table), {}).get(column, column),
+                operator,
+                value,
+            )
+        )
+    return mzmv_filters
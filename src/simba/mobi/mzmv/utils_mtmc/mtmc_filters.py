@@ -0,0 +1,110 @@
+"""Row filters (predicates) for the tables of the Mobility and Transport Microcensus (MTMC).
+
+A filter is a list of conditions (column, operator, value), which must all be true, e.g.:
+[("f51300", "==", 1), ("E_Ausland", "!=", 1), ("f51100", ">=", 7 * 60), ("HHNR", "in", {100002, 100003})]
+Possible operators: "==", "!=", "<", "<=", ">", ">=", "in", "not in".
+It is the format of the argument "filters" of pandas.read_parquet. The filters can therefore be pushed down to the
+columnar cache, or evaluated chunk by chunk while parsing the raw file.
+A missing value never satisfies a condition, also with "!=" and "not in", on all paths: pandas (get_filter_mask) and
+Arrow (get_arrow_filter, e.g. pushed down to the Parquet reader).
+"""
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is an optional dependency
+    pc = None
+
+Filters = List[Tuple[str, str, Any]]
+
+OPERATORS = ["==", "!=", "<", "<=", ">", ">=", "in", "not in"]
+
+
+def check_filters(filters: Filters) -> None:
+    for condition in filters:
+        if len(condition) != 3:
+            raise ValueError(
+                "A filter must be a tuple (column, operator, value): " + str(condition)
+            )
+        if condition[1] not in OPERATORS:
+            raise ValueError(
+                "Unknown operator in the filter: "
+                + str(condition[1])
+                + ". Possible operators: "
+                + ", ".join(OPERATORS)
+            )
+
+
+def get_filter_columns(filters: Optional[Filters]) -> List[str]:
+    if not filters:
+        return []
+    return list(dict.fromkeys(column for column, _, _ in filters))
+
+
+def get_filter_mask(df: pd.DataFrame, filters: Filters) -> np.ndarray:
+    """Returns a boolean array, true for the rows satisfying all the conditions. Missing values satisfy none."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, operator, value in filters:
+        series = df[column]
+        if operator == "==":
+            condition = series == value
+        elif operator == "!=":
+            condition = series != value
+        elif operator == "<":
+            condition = series < value
+        elif operator == "<=":
+            condition = series <= value
+        elif operator == ">":
+            condition = series > value
+        elif operator == ">=":
+            condition = series >= value
+        elif operator == "in":
+            condition = series.isin(list(value))
+        elif operator == "not in":
+            condition = ~series.isin(list(value))
+        else:
+            raise ValueError("Unknown operator in the filter: " + str(operator))
+        mask &= condition.fillna(False).to_numpy(dtype=bool) & series.notna().to_numpy()
+    return mask
+
+
+def get_arrow_filter(filters: Filters) -> "pc.Expression":
+    """Arrow expression true for the rows satisfying all the conditions, as get_filter_mask.
+    Arrow gives null for a comparison with null, but false for "in" (and therefore true for "not in"):
+    each condition is restricted to the valid values."""
+    expression = None
+    for column, operator, value in filters:
+        field = pc.field(column)
+        if operator == "==":
+            condition = field == value
+        elif operator == "!=":
+            condition = field != value
+        elif operator == "<":
+            condition = field < value
+        elif operator == "<=":
+            condition = field <= value
+        elif operator == ">":
+            condition = field > value
+        elif operator == ">=":
+            condition = field >= value
+        elif operator == "in":
+            condition = field.isin(list(value))
+        elif operator == "not in":
+            condition = ~field.isin(list(value))
+        else:
+            raise ValueError("Unknown operator in the filter: " + str(operator))
+        condition = field.is_valid() & condition
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def apply_filters(df: pd.DataFrame, filters: Optional[Filters]) -> pd.DataFrame:
+    if not filters:
+        return df
+    return df.loc[get_filter_mask(df, filters)]
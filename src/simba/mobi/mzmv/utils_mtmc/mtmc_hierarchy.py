@@ -0,0 +1,209 @@
+"""Hierarchy person -> trips -> trip segments ("Etappen") of the Mobility and Transport Microcensus (MTMC).
+
+The trip segments are sorted once by person (HHNR) and trip (WEGNR). As in a compressed sparse row (CSR) matrix,
+the hierarchy is then stored as two arrays of offsets:
+- the segments of the j-th trip are the rows trip_offsets[j]:trip_offsets[j + 1] of the segments,
+- the trips of the i-th person are the rows person_offsets[i]:person_offsets[i + 1] of the trips.
+Aggregations per person or per trip (sums, first values, counts) are segment reductions (see mtmc_store.py),
+without hashing HHNR or (HHNR, WEGNR) as df.groupby does. Subsets of the segments (e.g. by purpose of the trip)
+keep the order of the rows: their hierarchy is derived from the offsets, without sorting again.
+In the MTMC, one person is interviewed per household: HHNR identifies the person.
+"""
+from dataclasses import dataclass
+from dataclasses import replace
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import IndexedTable
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import KEYS_OF_TABLES
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import segment_reduce
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
+
+PERSON_KEY = ["HHNR"]
+TRIP_KEY = KEYS_OF_TABLES["etappen"]
+
+
+@dataclass(frozen=True)
+class TripHierarchy:
+    # Trip segments sorted by HHNR and WEGNR, with a new index 0..n-1
+    stages: pd.DataFrame
+    # One row per trip of the segments (HHNR, WEGNR and the columns of the trips table), sorted by HHNR and WEGNR
+    trips: pd.DataFrame
+    # Encoded keys of the trips and factors of the encoding (see mtmc_store.py)
+    trip_keys: np.ndarray
+    trip_key_factors: List[int]
+    # Segments of trips row j: trip_offsets[j]:trip_offsets[j + 1]
+    trip_offsets: np.ndarray
+    # Trips of the i-th person: person_offsets[i]:person_offsets[i + 1]
+    person_offsets: np.ndarray
+
+    @property
+    def persons(self) -> np.ndarray:
+        """HHNR of the persons, sorted."""
+        return self.trips["HHNR"].to_numpy(dtype=np.int64)[self.person_offsets[:-1]]
+
+    @property
+    def stage_offsets_of_persons(self) -> np.ndarray:
+        """Segments of the i-th person: stage_offsets_of_persons[i]:stage_offsets_of_persons[i + 1]."""
+        return self.trip_offsets[self.person_offsets]
+
+
+def get_starts_of_runs(values: np.ndarray) -> np.ndarray:
+    """Positions where a new value starts in a sorted array."""
+    if len(values) == 0:
+        return np.array([], dtype=np.int64)
+    return np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+
+
+def get_parent_positions(offsets: np.ndarray) -> np.ndarray:
+    """For each child row (e.g. each segment), the position of its parent (e.g. its trip) in the offsets."""
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def build_hierarchy(
+    df_etappen: pd.DataFrame,
+    df_trips: Optional[pd.DataFrame] = None,
+    trip_columns: Optional[List[str]] = None,
+) -> TripHierarchy:
+    """Builds the hierarchy from the trip segments (get_etappen), which must contain HHNR and WEGNR.
+    If the trips (get_trips_in_switzerland) are given, their columns (by default all) are added to each trip, and
+    repeated on each segment of the trip, as pd.merge(df_etappen, df_trips, on=["HHNR", "WEGNR"], how="left")."""
+    indexed_stages = index_table(df_etappen, TRIP_KEY)
+    stages = indexed_stages.df
+    trip_offsets = indexed_stages.offsets
+    trips = stages[TRIP_KEY].iloc[trip_offsets[:-1]].reset_index(drop=True)
+    if df_trips is not None:
+        trips = take_join(trips, index_table(df_trips, TRIP_KEY), trip_columns)
+        # Array take from the trips to their segments
+        trip_of_each_stage = get_parent_positions(trip_offsets)
+        for column in trips.columns:
+            if column not in TRIP_KEY:
+                stages[column] = (
+                    trips[column].take(trip_of_each_stage).set_axis(stages.index)
+                )
+    person_offsets = np.append(
+        get_starts_of_runs(trips["HHNR"].to_numpy(dtype=np.int64)), len(trips)
+    ).astype(np.int64)
+    return TripHierarchy(
+        stages,
+        trips,
+        indexed_stages.keys,
+        indexed_stages.key_factors,
+        trip_offsets,
+        person_offsets,
+    )
+
+
+def add_person_columns(
+    hierarchy: TripHierarchy, df: pd.DataFrame, columns: Optional[List[str]] = None
+) -> TripHierarchy:
+    """Adds the columns (by default all) of a table with one row per HHNR (get_zp, get_hh) to each segment,
+    as pd.merge(df_etappen, df, on="HHNR", how="left"). The table is joined once per person, not once per segment."""
+    persons = take_join(
+        pd.DataFrame({"HHNR": hierarchy.persons}), index_table(df, PERSON_KEY), columns
+    )
+    person_of_each_stage = get_parent_positions(hierarchy.stage_offsets_of_persons)
+    stages = hierarchy.stages.copy()
+    for column in persons.columns:
+        if column not in PERSON_KEY:
+            stages[column] = (
+                persons[column].take(person_of_each_stage).set_axis(stages.index)
+            )
+    return replace(hierarchy, stages=stages)
+
+
+def select_stages(hierarchy: TripHierarchy, mask: np.ndarray) -> TripHierarchy:
+    """Keeps the segments where mask is True, e.g. hierarchy.stages["wzweck1"] == 4. Trips and persons without
+    segment left are removed. The offsets are computed from the offsets of the hierarchy, without sorting."""
+    mask = np.asarray(mask, dtype=bool)
+    if len(mask) != len(hierarchy.stages):
+        raise ValueError("The mask must have one value per trip segment!")
+    if len(hierarchy.trips) == 0:
+        return hierarchy
+    stages = hierarchy.stages.loc[mask].reset_index(drop=True)
+    stages_per_trip = np.add.reduceat(
+        mask.astype(np.int64), hierarchy.trip_offsets[:-1]
+    )
+    kept_trips = stages_per_trip > 0
+    trips_per_person = np.add.reduceat(
+        kept_trips.astype(np.int64), hierarchy.person_offsets[:-1]
+    )
+    return TripHierarchy(
+        stages,
+        hierarchy.trips.loc[kept_trips].reset_index(drop=True),
+        hierarchy.trip_keys[kept_trips],
+        hierarchy.trip_key_factors,
+        np.r_[0, np.cumsum(stages_per_trip[kept_trips])].astype(np.int64),
+        np.r_[0, np.cumsum(trips_per_person[trips_per_person > 0])].astype(np.int64),
+    )
+
+
+def aggregate_segments(
+    indexed_table: IndexedTable, aggregations: Dict[str, str]
+) -> pd.DataFrame:
+    """One row per key, with the columns reduced as given in aggregations, e.g. {"rdist": "sum", "WP": "first"}."""
+    df_aggregated = None
+    for reduction in dict.fromkeys(aggregations.values()):
+        columns = [
+            column
+            for column, column_reduction in aggregations.items()
+            if column_reduction == reduction
+        ]
+        reduced = segment_reduce(indexed_table, columns, reduction).df
+        if df_aggregated is None:
+            df_aggregated = reduced
+        else:
+            df_aggregated[columns] = reduced[columns]
+    if df_aggregated is None:
+        df_aggregated = (
+            indexed_table.df[indexed_table.key_columns]
+            .iloc[indexed_table.offsets[:-1]]
+            .reset_index(drop=True)
+        )
+    return df_aggregated[indexed_table.key_columns + list(aggregations)]
+
+
+def aggregate_per_person(
+    hierarchy: TripHierarchy, aggregations: Dict[str, str]
+) -> pd.DataFrame:
+    """Aggregates the segments of each person, as
+    df_etappen.groupby("HHNR").agg(aggregations).reset_index(), with the reductions of segment_reduce."""
+    indexed_table = IndexedTable(
+        hierarchy.stages,
+        PERSON_KEY,
+        [1],
+        hierarchy.persons,
+        hierarchy.stage_offsets_of_persons,
+    )
+    return aggregate_segments(indexed_table, aggregations)
+
+
+def aggregate_per_trip(
+    hierarchy: TripHierarchy, aggregations: Dict[str, str]
+) -> pd.DataFrame:
+    """Aggregates the segments of each trip, as
+    df_etappen.groupby(["HHNR", "WEGNR"]).agg(aggregations).reset_index(), with the reductions of segment_reduce."""
+    indexed_table = IndexedTable(
+        hierarchy.stages,
+        TRIP_KEY,
+        hierarchy.trip_key_factors,
+        hierarchy.trip_keys,
+        hierarchy.trip_offsets,
+    )
+    return aggregate_segments(indexed_table, aggregations)
+
+
+def broadcast_to_stages(
+    hierarchy: TripHierarchy, values_per_person: np.ndarray
+) -> np.ndarray:
+    """Repeats values given per person (in the order of hierarchy.persons, e.g. a column of aggregate_per_person)
+    on each segment of the person, as a left merge on HHNR with the segments."""
+    values_per_person = np.asarray(values_per_person)
+    if len(values_per_person) != len(hierarchy.person_offsets) - 1:
+        raise ValueError("One value per person is needed!")
+    return np.repeat(values_per_person, np.diff(hierarchy.stage_offsets_of_persons))
@@ -0,0 +1,95 @@
+"""Compact types for the tables of the Mobility and Transport Microcensus (MTMC).
+
+Most columns of the MTMC are survey codes (e.g. 1: yes, 2: no, -99: not asked, -98: no answer, -97: don't know).
+They fit in small integers (int8/int16) instead of the int64/float64 given by the parser.
+The codes -99, -98 and -97 are kept as they are, since the models use them.
+Empty fields (NaN) in integer columns are stored as nullable integers (e.g. Int16).
+Strings are stored as categories. Weights and other decimal numbers (coordinates, distances) stay float64.
+Warning: arithmetic on small integers can overflow (e.g. int8 is limited to 127).
+Cast to a larger type before computing sums or products of codes.
+"""
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Weights of the MTMC: persons (WP) and households (WM)
+WEIGHT_COLUMNS = ["WP", "WM"]
+# Identifiers, used as keys to merge the tables (kept at least as int32)
+KEY_COLUMNS = ["HHNR", "ZIELPNR", "WEGNR", "ETNR", "AUSNR", "REISENR"]
+# Strings become categories if the number of distinct values is lower than this share of the rows
+MAX_SHARE_OF_CATEGORIES = 0.5
+
+INTEGER_TYPES = [np.int8, np.int16, np.int32, np.int64]
+NULLABLE_INTEGER_TYPES = ["Int8", "Int16", "Int32", "Int64"]
+
+
+def get_memory_usage(df: pd.DataFrame) -> int:
+    """Returns the memory used by the dataframe in bytes (including the content of strings)."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def get_smallest_integer_type_index(minimum: float, maximum: float) -> int:
+    for index, integer_type in enumerate(INTEGER_TYPES):
+        info = np.iinfo(integer_type)
+        if (info.min <= minimum) and (maximum <= info.max):
+            return index
+    return len(INTEGER_TYPES) - 1
+
+
+def get_compact_type(column: str, series: pd.Series) -> Optional[object]:
+    """Returns the narrowest safe type of the column, or None if the type does not change."""
+    if column in WEIGHT_COLUMNS:
+        return None if series.dtype == np.float64 else np.float64
+    if pd.api.types.is_bool_dtype(series) or isinstance(
+        series.dtype, pd.CategoricalDtype
+    ):
+        return None
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+        values = series.dropna()
+        if len(values) == 0:
+            return None
+        if pd.api.types.is_float_dtype(series) and not np.all(
+            np.mod(values.to_numpy(dtype=np.float64), 1) == 0
+        ):
+            return None if series.dtype == np.float64 else np.float64
+        index = get_smallest_integer_type_index(values.min(), values.max())
+        if column in KEY_COLUMNS:
+            index = max(index, INTEGER_TYPES.index(np.int32))
+        if series.isna().any():
+            return NULLABLE_INTEGER_TYPES[index]
+        return INTEGER_TYPES[index]
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        if series.nunique(dropna=True) < MAX_SHARE_OF_CATEGORIES * len(series):
+            return "category"
+    return None
+
+
+def compact_dtypes(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """Converts the columns (by default all) of a table of the MTMC to their narrowest safe type.
+    If verbose, prints the memory usage before and after the conversion."""
+    if columns is None:
+        columns = df.columns.tolist()
+    memory_before = get_memory_usage(df) if verbose else 0
+    new_types = {}
+    for column in columns:
+        compact_type = get_compact_type(column, df[column])
+        if compact_type is not None:
+            new_types[column] = compact_type
+    if new_types:
+        df = df.astype(new_types)
+    if verbose:
+        memory_after = get_memory_usage(df)
+        print(
+            "Memory usage: {:.1f} MB -> {:.1f} MB ({:.0%})".format(
+                memory_before / 1e6,
+                memory_after / 1e6,
+                memory_after / memory_before if memory_before > 0 else 1.0,
+            )
+        )
+    return df
@@ -0,0 +1,266 @@
+"""Tables of the Mobility and Transport Microcensus (MTMC) sorted and indexed by their keys.
+
+The tables are sorted once by their key (e.g. HHNR), keeping the order of the rows within each key.
+The rows of the i-th distinct key are then the contiguous range offsets[i]:offsets[i + 1].
+- Joins are array takes: the position of each key is found by binary search in the sorted distinct keys,
+  instead of hashing the key at each pd.merge.
+- Aggregations per key (e.g. per household) are segment reductions (numpy reduceat) over the contiguous ranges,
+  instead of df.groupby(key).
+Keys with several columns (e.g. HHNR and WEGNR) are encoded in one integer. The key columns must contain
+non-negative integers, as the identifiers of the MTMC.
+"""
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Keys of the tables of the MTMC (see mtmc_catalog.py for the names of the tables)
+KEYS_OF_TABLES = {
+    "hh": ["HHNR"],
+    "zp": ["HHNR"],
+    "hhp": ["HHNR"],
+    "wegeinland": ["HHNR", "WEGNR"],
+    "etappen": ["HHNR", "WEGNR"],
+    "ausgaenge": ["HHNR"],
+    "reisenmueb": ["HHNR"],
+}
+
+REDUCTIONS = ["sum", "count", "size", "min", "max", "mean", "first"]
+
+
+@dataclass(frozen=True)
+class IndexedTable:
+    # Rows sorted by the key, with a new index 0..n-1
+    df: pd.DataFrame
+    key_columns: List[str]
+    # Factors of the columns of the key in the encoded key
+    key_factors: List[int]
+    # Sorted distinct encoded keys
+    keys: np.ndarray
+    # Rows of keys[i]: offsets[i]:offsets[i + 1]
+    offsets: np.ndarray
+
+    @property
+    def is_unique(self) -> bool:
+        return len(self.keys) == len(self.df)
+
+
+def get_key_factors(df: pd.DataFrame, key_columns: List[str]) -> List[int]:
+    """Factors of the columns of the key, such that the encoded key is sum(column * factor)."""
+    key_factors = [1]
+    for column in reversed(key_columns[1:]):
+        maximum = int(df[column].max()) if len(df) > 0 else 0
+        key_factors.insert(0, key_factors[0] * (maximum + 1))
+    maximum_key = (int(df[key_columns[0]].max()) if len(df) > 0 else 0) * key_factors[0]
+    if maximum_key > np.iinfo(np.int64).max // 2:
+        raise ValueError(
+            "The key " + ", ".join(key_columns) + " cannot be encoded in one integer!"
+        )
+    return key_factors
+
+
+def encode_keys(
+    df: pd.DataFrame, key_columns: List[str], key_factors: List[int]
+) -> np.ndarray:
+    """Encodes the key of each row in one integer. Keys that cannot be encoded (missing values, negative values
+    or values larger than in the indexed table) get the code -1."""
+    codes = np.zeros(len(df), dtype=np.int64)
+    valid = np.ones(len(df), dtype=bool)
+    for index, (column, factor) in enumerate(zip(key_columns, key_factors)):
+        values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid &= ~np.isnan(values) & (values >= 0)
+        if index > 0:
+            valid &= values < key_factors[index - 1] // factor
+        codes += np.where(valid, values, 0).astype(np.int64) * factor
+    codes[~valid] = -1
+    return codes
+
+
+def check_key_columns(
+    df: pd.DataFrame, key_columns: List[str], check_values: bool = True
+) -> None:
+    missing_columns = [column for column in key_columns if column not in df.columns]
+    if missing_columns:
+        raise ValueError("Key columns not found in the table: " + str(missing_columns))
+    if not check_values:
+        return
+    for column in key_columns:
+        if df[column].isna().any() or (len(df) > 0 and df[column].min() < 0):
+            raise ValueError(
+                "The key column " + column + " must contain non-negative integers!"
+            )
+
+
+def index_table(
+    df: pd.DataFrame, key_columns: Optional[List[str]] = None
+) -> IndexedTable:
+    """Sorts the table by its key (by default HHNR) and computes the ranges of rows of each key."""
+    if key_columns is None:
+        key_columns = ["HHNR"]
+    check_key_columns(df, key_columns)
+    key_factors = get_key_factors(df, key_columns)
+    codes = encode_keys(df, key_columns, key_factors)
+    # Stable sort: the order of the rows within each key is kept
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    df = df.iloc[order].reset_index(drop=True)
+    starts = (
+        np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        if len(codes)
+        else np.array([], dtype=np.int64)
+    )
+    offsets = np.append(starts, len(codes)).astype(np.int64)
+    return IndexedTable(df, list(key_columns), key_factors, codes[starts], offsets)
+
+
+def get_positions(indexed_table: IndexedTable, df: pd.DataFrame) -> np.ndarray:
+    """Returns, for each row of df, the index of its key in indexed_table.keys, or -1 if the key is not found."""
+    check_key_columns(df, indexed_table.key_columns, check_values=False)
+    if len(indexed_table.keys) == 0:
+        return np.full(len(df), -1, dtype=np.int64)
+    codes = encode_keys(df, indexed_table.key_columns, indexed_table.key_factors)
+    positions = np.searchsorted(indexed_table.keys, codes)
+    positions_in_range = np.minimum(positions, len(indexed_table.keys) - 1)
+    found = (codes >= 0) & (indexed_table.keys[positions_in_range] == codes)
+    return np.where(found, positions, -1)
+
+
+def take_join(
+    df: pd.DataFrame,
+    indexed_table: IndexedTable,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Left join of df with a table with one row per key (e.g. households), as
+    pd.merge(df, right, on=key, how="left"), but with an array take instead of hashing the key.
+    The rows of df keep their order and get a new index 0..n-1, as with pd.merge. Keys not found get missing values.
+    The joined columns must not be in df already (pd.merge would add the suffixes _x and _y): select the columns."""
+    if not indexed_table.is_unique:
+        raise ValueError(
+            "The joined table must have one row per key ("
+            + ", ".join(indexed_table.key_columns)
+            + ")!"
+        )
+    if columns is None:
+        columns = [
+            column
+            for column in indexed_table.df.columns
+            if column not in indexed_table.key_columns
+        ]
+    overlapping_columns = [
+        column
+        for column in columns
+        if column in df.columns and column not in indexed_table.key_columns
+    ]
+    if overlapping_columns:
+        raise ValueError(
+            "The joined columns are already in the table: "
+            + ", ".join(overlapping_columns)
+            + ". Select the columns to join with the argument columns."
+        )
+    positions = get_positions(indexed_table, df)
+    found = positions >= 0
+    df = df.reset_index(drop=True)
+    for column in columns:
+        # One row per key: the index of the key is the position of the row
+        values = indexed_table.df[column]
+        if len(values) == 0:
+            df[column] = np.nan
+        elif found.all():
+            df[column] = values.take(positions).set_axis(df.index)
+        else:
+            df[column] = (
+                values.take(np.where(found, positions, 0))
+                .where(found)
+                .set_axis(df.index)
+            )
+    return df
+
+
+def segment_reduce(
+    indexed_table: IndexedTable,
+    columns: List[str],
+    reduction: str = "sum",
+) -> IndexedTable:
+    """Reduces the columns over the rows of each key (e.g. the persons of each household), as
+    df.groupby(key)[columns].<reduction>(), skipping missing values ("first": first non-missing value).
+    Returns a table with one row per key, which can be joined with take_join."""
+    if reduction not in REDUCTIONS:
+        raise ValueError(
+            "Unknown reduction: "
+            + reduction
+            + ". Possible reductions: "
+            + ", ".join(REDUCTIONS)
+        )
+    starts = indexed_table.offsets[:-1]
+    sizes = np.diff(indexed_table.offsets)
+    reduced = (
+        indexed_table.df[indexed_table.key_columns].iloc[starts].reset_index(drop=True)
+    )
+    for column in columns:
+        series = indexed_table.df[column]
+        if reduction == "size":
+            reduced[column] = sizes
+            continue
+        not_missing = series.notna().to_numpy()
+        if len(starts) == 0:
+            reduced[column] = series.iloc[:0].to_numpy()
+            continue
+        counts = np.add.reduceat(not_missing.astype(np.int64), starts)
+        if reduction == "count":
+            reduced[column] = counts
+            continue
+        if reduction == "first":
+            # Position of the first non-missing value of each key, or the end of the table if there is none
+            positions = np.where(not_missing, np.arange(len(series)), len(series))
+            first_positions = np.minimum.reduceat(positions, starts)
+            found = first_positions < indexed_table.offsets[1:]
+            reduced[column] = (
+                series.take(np.where(found, first_positions, 0)).where(found).to_numpy()
+            )
+            continue
+        is_integer = pd.api.types.is_bool_dtype(
+            series
+        ) or pd.api.types.is_integer_dtype(series)
+        if reduction in ["sum", "mean"]:
+            if is_integer:
+                values = series.to_numpy(dtype=np.int64, na_value=0)
+            else:
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            sums = np.add.reduceat(np.where(not_missing, values, 0), starts)
+            if reduction == "sum":
+                reduced[column] = sums
+            else:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    reduced[column] = sums / counts
+            continue
+        # Missing values are NaN, skipped by fmin and fmax (NaN only for the keys without any value)
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if reduction == "min":
+            extrema = np.fmin.reduceat(values, starts)
+        else:
+            extrema = np.fmax.reduceat(values, starts)
+        if is_integer and (counts > 0).all():
+            # Back to integers if each key has a value
+            extrema = extrema.astype(np.int64)
+        reduced[column] = extrema
+    return IndexedTable(
+        reduced,
+        indexed_table.key_columns,
+        indexed_table.key_factors,
+        indexed_table.keys,
+        np.arange(len(starts) + 1, dtype=np.int64),
+    )
+
+
+def build_store(mtmc_tables: Dict[str, pd.DataFrame]) -> Dict[str, IndexedTable]:
+    """Indexes the tables of one year of the MTMC (e.g. {"zp": df_zp, "hh": df_hh}) by their keys (KEYS_OF_TABLES)."""
+    unknown_tables = [table for table in mtmc_tables if table not in KEYS_OF_TABLES]
+    if unknown_tables:
+        raise ValueError("Unknown table of the MTMC: " + ", ".join(unknown_tables))
+    return {
+        mtmc_table: index_table(df, KEYS_OF_TABLES[mtmc_table])
+        for mtmc_table, df in mtmc_tables.items()
+    }
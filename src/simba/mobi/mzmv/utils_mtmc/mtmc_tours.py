@@ -0,0 +1,176 @@
+"""Tours ("Ausgänge") reconstructed from the trips in Switzerland ("wegeinland") of the Mobility and Transport
+Microcensus (MTMC), and linked to the trip segments ("etappen").
+
+A tour is a sequence of trips of a person starting from home and, if complete, ending at home. The trips are
+sorted once by person and trip number (WEGNR). A new tour starts with the first trip of a person, after a trip
+back home (wzweck2: 2) and with a trip from home (wzweck2: 1). Each trip gets the number of its tour within the
+person (tour_number, from 1) and a tour_id unique in the table. The tour numbers are not the key AUSNR of the table
+"ausgaenge": the tours of the MTMC may also contain trips abroad, which are not in "wegeinland".
+compare_with_ausgaenge lists the persons whose reconstructed tours differ from "ausgaenge".
+The aggregates of the tours (number of trips, distance, travel time, main mode, chain type) are segment reductions
+over the contiguous trips of each tour (see mtmc_store.py), without groupby. Several years can be processed at once:
+the persons are then identified by year and HHNR.
+"""
+from pathlib import Path
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import load_many
+from simba.mobi.mzmv.utils_mtmc.modal_split import MEASURE_COLUMNS
+from simba.mobi.mzmv.utils_mtmc.modal_split import MOBI_MODES
+from simba.mobi.mzmv.utils_mtmc.modal_split import MODE_COLUMNS
+from simba.mobi.mzmv.utils_mtmc.modal_split import get_mobi_modes
+from simba.mobi.mzmv.utils_mtmc.modal_split import get_non_negative_values
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import get_starts_of_runs
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
+
+# wzweck2: 1 trip from home, 2 trip back home, 3 trip neither from nor to home
+TRIP_FROM_HOME = 1
+TRIP_BACK_HOME = 2
+
+# round trip: one trip from home back home, simple: home - activity - home, complex: more than one activity,
+# open: the tour does not end at home
+CHAIN_TYPES = ["round trip", "simple", "complex", "open"]
+
+TRIP_COLUMNS = [
+    "HHNR",
+    "WEGNR",
+    "WP",
+    "wzweck1",  # purpose
+    "wzweck2",  # from home, back home or neither
+    MODE_COLUMNS["wegeinland"],
+] + list(MEASURE_COLUMNS["wegeinland"].values())
+
+
+def get_person_columns(df: pd.DataFrame) -> List[str]:
+    """Columns identifying a person: HHNR, and the year if the table contains several years."""
+    return ["year", "HHNR"] if "year" in df.columns else ["HHNR"]
+
+
+def assign_tours(df_trips: pd.DataFrame) -> pd.DataFrame:
+    """Sorts the trips by person and WEGNR and adds the number of the tour of each trip within the person
+    (tour_number)
+    and a tour_id unique in the table, in one pass over the sorted trips."""
+    person_columns = get_person_columns(df_trips)
+    df_trips = df_trips.sort_values(
+        person_columns + ["WEGNR"], kind="stable"
+    ).reset_index(drop=True)
+    persons = df_trips[person_columns].to_numpy()
+    is_first_trip_of_person = np.ones(len(df_trips), dtype=bool)
+    is_first_trip_of_person[1:] = (persons[1:] != persons[:-1]).any(axis=1)
+    trip_from_or_to_home = df_trips["wzweck2"].to_numpy()
+    follows_trip_back_home = np.zeros(len(df_trips), dtype=bool)
+    follows_trip_back_home[1:] = trip_from_or_to_home[:-1] == TRIP_BACK_HOME
+    starts_tour = (
+        is_first_trip_of_person
+        | follows_trip_back_home
+        | (trip_from_or_to_home == TRIP_FROM_HOME)
+    )
+    tour_ids = np.cumsum(starts_tour) - 1
+    # Tour number within the person: tour_id minus the tour_id of the first tour of the person
+    first_tour_of_persons = tour_ids[is_first_trip_of_person]
+    person_of_trips = np.cumsum(is_first_trip_of_person) - 1
+    df_trips["tour_number"] = tour_ids - first_tour_of_persons[person_of_trips] + 1
+    df_trips["tour_id"] = tour_ids
+    return df_trips
+
+
+def aggregate_tours(df_trips: pd.DataFrame, year: Optional[int] = None) -> pd.DataFrame:
+    """One row per tour of the trips returned by assign_tours, with:
+    - number_of_trips, distance (sum of rdist) and travel_time (sum of dauer2),
+    - main_mode: mode of MOBi of the longest trip of the tour (the first one if several),
+    - first_purpose: purpose (wzweck1) of the first trip, i.e. the first activity of the tour,
+    - chain_type: see CHAIN_TYPES.
+    The codes of the modes are those of the year, or of the column "year" (see get_mobi_modes)."""
+    person_columns = get_person_columns(df_trips)
+    tour_ids = df_trips["tour_id"].to_numpy(dtype=np.int64)
+    starts = get_starts_of_runs(tour_ids)
+    offsets = np.append(starts, len(df_trips)).astype(np.int64)
+    df_tours = (
+        df_trips[person_columns + ["tour_number", "tour_id", "WP"]]
+        .iloc[starts]
+        .reset_index(drop=True)
+    )
+    number_of_trips = np.diff(offsets)
+    df_tours["number_of_trips"] = number_of_trips
+    if len(df_tours) == 0:
+        return df_tours
+    distances = get_non_negative_values(
+        df_trips[MEASURE_COLUMNS["wegeinland"]["distance"]]
+    )
+    df_tours["distance"] = np.add.reduceat(distances, starts)
+    df_tours["travel_time"] = np.add.reduceat(
+        get_non_negative_values(df_trips[MEASURE_COLUMNS["wegeinland"]["time"]]),
+        starts,
+    )
+    # Position of the first longest trip of each tour
+    longest_distances = np.repeat(
+        np.maximum.reduceat(distances, starts), number_of_trips
+    )
+    positions = np.where(
+        distances == longest_distances, np.arange(len(df_trips)), len(df_trips)
+    )
+    longest_trips = np.minimum.reduceat(positions, starts)
+    modes = get_mobi_modes(df_trips, "wegeinland", year)
+    df_tours["main_mode"] = pd.Categorical.from_codes(modes[longest_trips], MOBI_MODES)
+    df_tours["first_purpose"] = df_trips["wzweck1"].to_numpy()[starts]
+    ends_at_home = df_trips["wzweck2"].to_numpy()[offsets[1:] - 1] == TRIP_BACK_HOME
+    df_tours["chain_type"] = pd.Categorical(
+        np.select(
+            [~ends_at_home, number_of_trips == 1, number_of_trips == 2],
+            ["open", "round trip", "simple"],
+            "complex",
+        ),
+        categories=CHAIN_TYPES,
+    )
+    return df_tours
+
+
+def add_tours_to_stages(
+    df_etappen: pd.DataFrame, df_trips: pd.DataFrame
+) -> pd.DataFrame:
+    """Adds the tour (tour_number and tour_id) of the trips returned by assign_tours to their trip segments, with an array
+    take on the key (year,) HHNR, WEGNR. Segments of trips not in the trips get missing values."""
+    trip_key = get_person_columns(df_trips) + ["WEGNR"]
+    return take_join(
+        df_etappen,
+        index_table(df_trips[trip_key + ["tour_number", "tour_id"]], trip_key),
+        ["tour_number", "tour_id"],
+    )
+
+
+def compare_with_ausgaenge(
+    df_tours: pd.DataFrame, df_ausgaenge: pd.DataFrame
+) -> pd.DataFrame:
+    """Persons whose tours returned by aggregate_tours differ from the tours of the table "ausgaenge" (HHNR, AUSNR):
+    one row per person with the number of tours and the highest tour number of both tables, for the persons with a
+    different number of tours or with a highest AUSNR different from their number of tours in "ausgaenge".
+    Both tables contain one year, or both contain the column "year"."""
+    person_columns = get_person_columns(df_tours)
+    reconstructed = df_tours.groupby(person_columns)["tour_number"].agg(["size", "max"])
+    reconstructed.columns = ["number_of_tours", "max_tour_number"]
+    official = df_ausgaenge.groupby(person_columns)["AUSNR"].agg(["size", "max"])
+    official.columns = ["number_of_tours_ausgaenge", "max_AUSNR"]
+    df_comparison = reconstructed.join(official, how="outer")
+    is_different = (
+        df_comparison["number_of_tours"] != df_comparison["number_of_tours_ausgaenge"]
+    ) | (df_comparison["max_AUSNR"] != df_comparison["number_of_tours_ausgaenge"])
+    return df_comparison[is_different].reset_index()
+
+
+def get_tours_of_years(years: Sequence[int], path_to_mtmc_data: Path) -> pd.DataFrame:
+    """Tours of several years of the MTMC at once (see aggregate_tours), with the column "year".
+    The trips of all years are loaded concurrently (see load_many)."""
+    mtmc_tables = load_many(
+        [(year, "wegeinland", TRIP_COLUMNS) for year in years], path_to_mtmc_data
+    )
+    df_trips = pd.concat(
+        [mtmc_tables[(year, "wegeinland")].assign(year=year) for year in years],
+        ignore_index=True,
+    )
+    return aggregate_tours(assign_tours(df_trips))
@@ -0,0 +1,185 @@
+"""Origin-destination (OD) matrices of the trips of the Mobility and Transport Microcensus (MTMC) on the MOBi zones.
+
+The origins (S_X, S_Y) and destinations (Z_X, Z_Y) of the trips ("wegeinland") are located in the zones with a
+spatial join, as the home and work places in the homeoffice model (add_accessibility). The zones are indexed by
+ascending zone_id, the order of the OMX skims (see add_home_work_distance in the homeoffice data loader).
+The weighted trips are accumulated into sparse matrices (scipy CSR), one per mode of MOBi and purpose, in one pass:
+the trips of all (mode, purpose) pairs form one sparse matrix of size (pairs x zones, zones), whose blocks of rows
+are the matrices of the pairs. The matrices can be written to an OMX file to be compared with the skims.
+"""
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import geopandas
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_trips_in_switzerland
+from simba.mobi.mzmv.utils_mtmc.modal_split import MOBI_MODES
+from simba.mobi.mzmv.utils_mtmc.modal_split import recode_modes
+
+try:
+    import openmatrix as omx
+except ImportError:  # openmatrix is only needed to write OMX files
+    omx = None
+
+# Zone of the points outside of the zones or without coordinates, as in the homeoffice model
+NO_ZONE = -999
+
+# Coordinates of the origins and destinations of the trips, WGS84 (EPSG:4326)
+ORIGIN_COORDINATES = ["S_X", "S_Y"]
+DESTINATION_COORDINATES = ["Z_X", "Z_Y"]
+
+
+def read_mobi_zones(path_to_mobi_zones: Path) -> geopandas.GeoDataFrame:
+    """MOBi traffic zones, sorted by ascending zone_id as the zones of the skims."""
+    mobi_zones = geopandas.read_file(path_to_mobi_zones / "mobi-zones.shp").sort_values(
+        "zone_id"
+    )
+    return mobi_zones.set_crs("EPSG:2056", allow_override=True).reset_index(drop=True)
+
+
+def get_zone_ids(
+    x: pd.Series, y: pd.Series, zones: geopandas.GeoDataFrame
+) -> np.ndarray:
+    """zone_id of each point given in WGS84 (EPSG:4326), NO_ZONE outside of the zones and for the missing
+    coordinates of the MTMC (negative codes). Points on the border of several zones get the first zone."""
+    x = x.to_numpy(dtype=np.float64)
+    y = y.to_numpy(dtype=np.float64)
+    has_coordinates = (x >= 0) & (y >= 0)
+    zone_ids = np.full(len(x), NO_ZONE, dtype=np.int64)
+    points = geopandas.GeoDataFrame(
+        geometry=geopandas.points_from_xy(x[has_coordinates], y[has_coordinates]),
+        crs="epsg:4326",
+    ).to_crs(zones.crs)
+    points_in_zones = geopandas.sjoin(
+        points, zones[["zone_id", "geometry"]], how="inner", predicate="intersects"
+    )
+    points_in_zones = points_in_zones[~points_in_zones.index.duplicated(keep="first")]
+    zone_ids_of_points = np.full(len(points), NO_ZONE, dtype=np.int64)
+    zone_ids_of_points[points_in_zones.index.to_numpy()] = points_in_zones["zone_id"]
+    zone_ids[has_coordinates] = zone_ids_of_points
+    return zone_ids
+
+
+def get_zone_indices(zone_ids: np.ndarray, sorted_zone_ids: np.ndarray) -> np.ndarray:
+    """Position of each zone_id in the sorted zones (index in the skims), -1 if the zone is unknown."""
+    positions = np.searchsorted(sorted_zone_ids, zone_ids)
+    positions_in_range = np.minimum(positions, len(sorted_zone_ids) - 1)
+    return np.where(sorted_zone_ids[positions_in_range] == zone_ids, positions, -1)
+
+
+def get_od_matrices(
+    df_trips: pd.DataFrame,
+    sorted_zone_ids: np.ndarray,
+    segment_columns: Optional[List[str]] = None,
+    weights: str = "WP",
+) -> Dict[Tuple, sparse.csr_matrix]:
+    """Weighted OD matrices of the trips, one per combination of the values of segment_columns
+    (default: ["mode", "wzweck1"], mode of MOBi and purpose). df_trips contains the zones of origin and destination
+    (zone_id_origin, zone_id_destination), the weights and the segment columns. The trips without zone at one end
+    are ignored. The matrices are indexed by the position of the zones in sorted_zone_ids."""
+    if segment_columns is None:
+        segment_columns = ["mode", "wzweck1"]
+    origins = get_zone_indices(
+        df_trips["zone_id_origin"].to_numpy(dtype=np.int64), sorted_zone_ids
+    )
+    destinations = get_zone_indices(
+        df_trips["zone_id_destination"].to_numpy(dtype=np.int64), sorted_zone_ids
+    )
+    grouped = df_trips.groupby(segment_columns, sort=True, observed=True)
+    segment_ids = grouped.ngroup().to_numpy(dtype=np.float64, na_value=-1.0)
+    segments = grouped.size().index
+    in_matrix = (origins >= 0) & (destinations >= 0) & (segment_ids >= 0)
+    number_of_ignored_trips = int((~in_matrix).sum())
+    if number_of_ignored_trips > 0:
+        print(
+            number_of_ignored_trips,
+            "trips without zone of origin, zone of destination or segment are ignored",
+        )
+    number_of_zones = len(sorted_zone_ids)
+    # One matrix of all segments: the rows of the segment i are i * number_of_zones + origin
+    od_matrix_of_segments = sparse.coo_matrix(
+        (
+            df_trips[weights].to_numpy(dtype=np.float64)[in_matrix],
+            (
+                segment_ids[in_matrix].astype(np.int64) * number_of_zones
+                + origins[in_matrix],
+                destinations[in_matrix],
+            ),
+        ),
+        shape=(len(segments) * number_of_zones, number_of_zones),
+    ).tocsr()  # Duplicated (origin, destination) pairs are summed
+    od_matrices = {}
+    for index, segment in enumerate(segments):
+        # One segment column: the values of the index are not tuples
+        key = segment if isinstance(segment, tuple) else (segment,)
+        od_matrices[key] = od_matrix_of_segments[
+            index * number_of_zones : (index + 1) * number_of_zones
+        ]
+    return od_matrices
+
+
+def get_od_matrices_of_trips(
+    year: int,
+    path_to_mtmc_data: Path,
+    path_to_mobi_zones: Path,
+    segment_columns: Optional[List[str]] = None,
+) -> Tuple[Dict[Tuple, sparse.csr_matrix], np.ndarray]:
+    """OD matrices of the trips in Switzerland of the MTMC by mode of MOBi and purpose (wzweck1), or by the given
+    columns of the trips ("mode" being the mode of MOBi). Returns the matrices and the sorted zone_ids."""
+    if segment_columns is None:
+        segment_columns = ["mode", "wzweck1"]
+    selected_columns = list(
+        dict.fromkeys(
+            ["HHNR", "WP", "wmittel1"]
+            + ORIGIN_COORDINATES
+            + DESTINATION_COORDINATES
+            + [column for column in segment_columns if column != "mode"]
+        )
+    )
+    df_trips = get_trips_in_switzerland(year, path_to_mtmc_data, selected_columns)
+    mobi_zones = read_mobi_zones(path_to_mobi_zones)
+    df_trips["mode"] = pd.Categorical.from_codes(
+        recode_modes(df_trips["wmittel1"], year, "wegeinland"), MOBI_MODES
+    )
+    df_trips["zone_id_origin"] = get_zone_ids(
+        df_trips[ORIGIN_COORDINATES[0]], df_trips[ORIGIN_COORDINATES[1]], mobi_zones
+    )
+    df_trips["zone_id_destination"] = get_zone_ids(
+        df_trips[DESTINATION_COORDINATES[0]],
+        df_trips[DESTINATION_COORDINATES[1]],
+        mobi_zones,
+    )
+    sorted_zone_ids = mobi_zones["zone_id"].to_numpy(dtype=np.int64)
+    return get_od_matrices(df_trips, sorted_zone_ids, segment_columns), sorted_zone_ids
+
+
+def get_weighted_average_of_skim(
+    od_matrix: sparse.csr_matrix, skim_matrix: np.ndarray
+) -> float:
+    """Average value of a skim (e.g. the car network distance, matrix "12" of skims.omx) over the trips of the
+    OD matrix, weighted by the trips. Only the non-zero cells of the OD matrix are read."""
+    od_matrix = od_matrix.tocoo()
+    return float(
+        np.average(skim_matrix[od_matrix.row, od_matrix.col], weights=od_matrix.data)
+    )
+
+
+def write_od_matrices_to_omx(
+    od_matrices: Dict[Tuple, sparse.csr_matrix],
+    sorted_zone_ids: np.ndarray,
+    path_to_omx_file: Path,
+) -> None:
+    """Writes the OD matrices to an OMX file, one matrix per segment named e.g. "car_2" (mode and purpose),
+    with the mapping "zone_id" of the zones."""
+    if omx is None:
+        raise ImportError("openmatrix is needed to write OMX files!")
+    with omx.open_file(path_to_omx_file, "w") as omx_file:
+        for segment, od_matrix in od_matrices.items():
+            omx_file["_".join(str(value) for value in segment)] = od_matrix.toarray()
+        omx_file.create_mapping("zone_id", sorted_zone_ids)
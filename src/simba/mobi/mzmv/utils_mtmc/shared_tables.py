@@ -0,0 +1,52 @@
+"""Tables of the Mobility and Transport Microcensus (MTMC) shared between processes through memory-mapped Arrow files.
+
+A table loaded once is published as an uncompressed Arrow IPC file (the format of Feather V2).
+Worker processes attach to the file: it is memory-mapped, so that the numerical columns without missing values are
+not copied and all workers share the same pages of memory (one physical copy of the table instead of one per worker).
+Columns with strings or missing values are converted by pandas, and therefore copied, when attaching.
+The attached columns are read-only. Copy the dataframe (df.copy()) before changing values in place.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.cache_files import write_atomically
+
+try:
+    import pyarrow
+    import pyarrow.ipc as ipc
+except ImportError:  # pyarrow is an optional dependency
+    pyarrow = None
+    ipc = None
+
+FILE_EXTENSION = ".arrow"
+
+
+def check_arrow_available() -> None:
+    if ipc is None:
+        raise ImportError("Sharing tables between processes needs the package pyarrow.")
+
+
+def publish_table(df: pd.DataFrame, path_to_shared_file: Path) -> Path:
+    """Writes the table as an uncompressed Arrow IPC file, which can be attached by other processes."""
+    check_arrow_available()
+    path_to_shared_file = Path(path_to_shared_file)
+    table = pyarrow.Table.from_pandas(df, preserve_index=False).combine_chunks()
+
+    def write_table(path_to_file: Path) -> None:
+        with pyarrow.OSFile(str(path_to_file), "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                # One record batch per file: the columns are contiguous and can be used without copy
+                writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+
+    write_atomically(path_to_shared_file, write_table)
+    return path_to_shared_file
+
+
+def attach_table(path_to_shared_file: Path) -> pd.DataFrame:
+    """Memory-maps a published table. The numerical columns without missing values point to the mapped file."""
+    check_arrow_available()
+    source = pyarrow.memory_map(str(path_to_shared_file), "r")
+    table = ipc.open_file(source).read_all()
+    # split_blocks: one block per column, so that pandas does not copy the columns into 2D blocks
+    return table.to_pandas(split_blocks=True)
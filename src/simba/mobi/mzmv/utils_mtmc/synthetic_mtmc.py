@@ -0,0 +1,465 @@
+"""Synthetic raw files of the Mobility and Transport Microcensus (MTMC), to run and benchmark the loaders without
+the confidential data.
+
+The files are written in the formats of the catalog (see mtmc_catalog.py): file names, delimiters and encoding of
+each year, including the wrongly coded name of the first column of the 2020 files (a byte order mark, "ï»¿HHNR"
+in latin1). The tables are linked as in the MTMC: each household (hh) has hhgr persons (hhp), one of them
+is the target person (zp), who reports trips (wegeinland) made of trip segments (etappen) and grouped in tours
+(ausgaenge). The columns used in the repository are generated with plausible codes, including the negative codes
+of the MTMC (-99: not asked, -98: no answer, -97: don't know). The values are random: the files are meant for
+benchmarks and tests of the loaders, not for analyses.
+scale=1 gives about the number of households of the MTMC (BASE_NUMBER_OF_HOUSEHOLDS). The households are
+generated and written in chunks, so that large scales (e.g. 100) do not need the whole data in memory.
+"""
+import time
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import MTMC_CATALOG
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import get_path_to_raw_file
+from simba.mobi.mzmv.utils_mtmc.mtmc_catalog import get_table_spec
+
+BASE_NUMBER_OF_HOUSEHOLDS = {2015: 57090, 2020: 55018, 2021: 55018}
+NUMBER_OF_HOUSEHOLDS_PER_CHUNK = 100000
+FIRST_HHNR = 100000
+
+# Order in which the tables are generated for each chunk of households
+TABLES = ["hh", "hhp", "zp", "wegeinland", "etappen", "ausgaenge", "reisenmueb"]
+
+# Name of the first column of the files whose header is wrongly coded (see first_column_name in the catalog):
+# UTF-8 byte order mark followed by HHNR, read in latin1
+WRONGLY_CODED_HHNR = "\xef\xbb\xbfHHNR"
+
+# Switzerland in WGS84 (EPSG:4326), as W_X/W_Y in the MTMC
+LONGITUDES = (6.0, 10.4)
+LATITUDES = (45.9, 47.7)
+
+ColumnGenerator = Callable[[np.random.Generator, int], np.ndarray]
+
+
+def codes(values: Sequence[int], probabilities: Sequence[float]) -> ColumnGenerator:
+    """Generator drawing codes of the MTMC with the given probabilities."""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    probabilities = probabilities / probabilities.sum()
+
+    def generate(rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.choice(np.asarray(values), size=size, p=probabilities)
+
+    return generate
+
+
+def integers(low: int, high: int) -> ColumnGenerator:
+    """Generator drawing integers in [low, high]."""
+
+    def generate(rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.integers(low, high + 1, size=size)
+
+    return generate
+
+
+YES_NO = codes([1, 2, -98, -97], [0.45, 0.53, 0.01, 0.01])
+REGIONS = codes([1, 2, 3, 4, 5, 6, 7], [0.19, 0.22, 0.14, 0.18, 0.14, 0.09, 0.04])
+URBAN_TYPOLOGY = codes([1, 2, 3], [0.63, 0.22, 0.15])
+LANGUAGES = codes([1, 2, 3], [0.70, 0.25, 0.05])
+MUNICIPALITIES = integers(1, 6810)
+
+# Columns of the households, with the names of 2015 and 2020/2021 when they differ
+HH_COLUMNS: Dict[str, ColumnGenerator] = {
+    "hhtyp": codes([10, 210, 220, 230, 240], [0.35, 0.28, 0.27, 0.06, 0.04]),
+    "W_OEV_KLASSE": codes([1, 2, 3, 4, 5], [0.2, 0.25, 0.25, 0.15, 0.15]),
+    "W_BFS": MUNICIPALITIES,
+    "f20601": codes([1, 2, 3, 4, 5, -98], [0.25, 0.3, 0.25, 0.1, 0.08, 0.02]),
+    "f30100": codes([0, 1, 2, 3, 4, -98], [0.2, 0.45, 0.28, 0.05, 0.015, 0.005]),
+    "f32200c": codes([0, 1, -98], [0.97, 0.02, 0.01]),
+    "sprache": LANGUAGES,
+    "W_REGION": REGIONS,
+    "W_stadt_land_2012": URBAN_TYPOLOGY,
+    "W_SPRACHE": LANGUAGES,
+}
+HH_COLUMNS_2015 = {"W_OEV_KLASSE": "W_OeV_KLASSE", "f20601": "F20601"}
+
+# Columns of the target persons (zp). Columns depending on the age are generated in add_zp_columns.
+ZP_COLUMNS: Dict[str, ColumnGenerator] = {
+    "gesl": codes([1, 2], [0.49, 0.51]),
+    "nation": codes([8100, 8207, 8218, 8211, 8236], [0.75, 0.07, 0.06, 0.02, 0.1]),
+    "sprache": LANGUAGES,
+    "f40120": codes([1, 2, 3, 4, 5, 6, -98], [0.1, 0.1, 0.35, 0.15, 0.1, 0.18, 0.02]),
+    "f81300": YES_NO,
+    "f81400": codes([1, 2, 3, -99], [0.3, 0.2, 0.1, 0.4]),
+    "A_BFS": MUNICIPALITIES,
+    "noga_08": integers(1, 99),
+    "f40800_01": codes([1, 2, 3, 4, -99], [0.5, 0.15, 0.1, 0.1, 0.15]),
+    "f41100_01": codes([1, 2, -99], [0.15, 0.45, 0.4]),
+    "f42100e": codes([1, 2, 3, -99], [0.2, 0.3, 0.1, 0.4]),
+    "f41000a": codes([1, 2, -99], [0.1, 0.5, 0.4]),
+    "f41000b": codes([1, 2, -99], [0.1, 0.5, 0.4]),
+    "f41000c": codes([1, 2, -99], [0.1, 0.5, 0.4]),
+    "f41001a": codes([1, 2, -99], [0.2, 0.3, 0.5]),
+    "f41001b": codes([1, 2, -99], [0.2, 0.3, 0.5]),
+    "f41001c": codes([1, 2, -99], [0.2, 0.3, 0.5]),
+    "Tag": integers(1, 7),
+    "A_stadt_land_2012": codes([1, 2, 3, -99], [0.4, 0.1, 0.05, 0.45]),
+    "AU_stadt_land_2012": codes([1, 2, 3, -99], [0.15, 0.03, 0.02, 0.8]),
+    "A_REGION": codes([1, 2, 3, 4, 5, 6, 7, -99], [7, 8, 5, 7, 5, 3, 1, 64]),
+    "AU_REGION": codes([1, 2, 3, 4, 5, 6, 7, -99], [2, 2, 1, 2, 1, 1, 1, 90]),
+    "A_SPRACHE": codes([1, 2, 3, -99], [0.4, 0.12, 0.03, 0.45]),
+    "AU_SPRACHE": codes([1, 2, 3, -99], [0.14, 0.05, 0.01, 0.8]),
+}
+ZP_COLUMNS_2015 = {
+    "f40120": "HAUSB",
+    "Tag": "tag",
+    "f41600_01a": "f41610a",
+    "f41600_01b": "f41610b",
+    "f41600_01c": "f41610c",
+}
+
+# Main mode of the trips (wmittel1) and mode of the segments (f51300), by mode of MOBi and year
+# (see the recoding tables in utils2015/codes.py and utils2021/codes.py)
+MOBI_MODE_SHARES = {
+    "walk": 0.3,
+    "bike": 0.07,
+    "car": 0.4,
+    "ride": 0.05,
+    "pt": 0.16,
+    "other": 0.02,
+}
+MAIN_MODES = {
+    2015: {"walk": 15, "bike": 14, "car": 9, "ride": 11, "pt": 2, "other": 17},
+    2021: {"walk": 16, "bike": 15, "car": 8, "ride": 10, "pt": 2, "other": 18},
+}
+SEGMENT_MODES = {
+    2015: {"walk": 1, "bike": 2, "car": 7, "ride": 8, "pt": 9, "other": 95},
+    2021: {"walk": 1, "bike": 2, "car": 9, "ride": 10, "pt": 11, "other": 95},
+}
+# Aggregated main mode (wmittel1a): 3 is public transport
+AGGREGATED_MODES = {"walk": 1, "bike": 1, "car": 2, "ride": 2, "pt": 3, "other": 4}
+# Average speed in km/h, for the durations
+SPEEDS = {"walk": 4.5, "bike": 15, "car": 40, "ride": 40, "pt": 30, "other": 50}
+
+
+def get_weights(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Weights around 1, as the weights of the MTMC."""
+    return np.round(rng.lognormal(0.0, 0.5, size=size), 6)
+
+
+def get_coordinates(rng: np.random.Generator, size: int) -> np.ndarray:
+    longitudes = rng.uniform(*LONGITUDES, size=size)
+    latitudes = rng.uniform(*LATITUDES, size=size)
+    return np.round(np.column_stack([longitudes, latitudes]), 6)
+
+
+def generate_households(
+    rng: np.random.Generator, year: int, hhnr: np.ndarray
+) -> pd.DataFrame:
+    df_hh = pd.DataFrame({"HHNR": hhnr})
+    df_hh["WM"] = get_weights(rng, len(hhnr))
+    df_hh["hhgr"] = codes([1, 2, 3, 4, 5, 6], [0.35, 0.33, 0.13, 0.13, 0.04, 0.02])(
+        rng, len(hhnr)
+    )
+    coordinates = get_coordinates(rng, len(hhnr))
+    df_hh["W_X"] = coordinates[:, 0]
+    df_hh["W_Y"] = coordinates[:, 1]
+    for column, generate in HH_COLUMNS.items():
+        df_hh[column] = generate(rng, len(hhnr))
+    df_hh["ZW2_HNR"] = ""
+    df_hh["ZW3_HNR"] = ""
+    if year == 2015:
+        df_hh = df_hh.drop(columns=["f32200c"]).rename(columns=HH_COLUMNS_2015)
+    return df_hh
+
+
+def generate_household_persons(
+    rng: np.random.Generator, df_hh: pd.DataFrame
+) -> pd.DataFrame:
+    household_sizes = df_hh["hhgr"].to_numpy()
+    df_hhp = pd.DataFrame(
+        {"HHNR": np.repeat(df_hh["HHNR"].to_numpy(), household_sizes)}
+    )
+    first_person = np.repeat(
+        np.cumsum(household_sizes) - household_sizes, household_sizes
+    )
+    df_hhp["HHPNR"] = np.arange(len(df_hhp)) - first_person + 1
+    df_hhp["alter"] = rng.integers(0, 95, size=len(df_hhp))
+    df_hhp["f20400a"] = np.where(
+        df_hhp["alter"] < 18, -99, codes([1, 2], [0.82, 0.18])(rng, len(df_hhp))
+    )
+    return df_hhp
+
+
+def generate_target_persons(
+    rng: np.random.Generator, year: int, df_hh: pd.DataFrame, df_hhp: pd.DataFrame
+) -> pd.DataFrame:
+    """One target person per household, among the persons of the household aged 6 or more."""
+    household_sizes = df_hh["hhgr"].to_numpy()
+    target_person = rng.integers(0, household_sizes)
+    positions = np.cumsum(household_sizes) - household_sizes + target_person
+    df_zp = df_hhp.iloc[positions][["HHNR", "HHPNR", "alter", "f20400a"]]
+    df_zp = df_zp.rename(columns={"HHPNR": "ZIELPNR"}).reset_index(drop=True)
+    df_zp["alter"] = np.maximum(df_zp["alter"], 6)
+    size = len(df_zp)
+    age = df_zp["alter"].to_numpy()
+    df_zp["WP"] = get_weights(rng, size)
+    for column, generate in ZP_COLUMNS.items():
+        df_zp[column] = generate(rng, size)
+    coordinates = get_coordinates(rng, size)
+    is_working = (age >= 15) & (age < 65) & (rng.random(size) < 0.8)
+    df_zp["A_X"] = np.where(is_working, coordinates[:, 0], -999)
+    df_zp["A_Y"] = np.where(is_working, coordinates[:, 1], -999)
+    # ERWERB: 1 full time, 2 part time, 3 in education, 4 not working
+    df_zp["ERWERB"] = np.where(
+        age < 15, -99, codes([1, 2, 3, 4], [0.45, 0.2, 0.1, 0.25])(rng, size)
+    )
+    df_zp["f40920"] = np.where(
+        df_zp["ERWERB"] == 1,
+        100,
+        np.where(df_zp["ERWERB"] == 2, rng.integers(1, 10, size) * 10, -99),
+    )
+    # Public transport subscriptions: GA, half fare (not asked below 16) and regional travelcard
+    df_zp["f41600_01a"] = codes([1, 2, -98], [0.1, 0.89, 0.01])(rng, size)
+    df_zp["f41600_01b"] = np.where(
+        age < 16, -99, codes([1, 2, -98], [0.35, 0.64, 0.01])(rng, size)
+    )
+    df_zp["f41600_01c"] = codes([1, 2, -98], [0.2, 0.79, 0.01])(rng, size)
+    if year == 2015:
+        df_zp["f40900"] = np.where(df_zp["ERWERB"] == 1, 1, 2)
+        df_zp["f40901_02"] = np.where(df_zp["f40920"] < 100, df_zp["f40920"], -99)
+        df_zp["f40903"] = codes([-99, 10, 20], [0.9, 0.05, 0.05])(rng, size)
+        df_zp = df_zp.drop(columns=["f40920"]).rename(columns=ZP_COLUMNS_2015)
+    return df_zp
+
+
+def get_codes_of_modes(
+    mobi_modes: np.ndarray, codes_by_mobi_mode: Dict[str, int]
+) -> np.ndarray:
+    return pd.Series(mobi_modes).map(codes_by_mobi_mode).to_numpy()
+
+
+def generate_trips(
+    rng: np.random.Generator, year: int, df_zp: pd.DataFrame
+) -> pd.DataFrame:
+    """Trips of the target persons: about 3.4 trips per day, 12% of the persons do not travel.
+    The trips of a person are grouped in tours of 2 or 3 trips (wzweck2: 1 from home, 3 neither, 2 back home)."""
+    codes_of_year = 2015 if year == 2015 else 2021
+    number_of_trips = np.where(
+        rng.random(len(df_zp)) < 0.12, 0, 1 + rng.poisson(2.4, len(df_zp))
+    )
+    df_trips = pd.DataFrame(
+        {
+            "HHNR": np.repeat(df_zp["HHNR"].to_numpy(), number_of_trips),
+            "WP": np.repeat(df_zp["WP"].to_numpy(), number_of_trips),
+        }
+    )
+    size = len(df_trips)
+    first_trip = np.repeat(
+        np.cumsum(number_of_trips) - number_of_trips, number_of_trips
+    )
+    position = np.arange(size) - first_trip
+    df_trips["WEGNR"] = position + 1
+    tour_length = np.repeat(rng.integers(2, 4, len(df_zp)), number_of_trips)
+    is_last_trip_of_person = position == np.repeat(number_of_trips, number_of_trips) - 1
+    is_last_of_tour = (
+        position % tour_length == tour_length - 1
+    ) | is_last_trip_of_person
+    is_first_of_tour = position % tour_length == 0
+    df_trips["wzweck1"] = codes(
+        [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11], [1, 14, 5, 16, 3, 2, 6, 40, 3, 5, 5]
+    )(rng, size)
+    # 5% of the persons do not come back home at the end of the day (open tour)
+    is_open = is_last_trip_of_person & (rng.random(size) < 0.05)
+    df_trips["wzweck2"] = np.select(
+        [is_open, is_last_of_tour, is_first_of_tour], [3, 2, 1], 3
+    )
+    mobi_modes = rng.choice(
+        list(MOBI_MODE_SHARES), size=size, p=list(MOBI_MODE_SHARES.values())
+    )
+    df_trips["mobi_mode"] = mobi_modes
+    df_trips["wmittel1"] = get_codes_of_modes(mobi_modes, MAIN_MODES[codes_of_year])
+    df_trips["wmittel1a"] = get_codes_of_modes(mobi_modes, AGGREGATED_MODES)
+    df_trips["w_etappen"] = np.where(
+        mobi_modes == "pt", 2 + rng.poisson(0.5, size), 1 + rng.poisson(0.2, size)
+    )
+    speeds = get_codes_of_modes(mobi_modes, SPEEDS)
+    df_trips["rdist"] = np.round(
+        rng.lognormal(np.log(speeds / 6), 0.8, size), 3
+    )  # km, about 10 minutes
+    df_trips["dauer1"] = np.maximum(
+        1, np.round(df_trips["rdist"] / speeds * 60)
+    ).astype(int)
+    df_trips["dauer2"] = df_trips["dauer1"]
+    coordinates = get_coordinates(rng, 2 * size)
+    df_trips["S_X"] = coordinates[:size, 0]
+    df_trips["S_Y"] = coordinates[:size, 1]
+    df_trips["Z_X"] = coordinates[size:, 0]
+    df_trips["Z_Y"] = coordinates[size:, 1]
+    return df_trips
+
+
+def generate_segments(
+    rng: np.random.Generator, year: int, df_trips: pd.DataFrame
+) -> pd.DataFrame:
+    """Segments of the trips: the main mode for one segment, walk for the others (access and egress)."""
+    codes_of_year = 2015 if year == 2015 else 2021
+    number_of_segments = df_trips["w_etappen"].to_numpy()
+    trip_of_segments = np.repeat(np.arange(len(df_trips)), number_of_segments)
+    df_etappen = df_trips[["HHNR", "WEGNR", "WP", "mobi_mode"]].iloc[trip_of_segments]
+    df_etappen = df_etappen.reset_index(drop=True)
+    size = len(df_etappen)
+    first_segment = np.repeat(
+        np.cumsum(number_of_segments) - number_of_segments, number_of_segments
+    )
+    position = np.arange(size) - first_segment
+    df_etappen["ETNR"] = position + 1
+    main_segment = np.repeat(rng.integers(0, number_of_segments), number_of_segments)
+    mobi_modes = np.where(
+        position == main_segment, df_etappen["mobi_mode"].to_numpy(), "walk"
+    )
+    df_etappen["f51300"] = get_codes_of_modes(mobi_modes, SEGMENT_MODES[codes_of_year])
+    df_etappen["E_Ausland"] = codes([1, 2], [0.02, 0.98])(rng, size)
+    speeds = get_codes_of_modes(mobi_modes, SPEEDS)
+    df_etappen["rdist"] = np.round(rng.lognormal(np.log(speeds / 8), 0.8, size), 3)
+    df_etappen["e_dauer"] = np.maximum(
+        1, np.round(df_etappen["rdist"] / speeds * 60)
+    ).astype(int)
+    df_etappen["f51100"] = rng.integers(1, 24 * 60 - 120, size)
+    df_etappen["f51400"] = df_etappen["f51100"] + df_etappen["e_dauer"]
+    df_etappen["W_AGGLO_GROESSE2012"] = integers(1, 6)(rng, size)
+    return df_etappen.drop(columns=["mobi_mode"])
+
+
+def generate_tours(df_trips: pd.DataFrame) -> pd.DataFrame:
+    """One tour per first trip of a person, trip from home (wzweck2: 1) and trip following a trip back home
+    (wzweck2: 2), as the tours reconstructed from the trips (see mtmc_tours.py)."""
+    is_first_trip_of_person = df_trips["WEGNR"] == 1
+    follows_trip_back_home = (
+        df_trips["wzweck2"].shift(1) == 2
+    ) & ~is_first_trip_of_person
+    is_first_of_tour = (
+        (df_trips["wzweck2"] == 1) | is_first_trip_of_person | follows_trip_back_home
+    )
+    df_tours = df_trips.loc[is_first_of_tour, ["HHNR", "WP"]].reset_index(drop=True)
+    df_tours.insert(1, "AUSNR", df_tours.groupby("HHNR").cumcount() + 1)
+    return df_tours
+
+
+def generate_overnight_trips(
+    rng: np.random.Generator, df_zp: pd.DataFrame
+) -> pd.DataFrame:
+    number_of_trips = np.where(
+        rng.random(len(df_zp)) < 0.2, rng.integers(1, 3, len(df_zp)), 0
+    )
+    df_overnight_trips = pd.DataFrame(
+        {
+            "HHNR": np.repeat(df_zp["HHNR"].to_numpy(), number_of_trips),
+            "WP": np.repeat(df_zp["WP"].to_numpy(), number_of_trips),
+        }
+    )
+    df_overnight_trips.insert(
+        1, "REISENR", df_overnight_trips.groupby("HHNR").cumcount() + 1
+    )
+    df_overnight_trips["f70700"] = integers(1, 14)(rng, len(df_overnight_trips))
+    return df_overnight_trips
+
+
+def generate_chunk(
+    rng: np.random.Generator, year: int, hhnr: np.ndarray
+) -> Dict[str, pd.DataFrame]:
+    """All tables of the MTMC for the households hhnr."""
+    df_hh = generate_households(rng, year, hhnr)
+    df_hhp = generate_household_persons(rng, df_hh)
+    df_zp = generate_target_persons(rng, year, df_hh, df_hhp)
+    df_trips = generate_trips(rng, year, df_zp)
+    return {
+        "hh": df_hh,
+        "hhp": df_hhp,
+        "zp": df_zp,
+        "wegeinland": df_trips.drop(columns=["mobi_mode"]),
+        "etappen": generate_segments(rng, year, df_trips),
+        "ausgaenge": generate_tours(df_trips),
+        "reisenmueb": generate_overnight_trips(rng, df_zp),
+    }
+
+
+def write_synthetic_mtmc(
+    path_to_mtmc_data: Path,
+    years: Sequence[int] = (2015, 2020, 2021),
+    scale: float = 1.0,
+    seed: int = 0,
+) -> Dict[tuple, Path]:
+    """Writes synthetic raw files of the MTMC for the years, for all tables of the catalog of these years.
+    scale: number of households relative to the MTMC (BASE_NUMBER_OF_HOUSEHOLDS), e.g. 0.01 for tests, 100 for
+    benchmarks. Returns the path of each file by (year, table)."""
+    if scale <= 0:
+        raise ValueError("The scale must be positive!")
+    rng = np.random.default_rng(seed)
+    paths_to_files = {}
+    for year in years:
+        if year not in BASE_NUMBER_OF_HOUSEHOLDS:
+            raise ValueError(
+                "Synthetic data only for the years "
+                + ", ".join(str(year) for year in BASE_NUMBER_OF_HOUSEHOLDS)
+            )
+        mtmc_tables = [table for table in TABLES if (year, table) in MTMC_CATALOG]
+        for mtmc_table in mtmc_tables:
+            path_to_file = get_path_to_raw_file(year, mtmc_table, path_to_mtmc_data)
+            path_to_file.parent.mkdir(parents=True, exist_ok=True)
+            if path_to_file.exists():
+                path_to_file.unlink()
+            paths_to_files[(year, mtmc_table)] = path_to_file
+        number_of_households = max(1, round(BASE_NUMBER_OF_HOUSEHOLDS[year] * scale))
+        for first_household in range(
+            0, number_of_households, NUMBER_OF_HOUSEHOLDS_PER_CHUNK
+        ):
+            last_household = min(
+                first_household + NUMBER_OF_HOUSEHOLDS_PER_CHUNK, number_of_households
+            )
+            hhnr = FIRST_HHNR + np.arange(first_household, last_household)
+            chunk = generate_chunk(rng, year, hhnr)
+            for mtmc_table in mtmc_tables:
+                write_raw_file(
+                    chunk[mtmc_table],
+                    year,
+                    mtmc_table,
+                    paths_to_files[(year, mtmc_table)],
+                    write_header=first_household == 0,
+                )
+    return paths_to_files
+
+
+def write_raw_file(
+    df: pd.DataFrame,
+    year: int,
+    mtmc_table: str,
+    path_to_file: Path,
+    write_header: bool,
+) -> None:
+    """Appends the rows to the raw file, in the format of the catalog."""
+    table_spec = get_table_spec(year, mtmc_table)
+    header: Union[bool, List[str]] = False
+    if write_header:
+        header = df.columns.tolist()
+        if table_spec.first_column_name is not None:
+            header[0] = WRONGLY_CODED_HHNR
+    df.to_csv(
+        path_to_file,
+        sep=table_spec.delimiter,
+        encoding=table_spec.encoding,
+        index=False,
+        header=header,
+        mode="a",
+    )
+
+
+if __name__ == "__main__":
+    SCALE = 1.0
+    start = time.perf_counter()
+    files = write_synthetic_mtmc(Path("synthetic_mtmc"), scale=SCALE)
+    for (year, table), path in files.items():
+        print(year, table, path, "{:.1f} MB".format(path.stat().st_size / 1e6))
+    print("Written in {:.1f} s".format(time.perf_counter() - start))
@@ -0,0 +1,54 @@
+"""Fixtures shared by the tests: synthetic raw files of the MTMC (see synthetic_mtmc.py), synthetic zones and cache
+folders in a temporary folder, so that the tests never write to the caches of the user."""
+import sys
+from pathlib import Path
+
+import geopandas
+import numpy as np
+import pytest
+import shapely
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from simba.mobi.mzmv import config  # noqa: E402
+from simba.mobi.mzmv.utils_mtmc.synthetic_mtmc import write_synthetic_mtmc  # noqa: E402
+
+# Number of households relative to the MTMC: a few hundred households per year
+SCALE = 0.005
+
+
+@pytest.fixture(scope="session")
+def path_to_mtmc_data(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path_to_mtmc_data = tmp_path_factory.mktemp("mtmc")
+    write_synthetic_mtmc(path_to_mtmc_data, scale=SCALE)
+    return path_to_mtmc_data
+
+
+@pytest.fixture(scope="session")
+def path_to_zones(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Grid of square zones of 10 km over Switzerland in LV95, with the MOBi variables, as a GeoPackage."""
+    x, y = np.meshgrid(
+        np.arange(2480000, 2840000, 10000), np.arange(1070000, 1300000, 10000)
+    )
+    x, y = x.ravel(), y.ravel()
+    rng = np.random.default_rng(0)
+    zones = geopandas.GeoDataFrame(
+        {
+            "zone_id": np.arange(len(x)) + 1,
+            "accsib_mul": rng.random(len(x)),
+            "accsib_pt": rng.random(len(x)),
+            "pc_car": rng.random(len(x)),
+        },
+        geometry=shapely.box(x, y, x + 10000, y + 10000),
+        crs="EPSG:2056",
+    )
+    path_to_zones = tmp_path_factory.mktemp("zones") / "zones.gpkg"
+    zones.to_file(path_to_zones)
+    return path_to_zones
+
+
+@pytest.fixture(autouse=True)
+def cache_folders(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(config, "path_to_mtmc_cache", tmp_path / "mtmc_cache")
+    monkeypatch.setattr(config, "path_to_zone_cache", tmp_path / "zone_cache")
+    return tmp_path
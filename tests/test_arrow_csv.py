@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv import config
+from simba.mobi.mzmv.utils_mtmc import arrow_csv
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import get_cache_directory
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import read_csv_with_cache
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import read_raw_csv
+
+pytest.importorskip("pyarrow")
+
+NAMES = ["HHNR", "f51300", "E_Ausland", "rdist", "f51100", "Tag"]
+FILTERS = [("f51300", "==", 1), ("E_Ausland", "!=", 1)]
+
+
+@pytest.fixture
+def path_to_raw_file(tmp_path: Path) -> Path:
+    """Raw file of several blocks, with decimals in the column rdist only after the first rows."""
+    size = 5000
+    rng = np.random.default_rng(0)
+    rdist = rng.integers(0, 10, size).astype(np.float64)
+    rdist[size // 2 :] += 0.5
+    df = pd.DataFrame(
+        {
+            "HHNR": np.arange(size),
+            "f51300": rng.integers(1, 4, size),
+            "E_Ausland": rng.choice([1.0, 2.0, np.nan], size),
+            "rdist": rdist,
+            "f51100": rng.integers(0, 1440, size),
+            "Tag": "2021-03-01",
+        }
+    )
+    path_to_raw_file = tmp_path / "etappen.csv"
+    with open(path_to_raw_file, "w", encoding="latin1") as raw_file:
+        # The integers of rdist are written without decimals, as in the raw files
+        df.astype({"rdist": object}).map(
+            lambda value: int(value)
+            if isinstance(value, float) and value.is_integer()
+            else value
+        ).to_csv(raw_file, index=False)
+    return path_to_raw_file
+
+
+def read(path_to_raw_file: Path, engine: str, **kwargs) -> pd.DataFrame:
+    return read_raw_csv(
+        path_to_raw_file, engine=engine, names=NAMES, header=0, **kwargs
+    )
+
+
+@pytest.mark.parametrize("usecols", [None, ["HHNR", "rdist", "Tag"]])
+@pytest.mark.parametrize("block_size", [1 << 12, 1 << 24])
+def test_streamed_as_pandas(path_to_raw_file, usecols, block_size, monkeypatch):
+    # Small blocks: the types inferred on the first block do not fit rdist in the later blocks
+    monkeypatch.setattr(arrow_csv, "BLOCK_SIZE", block_size)
+    expected = read(path_to_raw_file, "pandas", usecols=usecols, filters=FILTERS)
+    assert 0 < len(expected) < 5000
+    pd.testing.assert_frame_equal(
+        read(path_to_raw_file, "pyarrow", usecols=usecols, filters=FILTERS),
+        expected,
+        check_dtype=False,
+    )
+
+
+def test_streamed_blocks(path_to_raw_file, monkeypatch):
+    """With types given for the columns, each block is filtered while streaming, without reading the file at once."""
+    monkeypatch.setattr(arrow_csv, "BLOCK_SIZE", 1 << 12)
+    monkeypatch.setattr(
+        arrow_csv.pa_csv,
+        "read_csv",
+        lambda *args, **kwargs: pytest.fail("The file is read at once"),
+    )
+    df = read(
+        path_to_raw_file,
+        "pyarrow",
+        usecols=["HHNR", "rdist"],
+        dtype={"rdist": float},
+        filters=FILTERS,
+    )
+    expected = read(
+        path_to_raw_file,
+        "pandas",
+        usecols=["HHNR", "rdist"],
+        dtype={"rdist": float},
+        filters=FILTERS,
+    )
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_no_matching_rows(path_to_raw_file):
+    df = read(path_to_raw_file, "pyarrow", usecols=["HHNR"], filters=[("HHNR", "<", 0)])
+    assert df.columns.tolist() == ["HHNR"]
+    assert len(df) == 0
+
+
+def test_engine_in_cache_fingerprint(path_to_raw_file, monkeypatch):
+    """A table cached by one engine is parsed again by the other one (and replaces the older cache file)."""
+    monkeypatch.setattr(config, "use_columnar_cache", True)
+    cache_files = []
+    for engine in ["pandas", "pyarrow"]:
+        df = read_csv_with_cache(
+            path_to_raw_file,
+            2021,
+            "etappen",
+            path_to_raw_file.parent,
+            engine=engine,
+            names=NAMES,
+            header=0,
+        )
+        pd.testing.assert_frame_equal(df, read(path_to_raw_file, engine))
+        cache_files += list(
+            get_cache_directory(path_to_raw_file.parent).rglob("*.parquet")
+        )
+    assert len(cache_files) == 2
+    assert cache_files[0] != cache_files[1]
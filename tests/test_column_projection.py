@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from simba.mobi.choice.models.mobility_tools.driving_license import data_loader
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import load_many
+from simba.mobi.mzmv.utils_mtmc.mtmc_codes import get_mzmv_codes
+
+YEARS = [2015, 2020, 2021]
+
+# Columns of the raw tables read by the data loader of the driving licence model (get_data_per_year and
+# generate_years), see the docstring of get_mtmc_requests
+COLUMNS_READ_BY_DATA_LOADER = {
+    "zp": ["HHNR", "alter", "f20400a", "nation", "sprache", "ERWERB"],
+    "hh": ["HHNR", "W_X", "W_Y", "hhtyp"],
+}
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_projected_requests_cover_data_loader(path_to_mtmc_data: Path, year: int):
+    requests = data_loader.get_mtmc_requests(year, path_to_mtmc_data)
+    assert [mtmc_table for _, mtmc_table, _ in requests] == ["zp", "hh"]
+    for _, mtmc_table, columns in requests:
+        # Generic names (e.g. has_driving_licence) are read from the columns of their codes
+        assert set(COLUMNS_READ_BY_DATA_LOADER[mtmc_table]) <= set(
+            get_mzmv_codes(columns, year, mtmc_table)
+        )
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_projected_data_as_explicit_columns(path_to_mtmc_data: Path, year: int):
+    """The data of the year read with the projected columns equals the data read with the explicit columns."""
+    df_zp = data_loader.get_data_per_year(year, path_to_mtmc_data)
+    mtmc_tables = load_many(
+        [
+            (year, mtmc_table, columns)
+            for mtmc_table, columns in COLUMNS_READ_BY_DATA_LOADER.items()
+        ],
+        path_to_mtmc_data,
+    )
+    pd.testing.assert_frame_equal(
+        df_zp,
+        data_loader.get_data_per_year(year, path_to_mtmc_data, mtmc_tables=mtmc_tables),
+    )
+
+
+def test_generate_years(path_to_mtmc_data: Path, path_to_zones: Path):
+    data_of_years = data_loader.generate_years(YEARS, path_to_mtmc_data, path_to_zones)
+    for year in YEARS:
+        df_zp = data_of_years[year]
+        assert len(df_zp) > 0
+        assert {
+            "age",
+            "driving_licence",
+            "language",
+            "full_time",
+            "part_time",
+            "is_swiss",
+            "hhtyp",
+            "year",
+        } | set(data_loader.MOBI_VARIABLES) <= set(df_zp.columns)
+        assert set(df_zp["driving_licence"].unique()) <= {0, 1}
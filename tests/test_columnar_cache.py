@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv import config
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import read_csv_with_cache
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import read_raw_csv
+
+DTYPE = {"HHNR": int, "WP": np.float64, "gesl": int, "ZW2_HNR": str}
+
+
+@pytest.fixture
+def path_to_raw_file(tmp_path: Path) -> Path:
+    """Raw file with a missing value in an integer column (gesl)."""
+    df = pd.DataFrame(
+        {
+            "HHNR": np.arange(5),
+            "WP": [0.5, 1.5, 2.5, 1.0, 3.0],
+            "gesl": [1, 2, np.nan, 2, 1],
+            "ZW2_HNR": ["1", "", "12a", "3", "7"],
+        }
+    )
+    path_to_raw_file = tmp_path / "zielpersonen.csv"
+    df.to_csv(path_to_raw_file, sep=";", index=False)
+    return path_to_raw_file
+
+
+def read(path_to_raw_file: Path, usecols) -> pd.DataFrame:
+    return read_csv_with_cache(
+        path_to_raw_file,
+        2020,
+        "zp",
+        path_to_raw_file.parent,
+        usecols=usecols,
+        dtype=DTYPE,
+        sep=";",
+    )
+
+
+@pytest.mark.parametrize("use_columnar_cache", [False, True])
+def test_integer_types_applied_to_requested_columns(
+    path_to_raw_file, use_columnar_cache, monkeypatch
+):
+    monkeypatch.setattr(config, "use_columnar_cache", use_columnar_cache)
+    usecols = ["HHNR", "WP", "ZW2_HNR"]
+    expected = read_raw_csv(
+        path_to_raw_file,
+        usecols=usecols,
+        dtype={column: DTYPE[column] for column in usecols},
+        sep=";",
+    )
+    # Twice: the first read parses the raw file (and writes the cache), the second reads the cache
+    for _ in range(2):
+        df = read(path_to_raw_file, usecols)
+        pd.testing.assert_frame_equal(df, expected)
+        assert df["HHNR"].dtype == np.int64
+        # The missing value of the integer column fails only the reads of this column
+        with pytest.raises(ValueError):
+            read(path_to_raw_file, ["HHNR", "gesl"])
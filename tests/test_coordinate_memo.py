@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import numpy as np
+
+from simba.mobi.choice.utils.coordinate_memo import NOT_IN_MEMO
+from simba.mobi.choice.utils.coordinate_memo import CoordinateMemo
+from simba.mobi.choice.utils.coordinate_memo import get_coordinate_keys
+from simba.mobi.choice.utils.coordinate_memo import read_memo_file
+
+
+def test_memos_flushed_to_the_same_file(tmp_path: Path):
+    path_to_memo_file = tmp_path / "zones.memo.npz"
+    # Two processes, which read the memo file before any of them flushed
+    memo_1 = CoordinateMemo(path_to_memo_file)
+    memo_2 = CoordinateMemo(path_to_memo_file)
+    keys_1 = get_coordinate_keys(np.array([1.0, 2.0, 3.0]), np.array([1.0, 2.0, 3.0]))
+    keys_2 = get_coordinate_keys(np.array([3.0, 4.0]), np.array([3.0, 4.0]))
+    memo_1.add(keys_1, np.array([10, 20, 30]))
+    memo_2.add(keys_2, np.array([30, -1]))
+    memo_1.flush()
+    memo_2.flush()
+    keys, positions = read_memo_file(path_to_memo_file)
+    assert dict(zip(keys, positions)) == dict(
+        zip(np.concatenate([keys_1, keys_2[1:]]), [10, 20, 30, -1])
+    )
+    # A new memo reads the union
+    memo = CoordinateMemo(path_to_memo_file)
+    np.testing.assert_array_equal(
+        memo.look_up(np.concatenate([keys_2, keys_1])), [30, -1, 10, 20, 30]
+    )
+
+
+def test_missing_coordinates_not_stored(tmp_path: Path):
+    memo = CoordinateMemo(tmp_path / "zones.memo.npz")
+    keys = get_coordinate_keys(np.array([1.0, np.nan]), np.array([1.0, 2.0]))
+    memo.add(keys, np.array([5, 6]))
+    np.testing.assert_array_equal(memo.look_up(keys), [5, NOT_IN_MEMO])
+    memo.flush()
+    assert len(read_memo_file(tmp_path / "zones.memo.npz")[0]) == 1
+
+
+def test_memo_file_not_writable(tmp_path: Path):
+    # A folder cannot be created under a regular file
+    path_to_file = tmp_path / "file"
+    path_to_file.write_text("")
+    memo = CoordinateMemo(path_to_file / "zones.memo.npz")
+    keys = get_coordinate_keys(np.array([1.0, 2.0]), np.array([1.0, 2.0]))
+    memo.add(keys, np.array([5, 6]))
+    memo.flush()
+    # The entries are kept in memory, and not written again
+    assert not memo.new_keys
+    np.testing.assert_array_equal(memo.look_up(keys), [5, 6])
+
+
+def test_memo_file_not_readable(tmp_path: Path):
+    path_to_memo_file = tmp_path / "zones.memo.npz"
+    path_to_memo_file.write_text("not a memo")
+    memo = CoordinateMemo(path_to_memo_file)
+    assert len(memo) == 0
+    keys = get_coordinate_keys(np.array([1.0]), np.array([1.0]))
+    memo.add(keys, np.array([5]))
+    memo.flush()
+    np.testing.assert_array_equal(read_memo_file(path_to_memo_file)[1], [5])
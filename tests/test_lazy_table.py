@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_etappen
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_zp
+
+FILTERS = [("f51300", "==", 1), ("E_Ausland", "!=", 1)]
+
+
+def test_lazy_table_as_eager(path_to_mtmc_data: Path):
+    lazy_etappen = get_etappen(2021, path_to_mtmc_data, lazy=True)
+    assert lazy_etappen.number_of_reads == 0
+    lazy_walk_etappen = lazy_etappen.filter(FILTERS).select(["HHNR", "rdist", "WP"])
+    # Nothing is read before the first access
+    assert lazy_walk_etappen.number_of_reads == 0
+    expected = get_etappen(
+        2021, path_to_mtmc_data, ["HHNR", "rdist", "WP"], filters=FILTERS
+    )
+    pd.testing.assert_series_equal(lazy_walk_etappen["rdist"], expected["rdist"])
+    pd.testing.assert_frame_equal(
+        lazy_walk_etappen[["WP", "HHNR"]], expected[["WP", "HHNR"]]
+    )
+    # Columns in the order of the selection
+    pd.testing.assert_frame_equal(
+        lazy_walk_etappen.collect(), expected[["HHNR", "rdist", "WP"]]
+    )
+    # The selected columns are read in one pass, at the first access
+    assert lazy_walk_etappen.number_of_reads == 1
+
+
+def test_lazy_table_without_selection(path_to_mtmc_data: Path):
+    lazy_zp = get_zp(2021, path_to_mtmc_data, lazy=True)
+    expected = get_zp(2021, path_to_mtmc_data)
+    pd.testing.assert_series_equal(lazy_zp["alter"], expected["alter"])
+    pd.testing.assert_series_equal(lazy_zp["alter"], expected["alter"])
+    pd.testing.assert_series_equal(lazy_zp["WP"], expected["WP"])
+    # Each column is read once
+    assert lazy_zp.number_of_reads == 2
+    pd.testing.assert_frame_equal(lazy_zp.collect(), expected)
+
+
+def test_lazy_table_generic_names(path_to_mtmc_data: Path):
+    """Codes of the MTMC are accessed by their code, and returned as by the eager loader (generic name)."""
+    lazy_zp = get_zp(2021, path_to_mtmc_data, ["HHNR", "f41600_01a"], lazy=True)
+    expected = get_zp(2021, path_to_mtmc_data, ["HHNR", "f41600_01a"])
+    assert "has_ga" in expected.columns
+    assert lazy_zp["f41600_01a"].equals(expected["has_ga"])
+
+
+def test_column_not_selected(path_to_mtmc_data: Path):
+    lazy_zp = get_zp(2021, path_to_mtmc_data, ["HHNR", "alter"], lazy=True)
+    with pytest.raises(ValueError):
+        lazy_zp["WP"]
+    assert lazy_zp.number_of_reads == 0
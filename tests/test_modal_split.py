@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv.utils2015.compute_confidence_interval import MAGIC_NUMBER
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hh
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_trips_in_switzerland
+from simba.mobi.mzmv.utils_mtmc.modal_split import MODE_RECODING
+from simba.mobi.mzmv.utils_mtmc.modal_split import Z_SCORE
+from simba.mobi.mzmv.utils_mtmc.modal_split import get_modal_split
+from simba.mobi.mzmv.utils_mtmc.modal_split import get_modal_split_of_years
+
+YEARS = [2015, 2021]
+
+
+def get_expected_modal_split(path_to_mtmc_data: Path) -> pd.DataFrame:
+    """Modal split by year, purpose and region, with one groupby per measure."""
+    list_of_df = []
+    for year in YEARS:
+        df = get_trips_in_switzerland(
+            year,
+            path_to_mtmc_data,
+            ["HHNR", "WP", "wmittel1", "rdist", "dauer2", "wzweck1"],
+        )
+        df = pd.merge(
+            df, get_hh(year, path_to_mtmc_data, ["HHNR", "W_REGION"]), on="HHNR"
+        )
+        df["mode"] = df["wmittel1"].map(MODE_RECODING[(year, "wegeinland")])
+        list_of_df.append(df.assign(year=year))
+    df = pd.concat(list_of_df, ignore_index=True)
+    segment_columns = ["year", "wzweck1", "W_REGION"]
+    df["trips"] = df["WP"]
+    df["distance"] = df["WP"] * df["rdist"].clip(lower=0)
+    df["time"] = df["WP"] * df["dauer2"].clip(lower=0)
+    sums = df.groupby(segment_columns + ["mode"])[["trips", "distance", "time"]].sum()
+    shares = sums / sums.groupby(segment_columns).transform("sum")
+    nb_of_obs = df.groupby(segment_columns)["HHNR"].nunique().rename("nb_of_obs")
+    return shares.reset_index().merge(nb_of_obs.reset_index(), on=segment_columns)
+
+
+def test_modal_split_as_groupby(path_to_mtmc_data: Path):
+    modal_split = get_modal_split_of_years(
+        YEARS, path_to_mtmc_data, ["wzweck1"], ["W_REGION"]
+    )
+    expected = get_expected_modal_split(path_to_mtmc_data)
+    segment_columns = ["year", "wzweck1", "W_REGION", "mode"]
+    # The modal split has a row for each mode of each segment, also for the modes without trips
+    compared = pd.merge(expected, modal_split, on=segment_columns, how="left")
+    assert len(modal_split) == 6 * len(expected.groupby(segment_columns[:-1]))
+    for measure in ["trips", "distance", "time"]:
+        np.testing.assert_allclose(compared["share_" + measure], compared[measure])
+        has_no_trips = ~modal_split.set_index(segment_columns).index.isin(
+            expected.set_index(segment_columns).index
+        )
+        assert (modal_split.loc[has_no_trips, "share_" + measure] == 0).all()
+    np.testing.assert_array_equal(compared["nb_of_obs_x"], compared["nb_of_obs_y"])
+    np.testing.assert_allclose(
+        compared["confidence_interval_trips"],
+        Z_SCORE
+        * MAGIC_NUMBER
+        * np.sqrt(
+            compared["trips"] * (1 - compared["trips"]) / compared["nb_of_obs_x"]
+        ),
+    )
+
+
+def test_unknown_mode():
+    df = pd.DataFrame(
+        {"HHNR": [1, 2], "WP": [1.0, 1.0], "wmittel1": [2, 999], "rdist": [1.0, 2.0]}
+    )
+    with pytest.raises(ValueError):
+        get_modal_split(
+            df, "wegeinland", year=2021, measure_columns={"distance": "rdist"}
+        )
+
+
+def test_negative_codes_count_as_0():
+    # Codes of the MTMC for no answer (-99, -98, -97) in the measures
+    df = pd.DataFrame(
+        {
+            "HHNR": [1, 2, 3],
+            "WP": [1.0, 2.0, 1.0],
+            "wmittel1": [16, 8, 8],
+            "rdist": [1.0, 3.0, -99.0],
+        }
+    )
+    modal_split = get_modal_split(
+        df, "wegeinland", year=2021, measure_columns={"distance": "rdist"}
+    ).set_index("mode")
+    assert modal_split.loc["walk", "share_distance"] == pytest.approx(1 / 7)
+    assert modal_split.loc["car", "share_distance"] == pytest.approx(6 / 7)
+    assert modal_split.loc["car", "share_trips"] == pytest.approx(3 / 4)
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv import config
+from simba.mobi.mzmv.utils_mtmc import columnar_cache
+from simba.mobi.mzmv.utils_mtmc.arrow_csv import is_arrow_available
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import read_csv_with_cache
+from simba.mobi.mzmv.utils_mtmc.columnar_cache import read_raw_csv
+from simba.mobi.mzmv.utils_mtmc.mtmc_filters import apply_filters
+
+FILTERS = [
+    [("E_Ausland", "!=", 1)],
+    [("E_Ausland", "==", 2)],
+    [("E_Ausland", "not in", {1})],
+    [("E_Ausland", "in", {1, 2})],
+    [("E_Ausland", "<", 2)],
+    [("rdist", ">=", 1.0), ("E_Ausland", "!=", 2)],
+]
+
+NAMES = ["HHNR", "E_Ausland", "rdist"]
+
+
+@pytest.fixture
+def path_to_raw_file(tmp_path: Path) -> Path:
+    """Raw file with missing values in the filtered columns."""
+    df = pd.DataFrame(
+        {
+            "HHNR": np.arange(10),
+            "E_Ausland": [1, 2, np.nan, 2, 1, np.nan, 2, 2, 1, 2],
+            "rdist": [0.5, 1.5, 2.5, np.nan, 3.0, 1.0, 0.2, 4.0, np.nan, 1.2],
+        }
+    )
+    path_to_raw_file = tmp_path / "etappen.csv"
+    df.to_csv(path_to_raw_file, index=False)
+    return path_to_raw_file
+
+
+def read_raw(path_to_raw_file: Path, filters, engine: str) -> pd.DataFrame:
+    return read_raw_csv(
+        path_to_raw_file,
+        usecols=["HHNR", "E_Ausland"],
+        filters=filters,
+        engine=engine,
+        names=NAMES,
+        header=0,
+    )
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_same_rows_on_all_paths(path_to_raw_file, filters, monkeypatch):
+    # Raw path: whole file parsed, then filtered
+    expected = apply_filters(pd.read_csv(path_to_raw_file), filters)[
+        ["HHNR", "E_Ausland"]
+    ].reset_index(drop=True)
+    assert expected["E_Ausland"].notna().all()
+    # Chunked path, with several chunks
+    monkeypatch.setattr(columnar_cache, "CHUNK_SIZE", 3)
+    pd.testing.assert_frame_equal(
+        read_raw(path_to_raw_file, filters, "pandas"), expected
+    )
+    if is_arrow_available():
+        pd.testing.assert_frame_equal(
+            read_raw(path_to_raw_file, filters, "pyarrow"), expected
+        )
+        # Cache path: first read (cache written), then the filters pushed down to Parquet
+        monkeypatch.setattr(config, "use_columnar_cache", True)
+        for _ in range(2):
+            df = read_csv_with_cache(
+                path_to_raw_file,
+                2021,
+                "etappen",
+                path_to_raw_file.parent,
+                usecols=["HHNR", "E_Ausland"],
+                filters=filters,
+                names=NAMES,
+                header=0,
+            )
+            pd.testing.assert_frame_equal(df, expected)
+
+
+def test_missing_values_never_match():
+    df = pd.DataFrame({"x": [1.0, np.nan, 2.0]})
+    assert apply_filters(df, [("x", "!=", 1)])["x"].tolist() == [2.0]
+    assert apply_filters(df, [("x", "not in", {1})])["x"].tolist() == [2.0]
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_etappen
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_hh
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_trips_in_switzerland
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import add_person_columns
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import aggregate_per_person
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import aggregate_per_trip
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import broadcast_to_stages
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import build_hierarchy
+from simba.mobi.mzmv.utils_mtmc.mtmc_hierarchy import select_stages
+
+AGGREGATIONS = {"rdist": "sum", "e_dauer": "sum", "WP": "first", "ETNR": "count"}
+
+
+@pytest.fixture(scope="module")
+def mtmc_tables(path_to_mtmc_data: Path):
+    df_etappen = get_etappen(
+        2021,
+        path_to_mtmc_data,
+        ["HHNR", "WEGNR", "ETNR", "WP", "f51300", "rdist", "e_dauer"],
+    )
+    df_trips = get_trips_in_switzerland(
+        2021, path_to_mtmc_data, ["HHNR", "WEGNR", "wzweck1"]
+    )
+    df_hh = get_hh(2021, path_to_mtmc_data, ["HHNR", "W_REGION"])
+    return df_etappen, df_trips, df_hh
+
+
+def sort_stages(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(["HHNR", "WEGNR"], kind="stable").reset_index(drop=True)
+
+
+def test_build_hierarchy_as_merge(mtmc_tables):
+    df_etappen, df_trips, df_hh = mtmc_tables
+    hierarchy = add_person_columns(build_hierarchy(df_etappen, df_trips), df_hh)
+    expected = sort_stages(
+        pd.merge(
+            pd.merge(df_etappen, df_trips, on=["HHNR", "WEGNR"], how="left"),
+            df_hh,
+            on="HHNR",
+            how="left",
+        )
+    )
+    pd.testing.assert_frame_equal(hierarchy.stages, expected)
+    np.testing.assert_array_equal(hierarchy.persons, np.unique(df_etappen["HHNR"]))
+
+
+@pytest.mark.parametrize("walk_only", [False, True])
+def test_aggregations_as_groupby(mtmc_tables, walk_only):
+    df_etappen, df_trips, _ = mtmc_tables
+    hierarchy = build_hierarchy(df_etappen, df_trips)
+    expected_stages = sort_stages(
+        pd.merge(df_etappen, df_trips, on=["HHNR", "WEGNR"], how="left")
+    )
+    if walk_only:
+        # Subset of the segments, from the offsets of the hierarchy
+        hierarchy = select_stages(hierarchy, hierarchy.stages["f51300"] == 1)
+        expected_stages = expected_stages[expected_stages["f51300"] == 1].reset_index(
+            drop=True
+        )
+        pd.testing.assert_frame_equal(hierarchy.stages, expected_stages)
+    per_person = aggregate_per_person(hierarchy, AGGREGATIONS)
+    pd.testing.assert_frame_equal(
+        per_person,
+        expected_stages.groupby("HHNR").agg(AGGREGATIONS).reset_index(),
+        check_dtype=False,
+    )
+    pd.testing.assert_frame_equal(
+        aggregate_per_trip(hierarchy, AGGREGATIONS),
+        expected_stages.groupby(["HHNR", "WEGNR"]).agg(AGGREGATIONS).reset_index(),
+        check_dtype=False,
+    )
+    # Values per person back on the segments, as a merge on HHNR
+    np.testing.assert_array_equal(
+        broadcast_to_stages(hierarchy, per_person["rdist"].to_numpy()),
+        pd.merge(expected_stages[["HHNR"]], per_person, on="HHNR", how="left")[
+            "rdist"
+        ].to_numpy(),
+    )
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import REDUCTIONS
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import index_table
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import segment_reduce
+from simba.mobi.mzmv.utils_mtmc.mtmc_store import take_join
+
+
+@pytest.fixture
+def df_hh() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "HHNR": [30, 10, 20, 40],
+            "hhgr": [1, 3, 2, 4],
+            "W_X": [2600000.5, np.nan, 2700000.0, 2500000.0],
+        }
+    )
+
+
+@pytest.fixture
+def df_etappen() -> pd.DataFrame:
+    """Segments in the order of the file, with missing values and a household without persons in df_hh."""
+    rng = np.random.default_rng(0)
+    size = 200
+    rdist = rng.random(size) * 10
+    rdist[rng.random(size) < 0.1] = np.nan
+    return pd.DataFrame(
+        {
+            "HHNR": rng.choice([10, 20, 30, 50], size),
+            "WEGNR": rng.integers(1, 6, size),
+            "rdist": rdist,
+            "f51300": rng.integers(1, 4, size),
+        }
+    )
+
+
+def test_take_join_as_merge(df_hh, df_etappen):
+    # HHNR 50 is not in the households, HHNR 40 has no segment
+    expected = pd.merge(df_etappen, df_hh, on="HHNR", how="left")
+    pd.testing.assert_frame_equal(take_join(df_etappen, index_table(df_hh)), expected)
+    pd.testing.assert_frame_equal(
+        take_join(df_etappen, index_table(df_hh), ["W_X"]),
+        pd.merge(df_etappen, df_hh[["HHNR", "W_X"]], on="HHNR", how="left"),
+    )
+
+
+def test_take_join_missing_keys(df_hh):
+    df = pd.DataFrame({"HHNR": [20, np.nan, 99, -1, 10]})
+    joined = take_join(df, index_table(df_hh), ["hhgr"])
+    assert joined["hhgr"].tolist()[0] == 2
+    assert joined["hhgr"].tolist()[4] == 3
+    assert joined["hhgr"].iloc[1:4].isna().all()
+
+
+def test_take_join_overlapping_columns(df_hh):
+    df = pd.DataFrame({"HHNR": [10, 20], "hhgr": [0, 0]})
+    with pytest.raises(ValueError):
+        take_join(df, index_table(df_hh))
+    # The other columns can be joined
+    assert take_join(df, index_table(df_hh), ["W_X"])["hhgr"].tolist() == [0, 0]
+
+
+def test_take_join_needs_unique_keys(df_hh, df_etappen):
+    with pytest.raises(ValueError):
+        take_join(df_hh, index_table(df_etappen))
+
+
+@pytest.mark.parametrize("reduction", REDUCTIONS)
+@pytest.mark.parametrize("key_columns", [["HHNR"], ["HHNR", "WEGNR"]])
+def test_segment_reduce_as_groupby(df_etappen, reduction, key_columns):
+    columns = ["rdist", "f51300"]
+    reduced = segment_reduce(index_table(df_etappen, key_columns), columns, reduction)
+    expected = getattr(df_etappen.groupby(key_columns)[columns], reduction)()
+    if reduction == "size":
+        expected = pd.DataFrame({column: expected for column in columns})
+    expected = expected.reset_index()
+    pd.testing.assert_frame_equal(reduced.df, expected, check_dtype=False)
+
+
+def test_segment_reduce_key_without_values():
+    df = pd.DataFrame({"HHNR": [1, 1, 2], "rdist": [np.nan, np.nan, 1.0]})
+    reduced = segment_reduce(index_table(df), ["rdist"], "max").df
+    assert np.isnan(reduced["rdist"].iloc[0])
+    assert reduced["rdist"].iloc[1] == 1.0
+    assert segment_reduce(index_table(df), ["rdist"], "first").df[
+        "rdist"
+    ].isna().tolist() == [True, False]
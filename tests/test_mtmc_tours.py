@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_etappen
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_trips_in_switzerland
+from simba.mobi.mzmv.utils_mtmc.mtmc_tours import TRIP_BACK_HOME
+from simba.mobi.mzmv.utils_mtmc.mtmc_tours import TRIP_COLUMNS
+from simba.mobi.mzmv.utils_mtmc.mtmc_tours import TRIP_FROM_HOME
+from simba.mobi.mzmv.utils_mtmc.mtmc_tours import add_tours_to_stages
+from simba.mobi.mzmv.utils_mtmc.mtmc_tours import aggregate_tours
+from simba.mobi.mzmv.utils_mtmc.mtmc_tours import assign_tours
+from simba.mobi.mzmv.utils_mtmc.mtmc_tours import compare_with_ausgaenge
+from simba.mobi.mzmv.utils_mtmc.mtmc_tours import get_tours_of_years
+
+
+def get_expected_tour_numbers(df_trips: pd.DataFrame) -> list:
+    """Tour number of each trip, sorted by person and WEGNR, with one loop over the trips."""
+    tour_numbers = []
+    for _, df_person in df_trips.sort_values(["HHNR", "WEGNR"]).groupby("HHNR"):
+        tour_number = 0
+        previous_wzweck2 = None
+        for wzweck2 in df_person["wzweck2"]:
+            if (
+                previous_wzweck2 is None
+                or previous_wzweck2 == TRIP_BACK_HOME
+                or wzweck2 == TRIP_FROM_HOME
+            ):
+                tour_number += 1
+            tour_numbers.append(tour_number)
+            previous_wzweck2 = wzweck2
+    return tour_numbers
+
+
+def test_tours_as_loop(path_to_mtmc_data: Path):
+    df_trips = get_trips_in_switzerland(2021, path_to_mtmc_data, TRIP_COLUMNS)
+    # Trips in a random order
+    df_trips = df_trips.sample(frac=1, random_state=0)
+    df_trips_with_tours = assign_tours(df_trips)
+    assert df_trips_with_tours["tour_number"].tolist() == get_expected_tour_numbers(
+        df_trips
+    )
+    assert (np.diff(df_trips_with_tours["tour_id"]) >= 0).all()
+    df_tours = aggregate_tours(df_trips_with_tours, 2021)
+    grouped = df_trips_with_tours.groupby("tour_id")
+    np.testing.assert_array_equal(df_tours["number_of_trips"], grouped.size())
+    np.testing.assert_allclose(df_tours["distance"], grouped["rdist"].sum(), rtol=1e-12)
+    # Segments with the tour of their trip, as a merge on HHNR and WEGNR
+    df_etappen = get_etappen(2021, path_to_mtmc_data, ["HHNR", "WEGNR", "ETNR"])
+    pd.testing.assert_frame_equal(
+        add_tours_to_stages(df_etappen, df_trips_with_tours),
+        pd.merge(
+            df_etappen,
+            df_trips_with_tours[["HHNR", "WEGNR", "tour_number", "tour_id"]],
+            on=["HHNR", "WEGNR"],
+            how="left",
+        ),
+        check_dtype=False,
+    )
+
+
+def test_tours_of_years(path_to_mtmc_data: Path):
+    df_tours = get_tours_of_years([2015, 2021], path_to_mtmc_data)
+    assert sorted(df_tours["year"].unique()) == [2015, 2021]
+    assert df_tours["tour_id"].is_unique
+    for year in [2015, 2021]:
+        df_trips = get_trips_in_switzerland(year, path_to_mtmc_data, TRIP_COLUMNS)
+        assert df_tours.loc[df_tours["year"] == year, "number_of_trips"].sum() == len(
+            df_trips
+        )
+
+
+def test_aggregates_of_tours():
+    # Person 1: home - work - home, then home - shop - leisure (not back home); person 2: round trip
+    df_trips = pd.DataFrame(
+        {
+            "HHNR": [1, 1, 1, 1, 2],
+            "WEGNR": [1, 2, 3, 4, 1],
+            "WP": [1.0, 1.0, 1.0, 1.0, 2.0],
+            "wzweck1": [2, 11, 4, 8, 8],
+            "wzweck2": [1, 2, 1, 3, 2],
+            "wmittel1": [16, 8, 2, 16, 15],
+            "rdist": [1.0, 5.0, 3.0, 3.0, 2.0],
+            "dauer2": [10.0, 20.0, -99.0, 5.0, 15.0],
+        }
+    )
+    df_tours = aggregate_tours(assign_tours(df_trips), 2021)
+    assert df_tours["tour_number"].tolist() == [1, 2, 1]
+    assert df_tours["number_of_trips"].tolist() == [2, 2, 1]
+    assert df_tours["travel_time"].tolist() == [30.0, 5.0, 15.0]
+    # Longest trip, the first one if several
+    assert df_tours["main_mode"].tolist() == ["car", "pt", "bike"]
+    assert df_tours["first_purpose"].tolist() == [2, 4, 8]
+    assert df_tours["chain_type"].tolist() == ["simple", "open", "round trip"]
+    df_ausgaenge = pd.DataFrame({"HHNR": [1, 1, 2, 2], "AUSNR": [1, 2, 1, 2]})
+    df_comparison = compare_with_ausgaenge(df_tours, df_ausgaenge)
+    assert df_comparison["HHNR"].tolist() == [2]
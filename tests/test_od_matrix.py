@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import geopandas
+import numpy as np
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_trips_in_switzerland
+from simba.mobi.mzmv.utils_mtmc.modal_split import MODE_RECODING
+from simba.mobi.mzmv.utils_mtmc.od_matrix import NO_ZONE
+from simba.mobi.mzmv.utils_mtmc.od_matrix import get_od_matrices
+from simba.mobi.mzmv.utils_mtmc.od_matrix import get_od_matrices_of_trips
+from simba.mobi.mzmv.utils_mtmc.od_matrix import get_weighted_average_of_skim
+
+
+@pytest.fixture(scope="module")
+def path_to_mobi_zones(path_to_zones: Path, tmp_path_factory) -> Path:
+    """The synthetic zones as MOBi zones (mobi-zones.shp), in a shuffled order."""
+    path_to_mobi_zones = tmp_path_factory.mktemp("mobi_zones")
+    zones = geopandas.read_file(path_to_zones)[["zone_id", "geometry"]]
+    zones.sample(frac=1, random_state=0).to_file(path_to_mobi_zones / "mobi-zones.shp")
+    return path_to_mobi_zones
+
+
+def test_od_matrices_as_groupby(path_to_mtmc_data, path_to_zones, path_to_mobi_zones):
+    od_matrices, sorted_zone_ids = get_od_matrices_of_trips(
+        2021, path_to_mtmc_data, path_to_mobi_zones
+    )
+    np.testing.assert_array_equal(sorted_zone_ids, np.sort(sorted_zone_ids))
+    # Reference: spatial joins with geopandas, then the sums of the weights by segment, origin and destination
+    df_trips = get_trips_in_switzerland(
+        2021,
+        path_to_mtmc_data,
+        ["WP", "wmittel1", "wzweck1", "S_X", "S_Y", "Z_X", "Z_Y"],
+    )
+    zones = geopandas.read_file(path_to_zones)[["zone_id", "geometry"]]
+    for end, (x, y) in {
+        "origin": ("S_X", "S_Y"),
+        "destination": ("Z_X", "Z_Y"),
+    }.items():
+        points = geopandas.GeoDataFrame(
+            geometry=geopandas.points_from_xy(df_trips[x], df_trips[y]), crs="EPSG:4326"
+        ).to_crs(zones.crs)
+        joined = geopandas.sjoin(points, zones, how="left", predicate="intersects")
+        joined = joined[~joined.index.duplicated(keep="first")]
+        df_trips[end] = joined["zone_id"].fillna(NO_ZONE).to_numpy(dtype=np.int64)
+    df_trips["mode"] = df_trips["wmittel1"].map(MODE_RECODING[(2021, "wegeinland")])
+    df_trips = df_trips[
+        (df_trips["origin"] != NO_ZONE) & (df_trips["destination"] != NO_ZONE)
+    ]
+    expected = df_trips.groupby(["mode", "wzweck1", "origin", "destination"])[
+        "WP"
+    ].sum()
+    assert len(expected) > 0
+    number_of_trips = 0
+    for (mode, wzweck1), od_matrix in od_matrices.items():
+        od_matrix = od_matrix.tocoo()
+        number_of_trips += od_matrix.nnz
+        np.testing.assert_allclose(
+            od_matrix.data,
+            expected.loc[
+                list(
+                    zip(
+                        [mode] * od_matrix.nnz,
+                        [wzweck1] * od_matrix.nnz,
+                        sorted_zone_ids[od_matrix.row],
+                        sorted_zone_ids[od_matrix.col],
+                    )
+                )
+            ].to_numpy(),
+        )
+    assert number_of_trips == len(expected)
+
+
+def test_trips_without_zone_ignored():
+    df_trips = pd.DataFrame(
+        {
+            "zone_id_origin": [10, 20, NO_ZONE, 10],
+            "zone_id_destination": [20, 20, 10, 20],
+            "mode": ["car", "car", "car", "walk"],
+            "WP": [1.0, 2.0, 4.0, 8.0],
+        }
+    )
+    od_matrices = get_od_matrices(df_trips, np.array([10, 20]), ["mode"])
+    np.testing.assert_array_equal(od_matrices[("car",)].toarray(), [[0, 1], [0, 2]])
+    np.testing.assert_array_equal(od_matrices[("walk",)].toarray(), [[0, 8], [0, 0]])
+    skim = np.array([[1.0, 3.0], [3.0, 6.0]])
+    assert get_weighted_average_of_skim(od_matrices[("car",)], skim) == 5.0
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv.pedestrian_speed import utils
+from simba.mobi.mzmv.pedestrian_speed.utils import get_and_filter_etappen
+from simba.mobi.mzmv.pedestrian_speed.utils import get_and_filter_walk_etappen
+from simba.mobi.mzmv.pedestrian_speed.utils import get_hours_as_text
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_etappen
+
+COLUMNS = ["HHNR", "WEGNR", "f51300", "E_Ausland", "rdist"]
+
+
+@pytest.mark.parametrize(
+    "lower_bound, upper_bound, hours_as_text",
+    [
+        # Intervals of the scripts, in minutes after midnight starting at minute 1
+        (1, 121, "0-2"),
+        (121, 241, "2-4"),
+        (1, 181, "0-3"),
+        (1321, 1441, "22-24"),
+        (7 * 60 + 1, 9 * 60 + 1, "7-9"),
+    ],
+)
+def test_get_hours_as_text(lower_bound, upper_bound, hours_as_text):
+    assert get_hours_as_text(lower_bound, upper_bound) == hours_as_text
+
+
+@pytest.mark.parametrize("year", [2015, 2021])
+def test_filtered_etappen(path_to_mtmc_data: Path, year: int, monkeypatch):
+    monkeypatch.setattr(utils, "path_to_mtmc_data", path_to_mtmc_data)
+    df_etappen = get_etappen(year, path_to_mtmc_data, COLUMNS)
+    in_switzerland = df_etappen["E_Ausland"].notna() & (df_etappen["E_Ausland"] != 1)
+    is_walk = df_etappen["f51300"] == 1
+    pd.testing.assert_frame_equal(
+        get_and_filter_etappen(year, COLUMNS),
+        df_etappen[in_switzerland].reset_index(drop=True),
+    )
+    walk_etappen = get_and_filter_walk_etappen(year, COLUMNS)
+    assert len(walk_etappen) > 0
+    pd.testing.assert_frame_equal(
+        walk_etappen, df_etappen[in_switzerland & is_walk].reset_index(drop=True)
+    )
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simba.mobi.mzmv.utils_mtmc.get_mtmc_files import get_zp
+from simba.mobi.mzmv.utils_mtmc.shared_tables import attach_table
+from simba.mobi.mzmv.utils_mtmc.shared_tables import publish_table
+
+pytest.importorskip("pyarrow")
+
+
+def test_published_table_attached(path_to_mtmc_data: Path, tmp_path: Path):
+    df_zp = get_zp(2021, path_to_mtmc_data, ["HHNR", "alter", "WP", "nation"])
+    path_to_shared_file = publish_table(df_zp, tmp_path / "shared" / "zp_2021.arrow")
+    # The temporary file of the atomic write is removed
+    assert [path.name for path in (tmp_path / "shared").iterdir()] == ["zp_2021.arrow"]
+    df_attached = attach_table(path_to_shared_file)
+    pd.testing.assert_frame_equal(df_attached, df_zp)
+    # The numerical columns without missing values are read-only views of the mapped file
+    assert not df_attached["WP"].to_numpy().flags.writeable
+    df_copy = df_attached.copy()
+    df_copy["WP"] *= 2
+    np.testing.assert_allclose(df_copy["WP"], 2 * df_zp["WP"])
+
+
+def test_empty_table(tmp_path: Path):
+    df = pd.DataFrame({"HHNR": np.array([], dtype=np.int64)})
+    pd.testing.assert_frame_equal(
+        attach_table(publish_table(df, tmp_path / "empty.arrow")), df
+    )
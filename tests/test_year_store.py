@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Dict
+from typing import List
+
+import pandas as pd
+import pytest
+
+from simba.mobi.choice.utils.year_store import get_path_to_dtypes
+from simba.mobi.choice.utils.year_store import get_stored_years
+from simba.mobi.choice.utils.year_store import read_years
+
+
+def get_data_of_year(year: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "HHNR": [year * 10 + 1, year * 10 + 2],
+            "year": [year, year],
+            "WP": [0.5, 1.5],
+            "sex": pd.Categorical(["m", "f"]),
+            "is_swiss": [True, False],
+        }
+    )
+
+
+class YearBuilder:
+    """build_years of read_years, recording the years it is called with."""
+
+    def __init__(self) -> None:
+        self.calls: List[List[int]] = []
+
+    def __call__(self, years: List[int]) -> Dict[int, pd.DataFrame]:
+        self.calls.append(list(years))
+        return {year: get_data_of_year(year) for year in years}
+
+
+def test_only_missing_years_built(tmp_path: Path):
+    path_to_store = tmp_path / "persons"
+    build_years = YearBuilder()
+    df = read_years(path_to_store, [2015, 2020], build_years)
+    assert build_years.calls == [[2015, 2020]]
+    assert get_stored_years(path_to_store) == [2015, 2020]
+    assert get_path_to_dtypes(path_to_store, 2015).exists()
+    # A new year is built alone, the stored years are read with their types
+    df = read_years(path_to_store, [2015, 2020, 2021], build_years)
+    assert build_years.calls == [[2015, 2020], [2021]]
+    expected = pd.concat(
+        [get_data_of_year(year) for year in [2015, 2020, 2021]], ignore_index=True
+    )
+    pd.testing.assert_frame_equal(df, expected)
+    # Order of the years given
+    df = read_years(path_to_store, [2021, 2015], build_years)
+    assert df["year"].drop_duplicates().tolist() == [2021, 2015]
+    assert len(build_years.calls) == 2
+
+
+def test_years_from_combined_file(tmp_path: Path):
+    """The combined file of a previous version of the loader is split into partitions."""
+    path_to_combined_file = tmp_path / "input15_20.csv"
+    pd.concat(
+        [get_data_of_year(year) for year in [2015, 2020]], ignore_index=True
+    ).to_csv(path_to_combined_file, index=False)
+    path_to_store = tmp_path / "persons"
+    build_years = YearBuilder()
+    df = read_years(
+        path_to_store,
+        [2015, 2020, 2021],
+        build_years,
+        path_to_combined_file=path_to_combined_file,
+    )
+    # Only the year not in the combined file is built
+    assert build_years.calls == [[2021]]
+    assert get_stored_years(path_to_store) == [2015, 2020, 2021]
+    assert df["year"].tolist() == [2015, 2015, 2020, 2020, 2021, 2021]
+    # The types of the combined file are those inferred by pandas, and kept in the partitions
+    expected = pd.read_csv(path_to_combined_file)
+    pd.testing.assert_frame_equal(
+        read_years(path_to_store, [2015, 2020], build_years), expected
+    )
+    assert build_years.calls == [[2021]]
+
+
+def test_missing_combined_file(tmp_path: Path):
+    build_years = YearBuilder()
+    read_years(
+        tmp_path / "persons",
+        [2015],
+        build_years,
+        path_to_combined_file=tmp_path / "input15.csv",
+    )
+    assert build_years.calls == [[2015]]
+
+
+def test_year_not_built(tmp_path: Path):
+    with pytest.raises(ValueError):
+        read_years(tmp_path / "persons", [2015, 2021], lambda years: {})
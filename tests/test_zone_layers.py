@@ -0,0 +1,29 @@
+from pathlib import Path
+
+import geopandas.testing
+
+from simba.mobi.choice.utils.zone_layers import get_cache_directory
+from simba.mobi.choice.utils.zone_layers import read_zone_layer
+from simba.mobi.mzmv import config
+
+
+def test_cache_outside_of_the_zone_folder(path_to_zones):
+    zones = read_zone_layer(path_to_zones, "EPSG:21781", ["zone_id"])
+    cache_files = list(get_cache_directory(path_to_zones).glob("*.parquet"))
+    assert len(cache_files) == 1
+    assert Path(config.path_to_zone_cache) in cache_files[0].parents
+    assert not (path_to_zones.parent / "zone_cache").exists()
+    # Second read from the cache
+    geopandas.testing.assert_geodataframe_equal(
+        read_zone_layer(path_to_zones, "EPSG:21781", ["zone_id"]), zones
+    )
+
+
+def test_cache_not_writable(path_to_zones, tmp_path, monkeypatch):
+    # The cache folder cannot be created: the zones are read without cache
+    path_to_file = tmp_path / "file"
+    path_to_file.write_text("")
+    monkeypatch.setattr(config, "path_to_zone_cache", path_to_file / "zone_cache")
+    zones = read_zone_layer(path_to_zones, "EPSG:21781", ["zone_id"])
+    assert len(zones) > 0
+    assert zones.crs.to_string() == "EPSG:21781"
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from simba.mobi.choice.utils import zone_service
+from simba.mobi.choice.utils.zone_service import get_zone_service
+from simba.mobi.mzmv import config
+
+COLUMNS = ["zone_id", "accsib_mul"]
+
+
+@pytest.fixture(autouse=True)
+def zone_services(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Zone services built again in each test, with the cache folders of the test."""
+    monkeypatch.setattr(zone_service, "ZONE_SERVICES", {})
+
+
+def get_points(number_of_points: int = 20000):
+    """Points in LV95 over the zones and around them, some on the borders of the zones."""
+    rng = np.random.default_rng(1)
+    x = rng.uniform(2470000, 2850000, number_of_points)
+    y = rng.uniform(1060000, 1310000, number_of_points)
+    # Points on the borders and corners of the 10 km grid
+    x[:1000] = np.round(x[:1000], -4)
+    y[:500] = np.round(y[:500], -4)
+    return x, y
+
+
+def test_raster_gives_the_zones_of_the_exact_test(path_to_zones: Path):
+    service = get_zone_service(path_to_zones, COLUMNS)
+    assert service.raster is not None
+    x, y = get_points()
+    np.testing.assert_array_equal(
+        service.locate_points(x, y, "EPSG:2056"),
+        service.locate_projected_points(x, y),
+    )
+
+
+def test_raster_read_from_the_cache(path_to_zones: Path, monkeypatch):
+    x, y = get_points()
+    positions = get_zone_service(path_to_zones, COLUMNS).locate_points(
+        x, y, "EPSG:2056"
+    )
+    assert list(config.path_to_zone_cache.rglob("*.npy"))
+    monkeypatch.setattr(zone_service, "ZONE_SERVICES", {})
+    service = get_zone_service(path_to_zones, COLUMNS)
+    np.testing.assert_array_equal(service.locate_points(x, y, "EPSG:2056"), positions)
+
+
+def test_cache_folder_not_writable(path_to_zones: Path, tmp_path: Path, monkeypatch):
+    # A folder cannot be created under a regular file
+    path_to_file = tmp_path / "file"
+    path_to_file.write_text("")
+    monkeypatch.setattr(config, "path_to_zone_cache", path_to_file / "zone_cache")
+    service = get_zone_service(path_to_zones, COLUMNS)
+    assert service.raster is not None
+    x, y = get_points()
+    np.testing.assert_array_equal(
+        service.get_zone_positions(x, y, "EPSG:2056"),
+        service.locate_projected_points(x, y),
+    )
+    # The memo file cannot be written either
+    service.flush()